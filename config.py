@@ -5,8 +5,12 @@ CAPTION = "Mobmania of Evolution"
 BASE_SCREEN_WIDTH = 800 
 
 # 実行時に書き換わる変数
+# SCREEN_*: ワールドを描く解像度 / DISPLAY_*: ウィンドウの解像度 (HUD・メニュー)
+# 低解像度モード (RENDER_SETTINGS) 以外は同じ値
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+DISPLAY_WIDTH = 800
+DISPLAY_HEIGHT = 600
 GLOBAL_SCALE = 1.0
 
 FPS = 60
@@ -106,6 +110,7 @@ WEAPON_STATS = {
         "orb_count": 2,     
         "stun_duration": 1000,
         "collect_radius": 250, 
+        "ring_frames": 8,      # ビリビリ円のアニメーション枚数 (レベルアップ時に作り直す)
         "image": "items_pulse.png",
         "size": 64
     },
@@ -237,6 +242,9 @@ UI_XP_BAR_HEIGHT = 30
 UI_XP_COLOR = (0, 191, 255)       # 水色
 UI_XP_BG_COLOR = (20, 20, 40)     # 暗い青
 
+# 武器スロットのクールダウン円弧を何段階で描くか (段階ごとに画像をキャッシュ)
+UI_COOLDOWN_STEPS = 48
+
 # config.py (末尾に追加)
 
 # ==========================================
@@ -256,7 +264,176 @@ DROP_SETTINGS = {
     "exp_size": (50, 50),       # 経験値ジェムの表示サイズ
     "healing_size": (70, 70),   # 回復アイテムの表示サイズ
     "magnet_range": 150,        # プレイヤーが近づいた時の吸い寄せ開始距離
-    "acceleration": 900         # 吸い寄せ時の加速度
+    "acceleration": 900,        # 吸い寄せ時の加速度
+    "pickup_radius": 50         # プレイヤーとの距離がこれ以下になったら回収
+}
+
+# ==========================================
+# データベース設定 (mob_history の集計と保持ポリシー)
+# ==========================================
+# mob_rollup / mob_rollup_hist は (biome, generation) 単位の集計テーブルです。
+# 生ログ(mob_history)を削っても、集計値はここに残ります。
+DB_ROLLUP_BUCKETS = {
+    "survival_time": 1.0,   # 生存時間ヒストグラムの刻み (秒)
+    "speed": 5,             # 速度ヒストグラムの刻み
+    "hp": 5                 # HPヒストグラムの刻み
+}
+
+# enabled を True にすると、ゲームプレイ開始時に生ログを削ります (既定は削らない)。
+# 削る行がある回は毎回、削る前に backup_path (None なら DB_PATH + ".bak") に日時を付けた名前で
+# DB を丸ごとコピーし、新しい backup_keep 個だけ残します。
+# VACUUM はゲーム終了時にだけ行います (main.py)。
+DB_RETENTION = {
+    "enabled": False,
+    "elite_keep": 100,          # バイオームごとに残す上位個体 (生存時間順)
+    "recent_keep": 500,         # バイオームごとに残す直近のログ件数
+    "backup_path": None,        # 削る前のバックアップ先 (実際の名前には日時が入る)
+    "backup_keep": 5,           # 残すバックアップの数
+    "vacuum_free_ratio": 0.25   # 空きページがこの割合を超えたら VACUUM する
+}
+
+# ==========================================
+# アセット読み込み設定
+# ==========================================
+# 起動時に assets/images 以下の画像をまとめてデコードする (タイトル画面で進捗表示)
+ASSET_PRELOAD = {
+    "enabled": True,
+    "workers": 4,               # デコード用スレッド数
+    "convert_budget_ms": 8      # 1フレームで convert_alpha に使う時間の上限
+}
+
+# テクスチャアトラス (python -m src.system.atlas --scale <GLOBAL_SCALE> で作成)
+# GLOBAL_SCALE に一致するアトラスが assets/atlas にあれば起動時に使われる
+ATLAS_SETTINGS = {
+    "enabled": True,
+    "sheet_size": 2048          # シート1枚の幅・高さ (px)
+}
+
+# 拡大縮小済み画像のディスクキャッシュ (元画像のハッシュ + 表示サイズごと)
+SCALED_IMAGE_CACHE = {
+    "enabled": True,
+    "dir": "assets/cache/scaled"
+}
+
+# ==========================================
+# 敵の更新 LOD (プレイヤーからの距離で更新の細かさを変える)
+# ==========================================
+# near: 毎フレーム通常の更新
+# mid : mid_interval フレームに1回、ためた dt でまとめて更新
+# far : プレイヤーへ直線移動するだけ (分離・向き・rect の更新なし)
+# near_radius は画面の対角線の半分より小さくならないように実行時に調整される
+ENEMY_LOD = {
+    "enabled": True,
+    "near_radius": 1400,
+    "far_radius": 2600,
+    "mid_interval": 3
+}
+
+# ==========================================
+# 敵の追跡フローフィールド (src/system/flow_field.py)
+# ==========================================
+# 読み込み済みチャンクを cell_size のマスに区切り、プレイヤーから BFS して
+# 障害物を避ける方向を全モブで共有します。
+# rebuild_interval: 作り直しは最短でもこのフレーム数おき
+# rebuild_cells   : プレイヤーがこのマス数以上動いたら作り直す
+# build_budget    : 1フレームに BFS で調べるマス数 (0 なら1フレームで全部)
+# reach_margin    : BFS は一番遠い敵のマス + このマス数まで (障害物の回り道の分)
+# direct_steps    : プレイヤーからこのマス数以内は直接プレイヤーへ向かう
+FLOW_FIELD = {
+    "enabled": True,
+    "cell_size": 50,
+    "rebuild_interval": 10,
+    "rebuild_cells": 3,
+    "build_budget": 1500,
+    "reach_margin": 6,
+    "direct_steps": 2
+}
+
+# ==========================================
+# ゲームプレイのイベント処理 (src/system/events.py)
+# ==========================================
+# 撃破・ダメージ・回収・回復のイベントを、フレームの最後に処理ごとにまとめて渡します。
+# intervals: 処理ごとに何フレームに1回まとめて呼ぶか (1 = 毎フレーム)
+EVENT_BUS = {
+    "intervals": {
+        "text_spawner": 1,      # ダメージ・回復の数字
+        "db_logger": 1,         # mob_history への記録
+        "drop_spawner": 1,      # 経験値・お菓子・お墓の花
+        "stats": 1              # 撃破数・ウェーブ・ボス撃破・集計
+    }
+}
+
+# ==========================================
+# ダメージ数字 (src/scenes/game_play.py の DamageNumbers)
+# ==========================================
+# window_ms         : 同じ敵への連続ヒットをこの時間だけ1つの数字にまとめる
+# max_texts         : 同時に出すテキストの上限 (超えたら古いものから消す)
+# show_weapon_damage: 弾以外の武器 (パン・雷など) のダメージも数字で出す (上限は同じ)
+DAMAGE_TEXT = {
+    "window_ms": 300,
+    "max_texts": 80,
+    "show_weapon_damage": False
+}
+
+# ==========================================
+# タイマーホイール (src/system/timer_wheel.py)
+# ==========================================
+# 弾・テキスト・演出の寿命、くま爆弾の信管、スタンの解除をまとめて管理する
+# tick_ms: レベル0 の1スロットの幅 / slots: 1段あたりのスロット数 / levels: 段数
+# (16ms x 64 x 64 x 64 で約70分先まで。それより先は overflow で待つ)
+TIMER_WHEEL = {
+    "tick_ms": 16,
+    "slots": 64,
+    "levels": 3
+}
+
+# ==========================================
+# メモリの内訳ログ (src/system/memory_stats.py)
+# ==========================================
+# スプライト数・Surface の推定サイズを log_interval_ms ごとに JSON Lines で追記します。
+# プレイ中に M キーで tracemalloc 込みのレポートを取り、H のデバッグ表示中は画面に要約を出します。
+# log_interval_ms: 0 なら定期ログなし (M キーの時だけ書く)
+MEMORY_TELEMETRY = {
+    "enabled": True,
+    "log_path": "logs/memory.jsonl",
+    "log_interval_ms": 60000,
+    "overlay_refresh_ms": 1000,
+    "top_n": 10,
+    "trace_frames": 1,
+    "trace_on_start": False     # True ならゲーム開始時から tracemalloc を動かす (重くなる)
+}
+
+# ==========================================
+# 描画解像度・描画バックエンド (src/system/render_target.py, src/system/texture_renderer.py)
+# ==========================================
+# mode: "native"  モニターの解像度でそのまま描く
+#       "low_res" ワールドを内部解像度で描き、1フレームに1回だけ画面の大きさに拡大する
+#                 (HUD・メニューはモニターの解像度のまま。内蔵 GPU など塗りが遅い環境向け)
+# internal_width: 内部解像度の幅 (None なら BASE_SCREEN_WIDTH、高さはモニターの縦横比から)
+# scale_factor  : 指定するとモニターの幅をこの値で割った幅にする (internal_width より優先)
+# smooth        : 拡大に smoothscale を使う (False なら最近傍。くっきりしていて速い)
+# backend: "software" Surface に CPU で blit する (今までどおり)
+#          "texture"  SDL2 の Renderer/Texture で描く (画像は1回だけアップロード。使えなければ software に戻る)
+# texture_keep_frames: "texture" の時、このフレーム数使われなかった Texture を捨てる
+RENDER_SETTINGS = {
+    "mode": "native",
+    "internal_width": None,
+    "scale_factor": None,
+    "smooth": False,
+    "backend": "software",
+    "texture_keep_frames": 300
+}
+
+# ==========================================
+# リプレイ記録 (src/system/replay.py)
+# ==========================================
+# ゲームプレイ中の入力・dt・乱数シードを記録します。
+# python -m src.system.replay <ファイル> で同じプレイをヘッドレスで再生できます。
+# 記録開始時の DB もファイルの横 (<名前>.db) に保存されます。
+REPLAY_SETTINGS = {
+    "record": True,
+    "dir": "replays",
+    "keep": 10                  # 古い記録はこの数だけ残して削除する
 }
 
 # ==========================================
@@ -1,10 +1,20 @@
 import pygame
 import config
+# config.py のゲームデータを検証して表にまとめる (間違いがあればここで GameDataError)
+from src.system import game_data
 from src.scenes.title_screen import TitleScreen
 from src.scenes.game_play_screen import GameplayScreen
 from src.scenes.stage_select import StageSelectScreen
 from src.scenes.game_clear_screen import GameClearScreen
 from src.scenes.game_over import GameOverScreen
+from src.system.asset_loader import AssetPreloader, set_atlas, set_disk_cache
+from src.system.scaled_cache import ScaledImageCache
+from src.system.atlas import TextureAtlas
+from src.system import frame_state
+from src.system import render_target
+from src.system import texture_renderer
+from src.system.db_manager import DB_PATH, compact_database
+from src.system.replay import start_recording
 from pygame.locals import *
 
 def main():
@@ -16,20 +26,36 @@ def main():
     monitor_width = info.current_w
     monitor_height = info.current_h
 
-    config.SCREEN_WIDTH = monitor_width
-    config.SCREEN_HEIGHT = monitor_height
+    # ワールドの解像度 (低解像度モードなら内部解像度) と GLOBAL_SCALE を決める
+    world_w, world_h = render_target.configure((monitor_width, monitor_height))
     
-    if hasattr(config, 'BASE_SCREEN_WIDTH'):
-        config.GLOBAL_SCALE = monitor_width / config.BASE_SCREEN_WIDTH
-    else:
-        config.GLOBAL_SCALE = 1.0
-    
-    print(f"Screen: {monitor_width}x{monitor_height}, Scale: {config.GLOBAL_SCALE:.2f}")
+    print(f"Screen: {monitor_width}x{monitor_height}, World: {world_w}x{world_h}, Scale: {config.GLOBAL_SCALE:.2f}")
 
-    screen = pygame.display.set_mode((monitor_width, monitor_height), pygame.FULLSCREEN)
-    pygame.display.set_caption(config.CAPTION)
+    # Texture バックエンド (RENDER_SETTINGS["backend"]) が使えればそちらで描く。
+    # その時 screen は HUD・メニュー用の Surface で、毎フレーム Renderer の上に重ねる
+    backend = texture_renderer.setup((monitor_width, monitor_height), fullscreen=True)
+    if backend:
+        screen = backend.canvas
+    else:
+        screen = pygame.display.set_mode((monitor_width, monitor_height), pygame.FULLSCREEN)
+        pygame.display.set_caption(config.CAPTION)
+        render_target.setup(screen)
     # ----------------------------------------
 
+    # GLOBAL_SCALE 用のアトラスがあれば使う (元画像のデコードと拡大縮小を省略)
+    if config.ATLAS_SETTINGS.get("enabled", True):
+        atlas = TextureAtlas.load_for_scale(config.GLOBAL_SCALE)
+        if atlas:
+            set_atlas(atlas)
+
+    # 拡大縮小済み画像のディスクキャッシュ (2回目以降の起動で PNG 展開と scale を省略)
+    if config.SCALED_IMAGE_CACHE.get("enabled", True):
+        set_disk_cache(ScaledImageCache(config.SCALED_IMAGE_CACHE["dir"]))
+
+    # 画像のプリロード開始 (進捗はタイトル画面に表示)
+    preloader = AssetPreloader()
+    preloader.start()
+
     clock = pygame.time.Clock()
 
     # コントローラー初期化
@@ -44,7 +70,7 @@ def main():
     # シーン管理
     # GAME_OVER は動的に生成するので辞書には入れなくても良いですが、管理上入れておきます
     scenes = {
-        "TITLE": TitleScreen(),
+        "TITLE": TitleScreen(preloader),
         "STAGE_SELECT": StageSelectScreen(),
         "GAMEPLAY": None,
         "GAME_OVER": None # ★プレースホルダ
@@ -53,13 +79,21 @@ def main():
     current_scene_key = "TITLE"
     current_scene = scenes["TITLE"]
 
+    # ゲームプレイの記録 (src/system/replay.py)
+    recorder = None
+
     running = True
     while running:
-        dt = clock.tick(config.FPS) / 1000.0
+        dt_ms = clock.tick(config.FPS)
+        dt = dt_ms / 1000.0
+
+        # このフレームの時刻と入力を固定する (ゲームプレイ中のコードはこれを読む)
+        frame_state.capture()
 
         events = pygame.event.get()
+        run_started = False
         for event in events:
-            if event.type == pygame.QUIT:
+            if event.type == pygame.QUIT or event.type == pygame.WINDOWCLOSE:
                 running = False
             
             # シーンごとのイベント処理
@@ -78,6 +112,9 @@ def main():
                 elif isinstance(action, tuple) and action[0] == "GAMEPLAY":
                     stage_key = action[1]
                     print(f"Transition: Stage Select -> Gameplay ({stage_key})")
+                    if recorder: recorder.close()
+                    recorder = start_recording(stage_key, DB_PATH)
+                    run_started = True
                     scenes["GAMEPLAY"] = GameplayScreen(stage_key)
                     current_scene_key = "GAMEPLAY"
                     current_scene = scenes["GAMEPLAY"]
@@ -91,6 +128,9 @@ def main():
                     # (GameOverScreenの仕様に合わせて調整してください)
                     retry_stage = getattr(current_scene, 'retry_stage_key', 'forest')
                     print(f"Retry: Gameplay ({retry_stage})")
+                    if recorder: recorder.close()
+                    recorder = start_recording(retry_stage, DB_PATH)
+                    run_started = True
                     scenes["GAMEPLAY"] = GameplayScreen(retry_stage)
                     current_scene_key = "GAMEPLAY"
                     current_scene = scenes["GAMEPLAY"]
@@ -107,6 +147,15 @@ def main():
 
         # 更新処理
         result = current_scene.update(dt)
+
+        # 記録 (ゲームプレイ以外の画面に移ったら記録を閉じる)
+        if recorder:
+            if current_scene is scenes["GAMEPLAY"]:
+                # 開始したフレームのイベントはステージ選択画面のものなので記録しない
+                recorder.record_frame(dt_ms, [] if run_started else events, current_scene)
+            if current_scene is not scenes["GAMEPLAY"] or result:
+                recorder.close()
+                recorder = None
         
         # --- ★追加: ゲームプレイ中の状態遷移チェック ---
         if result == "GAME_OVER":
@@ -127,15 +176,29 @@ def main():
             current_scene_key = "TITLE"
             current_scene = scenes["TITLE"]
 
+        # ゲームプレイから抜けたら後片付けする (タイマー・敵のクラス変数から前のゲームを外す)
+        if scenes["GAMEPLAY"] is not None and current_scene is not scenes["GAMEPLAY"]:
+            scenes["GAMEPLAY"].close()
+            scenes["GAMEPLAY"] = None
+
         # 描画
         current_scene.draw(screen)
-        pygame.display.flip()
+        if backend:
+            backend.present(screen)
+        else:
+            pygame.display.flip()
 
         # 安全装置 (タイトルでESC)
         keys = pygame.key.get_pressed()
         if current_scene_key == "TITLE" and keys[pygame.K_ESCAPE]:
             running = False
 
+    if recorder:
+        recorder.close()
+    if backend:
+        backend.close()
+    # 保持ポリシーで空いたページを詰める (プレイ中に止まらないよう終了時に1回だけ)
+    compact_database()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 # src/entities/bullet.py
 import pygame
 from pygame.math import Vector2
+from src.system import frame_state, timer_wheel
 
 class Bullet(pygame.sprite.Sprite):
     def __init__(self, pos, direction, damage, image, speed=None, lifetime=1500):
@@ -15,8 +16,16 @@ class Bullet(pygame.sprite.Sprite):
         self.speed = speed if speed else 600
         
         # 寿命管理 (ミリ秒)
-        self.spawn_time = pygame.time.get_ticks()
+        # タイマーホイールがあれば期限に kill してもらい、毎フレームの時刻比較をしない
+        # (以前の判定は「lifetime を超えたら」なので +1ms)
+        self.spawn_time = frame_state.get_ticks()
         self.lifetime = lifetime 
+        self.expire_timer = timer_wheel.call_later(lifetime + 1, self.kill)
+
+    def kill(self):
+        # 当たって消えた弾の寿命タイマーを外す
+        timer_wheel.cancel(self.expire_timer)
+        super().kill()
 
     def update(self, dt):
         # 移動処理
@@ -27,8 +36,9 @@ class Bullet(pygame.sprite.Sprite):
         
         self.rect.center = (round(self.pos.x), round(self.pos.y))
         
-        # 寿命チェック
+        # 寿命チェック (ホイールが無い時だけ)
         # spawn_time はミリ秒なので、現在時刻(ミリ秒)と比較
-        current_time = pygame.time.get_ticks()
-        if current_time - self.spawn_time > self.lifetime:
-            self.kill()
\ No newline at end of file
+        if self.expire_timer is None:
+            current_time = frame_state.get_ticks()
+            if current_time - self.spawn_time > self.lifetime:
+                self.kill()
\ No newline at end of file
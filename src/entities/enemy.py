@@ -2,20 +2,56 @@
 import pygame
 import os
 import random
-import time
 from pygame.math import Vector2
 import config
 import math
-from src.entities.enemy_projectile import EnemyProjectile
+from src.system.asset_loader import load_image, load_scaled_image
+from src.system import frame_state, game_data, events, timer_wheel
 
 class Enemy(pygame.sprite.Sprite):
     _image_cache = {}
 
+    # LOD 設定 (configure_lod で config.ENEMY_LOD から作る)
+    lod_enabled = False
+    lod_near_sq = 0
+    lod_far_sq = 0
+    lod_mid_interval = 1
+    lod_spawn_count = 0
+    # 今フレームの階層ごとの更新数 (プロファイラ・ベンチマーク用、reset_lod_counts で0に戻す)
+    lod_counts = {"near": 0, "mid": 0, "far": 0}
+
+    # 障害物を避けて追跡するためのフローフィールド (GameplayScreen が設定する)
+    flow_field = None
+    use_flow_field = True
+
+    # ダメージを知らせるイベントキュー (src/system/events.py, GameplayScreen が設定する)
+    event_bus = None
+
+    @classmethod
+    def configure_lod(cls):
+        settings = config.ENEMY_LOD
+        cls.lod_enabled = settings.get("enabled", True)
+        # 画面内のモブは必ず毎フレーム更新する
+        half_diagonal = math.hypot(config.SCREEN_WIDTH, config.SCREEN_HEIGHT) / 2
+        near = max(settings.get("near_radius", 1400), half_diagonal + 200)
+        far = max(settings.get("far_radius", 2600), near)
+        cls.lod_near_sq = near * near
+        cls.lod_far_sq = far * far
+        cls.lod_mid_interval = max(1, settings.get("mid_interval", 3))
+        cls.lod_spawn_count = 0
+
+    @classmethod
+    def reset_lod_counts(cls):
+        cls.lod_counts = {"near": 0, "mid": 0, "far": 0}
+
     def __init__(self, start_pos, player, enemy_group, stats=None):
         super().__init__()
         self.enemy_group = enemy_group
 
         self.stun_end_time = 0
+        # スタン解除はタイマーホイールで (スタン中かどうかは stunned を見るだけ)
+        self.stunned = False
+        self.stun_timer = None
         
         # --- 1. ステータス設定 ---
         if stats:
@@ -23,24 +59,24 @@ class Enemy(pygame.sprite.Sprite):
             if "type_id" not in self.stats: self.stats["type_id"] = 0
             
             # 通常モブの場合のみベースステータスを参照
-            if self.stats["type_id"] in config.MOB_BASE_STATS:
-                base = config.MOB_BASE_STATS[self.stats["type_id"]]
-                if "image" not in self.stats: self.stats["image"] = base["image"]
-                if "size" not in self.stats: self.stats["size"] = base["size"]
+            base = game_data.MOB_TYPES.get(self.stats["type_id"])
+            if base is not None:
+                if "image" not in self.stats: self.stats["image"] = base.image
+                if "size" not in self.stats: self.stats["size"] = base.size
         else:
-            type_id = random.choice(list(config.MOB_BASE_STATS.keys()))
-            base_data = config.MOB_BASE_STATS[type_id]
+            type_id = random.choice(game_data.MOB_TYPE_IDS)
+            base_data = game_data.MOB_TYPES[type_id]
             self.stats = {
                 "type_id": type_id,
-                "name": base_data["name"],
-                "image": base_data["image"],
-                "hp": base_data["hp"],
-                "max_hp": base_data["hp"],
-                "speed": base_data["speed"],
-                "attack": base_data["attack"],
-                "defense_rate": base_data["defense_rate"],
-                "attack_type": base_data["attack_type"],
-                "size": base_data["size"]
+                "name": base_data.name,
+                "image": base_data.image,
+                "hp": base_data.hp,
+                "max_hp": base_data.hp,
+                "speed": base_data.speed,
+                "attack": base_data.attack,
+                "defense_rate": base_data.defense_rate,
+                "attack_type": base_data.attack_type,
+                "size": base_data.size
             }
 
         self.player = player
@@ -65,8 +101,7 @@ class Enemy(pygame.sprite.Sprite):
             if cache_key not in Enemy._image_cache:
                 img_path = os.path.join(config.MOB_IMAGE_DIR, image_name)
                 try:
-                    img_left = pygame.image.load(img_path).convert_alpha()
-                    img_left = pygame.transform.scale(img_left, (display_size, display_size))
+                    img_left = load_scaled_image(img_path, (display_size, display_size))
                     img_right = pygame.transform.flip(img_left, True, False)
                     Enemy._image_cache[cache_key] = (img_left, img_right)
                 except FileNotFoundError:
@@ -90,25 +125,83 @@ class Enemy(pygame.sprite.Sprite):
         inflation = -1 * (display_size // 4)
         self.hitbox = self.rect.inflate(inflation, inflation)
 
-        self.spawn_time = time.time()
+        self.spawn_time = frame_state.get_time()
         self.death_time = 0
 
         # --- 3. 軽量化と分離の変数 ---
         self.cached_separation = Vector2(0, 0)
         self.update_interval = 15
-        self.separation_timer = id(self) % self.update_interval
+        # 更新タイミングをずらす (id() だと実行ごとに変わりリプレイが再現しないので乱数で決める)
+        self.separation_timer = random.randrange(self.update_interval)
+
+        # LOD (中距離で更新を間引く時のカウンタと、ためた dt)
+        # 出現順にずらす (乱数を消費するとリプレイやベンチマークの展開が変わるため)
+        Enemy.lod_spawn_count += 1
+        self.lod_timer = Enemy.lod_spawn_count % Enemy.lod_mid_interval
+        self.lod_dt = 0.0
+        # 遠距離の間は rect を lod_mid_interval フレームに1回だけ pos に合わせる
+        self.lod_far_timer = self.lod_timer
+        self.lod_far = False
 
     def update(self, dt):
 
         # スタン中は移動処理をスキップ
-        current_time = pygame.time.get_ticks()
-        if current_time < self.stun_end_time:
+        if self.stunned:
             # スタン中はアニメーションだけ更新するか、完全に止めるか
             # ここでは移動計算(self.move)を呼ばないことで停止させる
-            return
+            if self.stun_timer is not None or frame_state.get_ticks() < self.stun_end_time:
+                return
+            self.stunned = False
+
+        if Enemy.lod_enabled:
+            dx = self.player.pos.x - self.pos.x
+            dy = self.player.pos.y - self.pos.y
+            dist_sq = dx * dx + dy * dy
+
+            if dist_sq > Enemy.lod_far_sq:
+                # 遠距離: 直線でプレイヤーへ近づくだけ。
+                # 画面外だが、近傍検索・レーザー・ドロップの位置は rect を見るので、ときどき合わせる
+                Enemy.lod_counts["far"] += 1
+                step = self.stats["speed"] * dt / math.sqrt(dist_sq)
+                self.pos.x += dx * step
+                self.pos.y += dy * step
+                self.lod_far = True
+                self.lod_far_timer -= 1
+                if self.lod_far_timer <= 0:
+                    self.lod_far_timer = Enemy.lod_mid_interval
+                    self.sync_rect()
+                return
+
+            if self.lod_far:
+                # 遠距離から出た最初のフレーム (中距離で待つ間も rect が古いままにならないように)
+                self.lod_far = False
+                self.sync_rect()
+
+            if dist_sq > Enemy.lod_near_sq:
+                # 中距離: 数フレームに1回、ためた dt でまとめて動かす
+                Enemy.lod_counts["mid"] += 1
+                self.lod_dt += dt
+                self.lod_timer -= 1
+                if self.lod_timer > 0:
+                    return
+                self.lod_timer = Enemy.lod_mid_interval
+                dt = self.lod_dt
+                self.lod_dt = 0.0
+            else:
+                Enemy.lod_counts["near"] += 1
+                if self.lod_dt:
+                    # 中距離から入ってきた直後は、ためていた分も進める
+                    dt += self.lod_dt
+                    self.lod_dt = 0.0
         
-        # 1. プレイヤー追尾ベクトル
-        to_player = self.player.pos - self.pos
+        # 1. プレイヤー追尾ベクトル (フローフィールドがあれば障害物を避ける方向へ)
+        target = None
+        if self.use_flow_field and Enemy.flow_field is not None:
+            target = Enemy.flow_field.lookup(self.pos.x, self.pos.y)
+        if target is not None:
+            to_player = Vector2(target[0] - self.pos.x, target[1] - self.pos.y)
+        else:
+            to_player = self.player.pos - self.pos
         if to_player.length() > 0:
             to_player = to_player.normalize()
         
@@ -136,6 +229,10 @@ class Enemy(pygame.sprite.Sprite):
 
         # 5. 移動
         self.pos += move_vector * self.stats["speed"] * dt
+        self.sync_rect()
+
+    def sync_rect(self):
+        """rect と hitbox を pos に合わせる"""
         self.rect.center = (round(self.pos.x), round(self.pos.y))
         self.hitbox.center = self.rect.center
 
@@ -173,10 +270,14 @@ class Enemy(pygame.sprite.Sprite):
         return separation
 
     # ★修正: knockback_force 引数を受け取れるように変更 (デフォルト値0)
-    def take_damage(self, raw_damage, knockback_force=0):
+    # source: events.DAMAGE_SOURCES のどれか (ダメージ表示・集計用)
+    def take_damage(self, raw_damage, knockback_force=0, source="weapon"):
         defense = self.stats.get("defense_rate", 1.0)
         actual_damage = raw_damage / defense
         actual_damage = max(1, int(actual_damage))
+        if Enemy.event_bus is not None:
+            x, y = self.rect.center
+            Enemy.event_bus.push(events.DAMAGE, source, self, actual_damage, x, y)
         self.stats["hp"] -= actual_damage
         if self.stats["hp"] <= 0:
             return True
@@ -184,11 +285,30 @@ class Enemy(pygame.sprite.Sprite):
     
     # ★追加: 外部からスタンさせるためのメソッド
     def apply_stun(self, duration_ms):
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         # 既にスタンしているなら、より長い時間の方を採用して延長
         new_end_time = current_time + duration_ms
         if new_end_time > self.stun_end_time:
             self.stun_end_time = new_end_time
+        self.stunned = True
+        # 解除タイマーが動いていれば終了時刻を延ばすだけ (毎フレーム当たっても登録は1回)
+        if self.stun_timer is None:
+            self.stun_timer = timer_wheel.call_later(self.stun_end_time - current_time, self.end_stun)
+
+    def kill(self):
+        # スタン中に倒された時は解除タイマーを外す
+        timer_wheel.cancel(self.stun_timer)
+        self.stun_timer = None
+        super().kill()
+
+    def end_stun(self):
+        """解除タイマーから呼ばれる。延長されていたら残りの時間で登録し直す"""
+        remaining = self.stun_end_time - frame_state.get_ticks()
+        if remaining > 0:
+            self.stun_timer = timer_wheel.call_later(remaining, self.end_stun)
+            return
+        self.stun_timer = None
+        self.stunned = False
     
 # ==========================================
 # ボス・中ボスクラス
@@ -198,14 +318,16 @@ class Enemy(pygame.sprite.Sprite):
 def load_boss_image(filename, scale_size=None):
     path = os.path.join("assets", "images", "boss", filename)
     try:
-        img = pygame.image.load(path).convert_alpha()
         if scale_size:
-            img = pygame.transform.scale(img, scale_size)
-        return img
+            return load_scaled_image(path, scale_size)
+        return load_image(path)
     except (FileNotFoundError, pygame.error):
         return None
 
 class Boss(Enemy):
+    # ボスは大きく障害物のマスを通れないことが多いので、直接プレイヤーを追う
+    use_flow_field = False
+
     def __init__(self, pos, player, groups, boss_data):
         filename = boss_data["filename"]
         scale_size = boss_data["scale"]
@@ -245,7 +367,7 @@ class Boss(Enemy):
                 g.add(self)
 
         # 攻撃用タイマー
-        self.last_attack_time = pygame.time.get_ticks() - 2000
+        self.last_attack_time = frame_state.get_ticks() - 2000
         self.attack_cooldown = 1500 
 
     def update(self, dt):
@@ -253,7 +375,7 @@ class Boss(Enemy):
         self.check_attack()
 
     def check_attack(self):
-        now = pygame.time.get_ticks()
+        now = frame_state.get_ticks()
         
         if self.bullet_group is None:
             return
@@ -302,7 +424,7 @@ class Boss(Enemy):
         if direction.length() > 0: direction = direction.normalize()
         spawn_pos = self.pos + direction * 350 
 
-        EnemyProjectile(spawn_pos, target_pos, speed, damage, [self.camera_group, self.bullet_group], img, scale_size=size)
+        self.bullet_group.spawn(spawn_pos, target_pos, speed, damage, img, scale_size=size)
 
     # ★引数に size を追加
     def shoot_circle(self, count, speed, damage, img, size=None):
@@ -316,7 +438,7 @@ class Boss(Enemy):
             spawn_pos = self.pos + vec * 350
             target = self.pos + vec * 450
             
-            EnemyProjectile(spawn_pos, target, speed, damage, [self.camera_group, self.bullet_group], img, scale_size=size)
+            self.bullet_group.spawn(spawn_pos, target, speed, damage, img, scale_size=size)
 
-    def take_damage(self, amount, knockback_force=0):
-        super().take_damage(amount, knockback_force * 0.1)
\ No newline at end of file
+    def take_damage(self, amount, knockback_force=0, source="weapon"):
+        return super().take_damage(amount, knockback_force * 0.1, source)
\ No newline at end of file
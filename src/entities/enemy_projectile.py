@@ -1,57 +1,175 @@
+import array
 import pygame
 import os
 import math
+from src.system.asset_loader import load_image, load_scaled_image
+from src.system import frame_state
 
-def load_attack_image(filename):
+def load_attack_image(filename, scale_size=None):
     if not filename: return None
     path = os.path.join("assets", "images", "attack", filename)
     try:
-        img = pygame.image.load(path).convert_alpha()
+        if scale_size:
+            return load_scaled_image(path, scale_size)
+        img = load_image(path)
         return img
     except (FileNotFoundError, pygame.error):
         return None
 
-class EnemyProjectile(pygame.sprite.Sprite):
-    # 引数に scale_size=None があることを確認
-    def __init__(self, pos, target_pos, speed, damage, groups, image_name, scale_size=None):
-        super().__init__(groups)
-        
-        raw_img = load_attack_image(image_name)
-        
-        if raw_img is None:
-            self.image = pygame.Surface((20, 20))
-            self.image.fill((255, 255, 0))
-            pygame.draw.circle(self.image, (255, 0, 0), (10, 10), 5)
-        else:
-            # ★★★ ここが一番重要です！ ★★★
-            # scale_size が指定されている場合、画像をそのサイズに拡大・縮小します
-            if scale_size:
-                self.image = pygame.transform.scale(raw_img, scale_size)
-            else:
-                self.image = raw_img
-        
-        self.rect = self.image.get_rect(center=pos)
-        self.pos = pygame.math.Vector2(pos)
-        
-        self.damage = damage
-        self.spawn_time = pygame.time.get_ticks()
-        self.lifetime = 5000 
+# ==========================================
+# ボスの弾 (画像ごとに配列でまとめて管理する)
+# ==========================================
+# 弾1発ごとに Sprite を作らず、画像の種類ごとの「レーン」に
+# 座標・速度・発射時刻・ダメージ・向きを並列配列で持ちます。
+# 移動・寿命切れの削除・プレイヤーとの当たり判定は step() の1ループで行い、
+# 描画は回転済み画像のキャッシュ (向きを ANGLE_STEPS 段階に丸める) から blits でまとめて行います。
+# (numpy は使わず、標準ライブラリの array で持っています)
+PROJECTILE_LIFETIME = 5000
+ANGLE_STEPS = 72  # 5度刻み
+
+# (画像名, サイズ, 向き) -> (回転済み画像, 幅の半分, 高さの半分)  全レーンで共有
+_rotated_cache = {}
+
+
+def _fallback_image():
+    image = pygame.Surface((20, 20))
+    image.fill((255, 255, 0))
+    pygame.draw.circle(image, (255, 0, 0), (10, 10), 5)
+    return image
+
+
+class ProjectileLane:
+    """1種類の画像の弾"""
+    def __init__(self, image_name, scale_size=None):
+        self.key = (image_name, tuple(scale_size) if scale_size else None)
+        # scale_size が指定されている場合、読み込み時にそのサイズに拡大・縮小済み
+        self.image = load_attack_image(image_name, scale_size) or _fallback_image()
+
+        self.xs = array.array("d")
+        self.ys = array.array("d")
+        self.vxs = array.array("d")
+        self.vys = array.array("d")
+        self.spawn_times = array.array("q")
+        self.damages = array.array("q")
+        self.angles = array.array("H")
+
+        # 向き -> (画像, 幅の半分, 高さの半分)
+        self.frames = {}
+
+    def get_frame(self, step):
+        frame = self.frames.get(step)
+        if frame is None:
+            cache_key = self.key + (step,)
+            frame = _rotated_cache.get(cache_key)
+            if frame is None:
+                image = pygame.transform.rotate(self.image, step * 360 / ANGLE_STEPS)
+                frame = (image, image.get_width() / 2, image.get_height() / 2)
+                _rotated_cache[cache_key] = frame
+            self.frames[step] = frame
+        return frame
+
+    def add(self, x, y, vx, vy, damage, now):
+        # 画像を進行方向に向ける
+        angle = math.degrees(math.atan2(-vy, vx)) - 90
+        step = round(angle * ANGLE_STEPS / 360) % ANGLE_STEPS
+        self.get_frame(step)
+
+        self.xs.append(x)
+        self.ys.append(y)
+        self.vxs.append(vx)
+        self.vys.append(vy)
+        self.spawn_times.append(now)
+        self.damages.append(damage)
+        self.angles.append(step)
+
+    def __len__(self):
+        return len(self.xs)
+
+
+class ProjectileField:
+    """ボスの弾すべて (GameplayScreen が1つ持ち、Boss はここに撃ち込む)"""
+    def __init__(self, lifetime=PROJECTILE_LIFETIME):
+        self.lifetime = lifetime
+        self.lanes = {}
+
+    def spawn(self, pos, target_pos, speed, damage, image_name, scale_size=None):
+        key = (image_name, tuple(scale_size) if scale_size else None)
+        lane = self.lanes.get(key)
+        if lane is None:
+            lane = ProjectileLane(image_name, scale_size)
+            self.lanes[key] = lane
 
         # ターゲットに向かうベクトル計算
-        direction = pygame.math.Vector2(target_pos) - self.pos
-        if direction.length() > 0:
-            self.velocity = direction.normalize() * speed
+        dx = target_pos[0] - pos[0]
+        dy = target_pos[1] - pos[1]
+        length = math.hypot(dx, dy)
+        if length > 0:
+            vx, vy = dx / length * speed, dy / length * speed
         else:
-            self.velocity = pygame.math.Vector2(1, 0) * speed
+            vx, vy = speed, 0.0
+        lane.add(pos[0], pos[1], vx, vy, damage, frame_state.get_ticks())
 
-        # 画像を進行方向に向ける
-        angle = math.degrees(math.atan2(-self.velocity.y, self.velocity.x)) - 90
-        self.image = pygame.transform.rotate(self.image, angle)
-        self.rect = self.image.get_rect(center=self.rect.center)
-
-    def update(self, dt):
-        self.pos += self.velocity * dt * 60
-        self.rect.center = (round(self.pos.x), round(self.pos.y))
-        
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
-            self.kill()
\ No newline at end of file
+    def step(self, dt, hitbox):
+        """
+        全弾を動かし、寿命切れを消し、hitbox に重なった弾のダメージをリストで返す。
+        (弾は当たっても消えない。連続ヒットはプレイヤー側の無敵時間で防ぐ)
+        """
+        now = frame_state.get_ticks()
+        lifetime = self.lifetime
+        move = dt * 60
+        left, top, right, bottom = hitbox.left, hitbox.top, hitbox.right, hitbox.bottom
+
+        hits = []
+        for lane in self.lanes.values():
+            xs, ys, vxs, vys = lane.xs, lane.ys, lane.vxs, lane.vys
+            spawn_times, damages, angles, frames = lane.spawn_times, lane.damages, lane.angles, lane.frames
+            count = len(xs)
+            keep = 0
+            for i in range(count):
+                spawned = spawn_times[i]
+                if now - spawned > lifetime:
+                    continue
+
+                x = xs[i] + vxs[i] * move
+                y = ys[i] + vys[i] * move
+                step = angles[i]
+                _, hw, hh = frames[step]
+                # 回転後の画像の外接矩形 vs プレイヤーの当たり判定
+                if x + hw > left and x - hw < right and y + hh > top and y - hh < bottom:
+                    hits.append(damages[i])
+
+                # 生き残った弾を前に詰める
+                xs[keep] = x
+                ys[keep] = y
+                vxs[keep] = vxs[i]
+                vys[keep] = vys[i]
+                spawn_times[keep] = spawned
+                damages[keep] = damages[i]
+                angles[keep] = step
+                keep += 1
+
+            if keep < count:
+                del xs[keep:], ys[keep:], vxs[keep:], vys[keep:]
+                del spawn_times[keep:], damages[keep:], angles[keep:]
+        return hits
+
+    def draw(self, surface, offset, view_rect):
+        """カメラの offset を引いて、view_rect (ワールド座標) 内の弾だけ描く"""
+        ox, oy = offset
+        v_left, v_top, v_right, v_bottom = view_rect.left, view_rect.top, view_rect.right, view_rect.bottom
+        batch = []
+        for lane in self.lanes.values():
+            frames = lane.frames
+            for x, y, step in zip(lane.xs, lane.ys, lane.angles):
+                image, hw, hh = frames[step]
+                if x + hw < v_left or x - hw > v_right or y + hh < v_top or y - hh > v_bottom:
+                    continue
+                batch.append((image, (round(x - hw - ox), round(y - hh - oy))))
+        if batch:
+            surface.blits(batch, doreturn=False)
+
+    def clear(self):
+        self.lanes = {}
+
+    def __len__(self):
+        return sum(len(lane) for lane in self.lanes.values())
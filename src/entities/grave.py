@@ -2,14 +2,14 @@ import pygame
 import os
 import random
 import math
+from src.system.asset_loader import load_scaled_image
 
 # 画像読み込みヘルパー
 def load_grave_image(filename):
     path = os.path.join("assets", "images", "grave", filename)
     try:
-        img = pygame.image.load(path).convert_alpha()
         # 必要に応じてサイズ調整（例: 32x32くらいに）
-        img = pygame.transform.scale(img, (64, 64))
+        img = load_scaled_image(path, (64, 64))
         return img
     except (FileNotFoundError, pygame.error):
         return None
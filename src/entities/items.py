@@ -3,24 +3,23 @@ import math
 import os
 import random
 import config  # ★追加: configをインポート
+from src.system.asset_loader import load_scaled_image
 
 # 画像読み込み用のヘルパー関数
 def load_drop_image(filename, size):
     # パス: assets/images/drops/filename
     path = os.path.join("assets", "images", "drops", filename)
     try:
-        img = pygame.image.load(path).convert_alpha()
-        return pygame.transform.scale(img, size)
+        return load_scaled_image(path, size)
     except (FileNotFoundError, pygame.error):
         return None
 
 # ==========================================
 # ベースクラス: DropItem
 # ==========================================
+# 吸い寄せ・移動・回収は src/system/item_system.py の ItemGroup がまとめて行う
 class DropItem(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
-        super().__init__(groups)
-        
         # 画像が設定されていない場合のフォールバック（白い四角）
         if not hasattr(self, 'image') or self.image is None:
             self.image = pygame.Surface((10, 10))
@@ -36,27 +35,8 @@ class DropItem(pygame.sprite.Sprite):
         self.pos.y += scatter_y
         self.rect.center = (round(self.pos.x), round(self.pos.y))
 
-        self.speed = 0
-        # ★変更: configから読み込み
-        self.acceleration = config.DROP_SETTINGS["acceleration"]
-        self.magnet_range = config.DROP_SETTINGS["magnet_range"]
-        self.is_magnetized = False
-
-    def update(self, dt, player_pos=None):
-        if player_pos is None:
-            return
-
-        direction = player_pos - self.pos
-        distance = direction.length()
-        
-        if distance < self.magnet_range:
-            self.is_magnetized = True
-        
-        if self.is_magnetized and distance > 0:
-            direction.normalize_ip()
-            self.speed += self.acceleration * dt
-            self.pos += direction * self.speed * dt
-            self.rect.center = (round(self.pos.x), round(self.pos.y))
+        # 座標が決まってからグループに入れる (ItemGroup が pos を配列に取り込むため)
+        super().__init__(groups)
 
 # ==========================================
 # 経験値ジェム
@@ -1,18 +1,19 @@
 # src/entities/obstacle.py
 import pygame
 import random
+from src.system import game_data
 
 class Obstacle(pygame.sprite.Sprite):
     def __init__(self, pos, image_source, is_solid=True, props=None):
         """
-        props: configで定義した個別設定 (hitbox_w, hitbox_h, offset_yなど)
+        props: game_data.MapObject (configで定義した hitbox_w, hitbox_h, offset_y など)
         """
         super().__init__()
         self.pos = pygame.math.Vector2(pos)
         self.is_solid = is_solid 
         
         # propsがNoneの場合の対策
-        if props is None: props = {}
+        if props is None: props = game_data.DEFAULT_MAP_OBJECT
         
         if isinstance(image_source, pygame.Surface):
             self.image = image_source
@@ -24,13 +25,13 @@ class Obstacle(pygame.sprite.Sprite):
         
         # --- 当たり判定のカスタマイズ ---
         if self.is_solid:
-            # configから設定を取得 (デフォルト値も設定)
+            # configから設定を取得 (未設定の画像は game_data.DEFAULT_MAP_OBJECT の値)
             # 幅倍率 (例: 0.2 なら画像の20%の幅)
-            w_ratio = props.get("hitbox_w", 0.6) 
+            w_ratio = props.hitbox_w
             # 高さ倍率
-            h_ratio = props.get("hitbox_h", 0.4)
+            h_ratio = props.hitbox_h
             # 縦オフセット (判定を下にずらす)
-            offset_y = props.get("offset_y", 0)
+            offset_y = props.offset_y
 
             # 判定サイズ計算
             hitbox_w = self.rect.width * w_ratio
@@ -3,6 +3,8 @@ import pygame
 import os
 from pygame.math import Vector2
 import config
+from src.system.asset_loader import load_scaled_image
+from src.system import frame_state
 from src.entities.weapons import PencilGun, BreadShield, BearSmash, WoodenStick
 
 class Player(pygame.sprite.Sprite):
@@ -20,8 +22,7 @@ class Player(pygame.sprite.Sprite):
         img_path = os.path.join(config.PLAYER_IMAGE_DIR, config.PLAYER_IMAGE)
         
         try:
-            img = pygame.image.load(img_path).convert_alpha()
-            img = pygame.transform.scale(img, (display_size, display_size))
+            img = load_scaled_image(img_path, (display_size, display_size))
             self.image_left = img
             self.image_right = pygame.transform.flip(img, True, False)
             self.image = self.image_right
@@ -56,12 +57,12 @@ class Player(pygame.sprite.Sprite):
 
     def update(self, dt):
         self.move(dt)
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         for weapon in self.weapons:
             weapon.update(current_time)
 
     def move(self, dt):
-        keys = pygame.key.get_pressed()
+        keys = frame_state.get_pressed()
         direction = Vector2(0, 0)
         
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
@@ -88,7 +89,7 @@ class Player(pygame.sprite.Sprite):
 
     # ★追加: ダメージを受ける処理
     def take_damage(self, amount):
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         
         # 前回のダメージから500ms(約30フレーム)経過していなければ無視して終了
         if current_time - self.last_damage_time < 1000:
@@ -5,11 +5,13 @@ import os
 from pygame.math import Vector2
 import config
 from src.entities.bullet import Bullet
+from src.system.asset_loader import load_scaled_image
+from src.system import frame_state, game_data, events, timer_wheel
 
 # --- 画像読み込みヘルパー ---
 def load_weapon_image(key):
-    # config.WEAPON_STATS からファイル名を取得
-    stats = config.WEAPON_STATS.get(key)
+    # game_data.WEAPONS (config.WEAPON_STATS を検証したもの) からファイル名を取得
+    stats = game_data.WEAPONS.get(key)
     if not stats:
         return create_fallback_surface(32, (255, 0, 255)) # マゼンタ(エラー色)
     
@@ -20,8 +22,7 @@ def load_weapon_image(key):
     path = os.path.join(config.ITEM_IMAGE_DIR, filename)
     
     try:
-        img = pygame.image.load(path).convert_alpha()
-        img = pygame.transform.scale(img, (size, size))
+        img = load_scaled_image(path, (size, size))
         return img
     except (FileNotFoundError, pygame.error):
         print(f"Warning: Image not found {path}")
@@ -45,18 +46,24 @@ class VisualEffect(pygame.sprite.Sprite):
         super().__init__(groups)
         self.image = image
         self.rect = self.image.get_rect(center=pos)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = frame_state.get_ticks()
         self.duration = duration
+        self.expire_timer = timer_wheel.call_later(duration + 1, self.kill)
         # 少しふわふわさせるための初期位置
         self.start_y = pos[1]
 
+    def kill(self):
+        timer_wheel.cancel(self.expire_timer)
+        super().kill()
+
     def update(self, dt):
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         elapsed = current_time - self.spawn_time
         
-        # 寿命チェック
+        # 寿命チェック (ホイールが無い時だけ)
         if elapsed > self.duration:
-            self.kill()
+            if self.expire_timer is None:
+                self.kill()
             return
 
         # ふわふわ演出 (上に少し浮く)
@@ -82,29 +89,39 @@ class DelayedHealingText(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(center=pos)
         
         self.pos = Vector2(pos)
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = frame_state.get_ticks()
         self.delay = delay
         self.is_visible = False
         self.life_time = 1500 # 表示されてから消えるまでの時間
+        # 表示するタイミングはタイマーホイールに任せる (待機中は update で何もしない)
+        self.show_timer = timer_wheel.call_later(delay, self.show)
+        self.expire_timer = None
+
+    def show(self):
+        self.is_visible = True
+        self.image = self.image_orig
+        self.rect = self.image.get_rect(center=(round(self.pos.x), round(self.pos.y)))
+        self.appear_time = frame_state.get_ticks()
+        self.expire_timer = timer_wheel.call_later(self.life_time + 1, self.kill)
+
+    def kill(self):
+        timer_wheel.cancel(self.show_timer)
+        timer_wheel.cancel(self.expire_timer)
+        super().kill()
 
     def update(self, dt):
-        current_time = pygame.time.get_ticks()
-        
         if not self.is_visible:
-            # 遅延待機中
-            if current_time - self.start_time >= self.delay:
-                self.is_visible = True
-                self.image = self.image_orig
-                self.rect = self.image.get_rect(center=(round(self.pos.x), round(self.pos.y)))
-                self.appear_time = current_time
+            # 遅延待機中 (ホイールが無い時だけ時刻を比べる)
+            if self.show_timer is None and frame_state.get_ticks() - self.start_time >= self.delay:
+                self.show()
         else:
             # 表示中
             # 上に昇る
             self.pos.y -= 1 * (dt * 60)
             self.rect.center = (round(self.pos.x), round(self.pos.y))
             
-            # 寿命チェック
-            if current_time - self.appear_time > self.life_time:
+            # 寿命チェック (ホイールが無い時だけ)
+            if self.expire_timer is None and frame_state.get_ticks() - self.appear_time > self.life_time:
                 self.kill()
 
 class SpinningBullet(Bullet):
@@ -131,7 +148,7 @@ class PlayerLaser(pygame.sprite.Sprite):
         self.damage = damage
         self.enemy_group = enemy_group
         self.duration = duration
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = frame_state.get_ticks()
         self.hit_enemies = set()
 
         self.angle_vec = angle_vec.normalize()
@@ -148,13 +165,17 @@ class PlayerLaser(pygame.sprite.Sprite):
         
         center_offset = self.angle_vec * (length / 2)
         self.rect.center = self.owner.rect.center + center_offset
-        self.mask = pygame.mask.from_surface(self.image)
+
+        # 当たり判定はマスクを使わず、ビームを「線分 + 半径」(カプセル) として計算する
+        # (Surface は描画専用)
+        self.length = length
+        self.half_width = width / 2
 
     def update(self, dt):
         # 現在時刻を取得
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
 
-        length = self.image_orig.get_width()
+        length = self.length
         center_offset = self.angle_vec * (length / 2)
         self.rect.center = self.owner.rect.center + center_offset
 
@@ -163,12 +184,32 @@ class PlayerLaser(pygame.sprite.Sprite):
             self.kill()
             return
 
-        hits = pygame.sprite.spritecollide(self, self.enemy_group, False)
-        for enemy in hits:
-            if enemy not in self.hit_enemies:
-                if pygame.sprite.collide_mask(self, enemy):
-                    enemy.take_damage(self.damage)
-                    self.hit_enemies.add(enemy)
+        # ビームの始点と向き
+        ox, oy = self.owner.rect.center
+        dx, dy = self.angle_vec.x, self.angle_vec.y
+        ex, ey = ox + dx * length, oy + dy * length
+
+        # ブロードフェーズ: ビームを囲む矩形の近くにいる敵だけ調べる
+        hw = self.half_width
+        bounds = pygame.Rect(min(ox, ex) - hw, min(oy, ey) - hw, abs(ex - ox) + hw * 2, abs(ey - oy) + hw * 2)
+        if hasattr(self.enemy_group, "query_rect"):
+            candidates = self.enemy_group.query_rect(bounds)
+        else:
+            candidates = self.enemy_group.sprites()
+
+        for enemy in candidates:
+            if enemy in self.hit_enemies:
+                continue
+            ex_, ey_ = enemy.rect.center
+            # 敵の中心からビームの線分までの最短距離
+            t = (ex_ - ox) * dx + (ey_ - oy) * dy
+            t = max(0.0, min(length, t))
+            cx = ox + dx * t - ex_
+            cy = oy + dy * t - ey_
+            reach = hw + getattr(enemy, "radius", 0)
+            if cx * cx + cy * cy <= reach * reach:
+                enemy.take_damage(self.damage)
+                self.hit_enemies.add(enemy)
 
 # ==========================================
 # くま爆弾クラス
@@ -182,14 +223,21 @@ class BearBomb(pygame.sprite.Sprite):
         self.image = image
         self.rect = self.image.get_rect(center=self.pos)
         
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = frame_state.get_ticks()
         self.fuse_time = fuse_time
         self.explosion_radius = blast_radius
+        # 信管はタイマーホイールで (置いてある間は毎フレームの処理なし)
+        self.fuse_timer = timer_wheel.call_later(fuse_time, self.explode)
+
+    def kill(self):
+        timer_wheel.cancel(self.fuse_timer)
+        super().kill()
 
     def update(self, dt):
-        now = pygame.time.get_ticks()
-        if now - self.spawn_time >= self.fuse_time:
-            self.explode()
+        if self.fuse_timer is None:
+            now = frame_state.get_ticks()
+            if now - self.spawn_time >= self.fuse_time:
+                self.explode()
 
     def explode(self):
         # 爆発範囲の判定用スプライト
@@ -217,10 +265,40 @@ class Weapon:
         self.level = 1
         self.name = "Unknown"
         self.last_attack_time = 0
+        # クールダウンごとに attack() する武器の次の攻撃 (タイマーホイールが無ければ None)
+        self.attack_timer = None
 
     def update(self, current_time):
         pass
 
+    # --- クールダウン (self.cooldown ミリ秒ごとに attack() を呼ぶ武器用) ---
+    # タイマーホイールがあれば、期限のフレームに _on_cooldown が呼ばれるだけで update では何もしません。
+    # 無い時 (call_later が None) は update_cooldown で今までどおり時刻を比べます。
+    def start_cooldown(self):
+        """__init__ の最後に呼ぶ (last_attack_time + cooldown に最初の攻撃を登録)"""
+        delay = self.last_attack_time + self.cooldown - frame_state.get_ticks()
+        self.attack_timer = timer_wheel.call_later(delay, self._on_cooldown)
+
+    def _on_cooldown(self):
+        self.attack()
+        self.last_attack_time = frame_state.get_ticks()
+        self.attack_timer = timer_wheel.call_later(self.cooldown, self._on_cooldown)
+
+    def update_cooldown(self, current_time):
+        if self.attack_timer is None and current_time - self.last_attack_time >= self.cooldown:
+            self.attack()
+            self.last_attack_time = current_time
+
+    def set_cooldown(self, cooldown):
+        """クールダウンを変える (登録済みの次の攻撃も last_attack_time + cooldown に付け替える)"""
+        self.cooldown = cooldown
+        if self.attack_timer is not None:
+            self.attack_timer.cancel()
+            self.start_cooldown()
+
+    def attack(self):
+        pass
+
     def upgrade(self):
         self.level += 1
         print(f"{self.name} Leveled Up! -> Lv.{self.level}")
@@ -231,7 +309,7 @@ class Weapon:
 class WoodenStick(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["stick"]
+        stats = game_data.WEAPONS["stick"]
         self.name = stats["name"]
         self.damage = stats["damage"]
         self.cooldown = stats["cooldown"]
@@ -239,15 +317,18 @@ class WoodenStick(Weapon):
         self.spin_speed = stats.get("spin_speed", 15)
         
         self.image = load_weapon_image("stick")
+        self.start_cooldown()
 
     def update(self, current_time):
-        if current_time - self.last_attack_time >= self.cooldown:
-            self.shoot()
-            self.last_attack_time = current_time
+        self.update_cooldown(current_time)
+
+    def attack(self):
+        self.shoot()
 
     def shoot(self):
-        mouse_pos = Vector2(pygame.mouse.get_pos())
-        screen_center = Vector2(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2)
+        mouse_pos = Vector2(frame_state.get_mouse_pos())
+        # マウスはウィンドウの座標 (プレイヤーは内部解像度で描いていてもウィンドウの中央に映る)
+        screen_center = Vector2(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT // 2)
         
         direction = mouse_pos - screen_center
         
@@ -269,7 +350,7 @@ class WoodenStick(Weapon):
             
     def upgrade(self):
         super().upgrade()
-        self.cooldown = max(200, self.cooldown - 50)
+        self.set_cooldown(max(200, self.cooldown - 50))
         self.damage += 2
 
 # ==========================================
@@ -278,22 +359,24 @@ class WoodenStick(Weapon):
 class PencilGun(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["pencil"]
+        stats = game_data.WEAPONS["pencil"]
         self.name = stats["name"]
         self.damage = stats["damage"]
         self.cooldown = stats["cooldown"]
         self.bullet_speed = stats.get("speed", 600)
         
         self.bullet_image = load_weapon_image("pencil")
+        self.start_cooldown()
 
     def update(self, current_time):
-        if current_time - self.last_attack_time >= self.cooldown:
-            self.shoot()
-            self.last_attack_time = current_time
+        self.update_cooldown(current_time)
+
+    def attack(self):
+        self.shoot()
 
     def shoot(self):
-        mouse_pos = Vector2(pygame.mouse.get_pos())
-        screen_center = Vector2(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2)
+        mouse_pos = Vector2(frame_state.get_mouse_pos())
+        screen_center = Vector2(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT // 2)
         
         direction = mouse_pos - screen_center
         
@@ -314,7 +397,7 @@ class PencilGun(Weapon):
     
     def upgrade(self):
         super().upgrade()
-        self.cooldown = max(100, self.cooldown - 50)
+        self.set_cooldown(max(100, self.cooldown - 50))
         self.damage += int(self.damage * 0.2) 
 
 # ==========================================
@@ -323,7 +406,7 @@ class PencilGun(Weapon):
 class BreadShield(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["bread"]
+        stats = game_data.WEAPONS["bread"]
         self.name = stats["name"]
         self.damage = stats["damage"]
         self.radius = stats["radius"]
@@ -372,18 +455,20 @@ class BreadShield(Weapon):
 class BearSmash(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["bear"]
+        stats = game_data.WEAPONS["bear"]
         self.name = stats["name"]
         self.damage = stats["damage"]
         self.cooldown = stats["cooldown"]
         self.fuse_time = stats["fuse_time"]
         self.blast_radius = stats["blast_radius"]
         self.image = load_weapon_image("bear")
+        self.start_cooldown()
 
     def update(self, current_time):
-        if current_time - self.last_attack_time >= self.cooldown:
-            self.smash()
-            self.last_attack_time = current_time
+        self.update_cooldown(current_time)
+
+    def attack(self):
+        self.smash()
 
     def smash(self):
         offset = 60
@@ -395,7 +480,7 @@ class BearSmash(Weapon):
 
     def upgrade(self):
         super().upgrade()
-        self.cooldown = max(500, self.cooldown - 100)
+        self.set_cooldown(max(500, self.cooldown - 100))
         self.damage += 10
 
 
@@ -407,17 +492,20 @@ class BearSmash(Weapon):
 class ThunderStaff(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["thunder"]
+        stats = game_data.WEAPONS["thunder"]
         self.name = stats["name"]
         self.damage = stats["damage"]
         
         self.radius = stats["radius"] # この半径が攻撃＆回収範囲になる
         self.stun_duration = stats.get("stun_duration", 200)
+        self.ring_frame_count = stats.get("ring_frames", 8)
         
+        # ビリビリ円は半径ごとに数枚だけ描いておき、毎フレーム順番に切り替える
+        self.build_ring_frames()
+
         # バリア表示用のスプライトを1つだけ作る
         self.barrier_sprite = pygame.sprite.Sprite()
-        size = int(self.radius * 2 + 40)
-        self.barrier_sprite.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.barrier_sprite.image = self.ring_frames[0]
         self.barrier_sprite.rect = self.barrier_sprite.image.get_rect()
         self.barrier_sprite.rect.center = self.owner.pos
         
@@ -427,8 +515,9 @@ class ThunderStaff(Weapon):
         # 1. バリアの位置をプレイヤーに追従させる
         self.barrier_sprite.rect.center = self.owner.rect.center
         
-        # 2. ビリビリ円のアニメーション描画
-        self.draw_electric_ring(self.barrier_sprite)
+        # 2. ビリビリ円のアニメーション (作成済みのフレームを切り替えるだけ)
+        self.ring_index = (self.ring_index + 1) % len(self.ring_frames)
+        self.barrier_sprite.image = self.ring_frames[self.ring_index]
 
         # 3. 攻撃＆スタン判定
         self.barrier_sprite.radius = self.radius
@@ -441,11 +530,21 @@ class ThunderStaff(Weapon):
         # 4. アイテム収集
         self.collect_items()
 
-    def draw_electric_ring(self, sprite):
+    def build_ring_frames(self):
+        """現在の半径でビリビリ円のフレームを ring_frame_count 枚作る"""
+        size = int(self.radius * 2 + 40)
+        self.ring_frames = []
+        for _ in range(max(1, self.ring_frame_count)):
+            surf = pygame.Surface((size, size), pygame.SRCALPHA)
+            self.draw_electric_ring(surf)
+            self.ring_frames.append(surf)
+        self.ring_index = 0
+
+    def draw_electric_ring(self, surface):
         """プレイヤーを中心としたビリビリした円環を描画する"""
-        w, h = sprite.image.get_size()
+        w, h = surface.get_size()
         center = (w // 2, h // 2)
-        sprite.image.fill((0, 0, 0, 0))
+        surface.fill((0, 0, 0, 0))
         
         color_core = (255, 255, 255)
         color_glow = (100, 200, 255)
@@ -464,33 +563,26 @@ class ThunderStaff(Weapon):
         points.append(points[0])
         
         if len(points) > 2:
-            pygame.draw.lines(sprite.image, color_glow, False, points, 5)
-            pygame.draw.lines(sprite.image, color_core, False, points, 2)
+            pygame.draw.lines(surface, color_glow, False, points, 5)
+            pygame.draw.lines(surface, color_core, False, points, 2)
 
     def collect_items(self):
         if not hasattr(self.owner, "items_group"): return
         
-        for item in self.owner.items_group:
-            dist_vec = self.owner.pos - Vector2(item.rect.center)
-            distance = dist_vec.length()
-            
-            # ★修正: 攻撃範囲(self.radius)と同じ範囲で吸い寄せる
-            if distance <= self.radius:
-                if distance > 10: 
-                    dir = dist_vec.normalize()
-                    item.rect.centerx += dir.x * 20
-                    item.rect.centery += dir.y * 20
+        # ★修正: 攻撃範囲(self.radius)と同じ範囲で吸い寄せる
+        # (実際の移動は ItemGroup.step で他のアイテム処理と一緒に行う)
+        self.owner.items_group.request_pull(self.radius, 20)
 
     def upgrade(self):
         super().upgrade()
         self.radius += 20         # 範囲拡大
         self.damage += 1
         
-        # スプライト再生成
+        # 新しい半径でフレームとスプライトを作り直す
+        self.build_ring_frames()
         self.all_sprites.remove(self.barrier_sprite)
         self.barrier_sprite = pygame.sprite.Sprite()
-        size = int(self.radius * 2 + 40)
-        self.barrier_sprite.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.barrier_sprite.image = self.ring_frames[0]
         self.barrier_sprite.rect = self.barrier_sprite.image.get_rect()
         self.barrier_sprite.rect.center = self.owner.pos
         self.all_sprites.add(self.barrier_sprite)
@@ -501,22 +593,27 @@ class ThunderStaff(Weapon):
 class IceCream(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["ice"]
+        stats = game_data.WEAPONS["ice"]
         self.name = stats["name"]
         self.heal_amount = stats["heal_amount"]
         self.cooldown = stats["cooldown"]
         self.image = load_weapon_image("ice")
         
-        self.last_attack_time = pygame.time.get_ticks()
+        self.last_attack_time = frame_state.get_ticks()
+        self.start_cooldown()
 
     def update(self, current_time):
-        if current_time - self.last_attack_time >= self.cooldown:
-            self.heal()
-            self.last_attack_time = current_time
+        self.update_cooldown(current_time)
+
+    def attack(self):
+        self.heal()
 
     def heal(self):
         if self.owner.hp < self.owner.max_hp:
             self.owner.hp = min(self.owner.hp + self.heal_amount, self.owner.max_hp)
+            bus = getattr(self.owner, "events", None)
+            if bus is not None:
+                bus.push(events.HEAL, "milk", self.heal_amount, self.owner.rect.centerx, self.owner.rect.centery)
             
             # ★修正: 演出の追加
             # 1. ミルクの画像をプレイヤーの頭上に表示（1秒間）
@@ -533,7 +630,7 @@ class IceCream(Weapon):
     def upgrade(self):
         super().upgrade()
         self.heal_amount += 10
-        self.cooldown = max(10000, self.cooldown - 2000)
+        self.set_cooldown(max(10000, self.cooldown - 2000))
 
 # ==========================================
 # Tier 2: レーザーキャノン (LaserCannon)
@@ -541,7 +638,7 @@ class IceCream(Weapon):
 class LaserCannon(Weapon):
     def __init__(self, owner, enemy_group, all_sprites, bullets_group):
         super().__init__(owner, enemy_group, all_sprites, bullets_group)
-        stats = config.WEAPON_STATS["drill"]
+        stats = game_data.WEAPONS["drill"]
         self.name = stats["name"]
         self.damage = stats["damage"]
         self.cooldown = stats["cooldown"]
@@ -551,15 +648,17 @@ class LaserCannon(Weapon):
         self.duration = stats.get("duration", 500)
         
         self.image = load_weapon_image("drill")
+        self.start_cooldown()
 
     def update(self, current_time):
-        if current_time - self.last_attack_time >= self.cooldown:
-            self.shoot()
-            self.last_attack_time = current_time
+        self.update_cooldown(current_time)
+
+    def attack(self):
+        self.shoot()
 
     def shoot(self):
-        mouse_pos = Vector2(pygame.mouse.get_pos())
-        screen_center = Vector2(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2)
+        mouse_pos = Vector2(frame_state.get_mouse_pos())
+        screen_center = Vector2(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT // 2)
         direction = mouse_pos - screen_center
         
         if direction.length() > 0:
@@ -578,4 +677,4 @@ class LaserCannon(Weapon):
         super().upgrade()
         self.damage += 50
         self.width += 20
-        self.cooldown = max(5000, self.cooldown - 1000)
\ No newline at end of file
+        self.set_cooldown(max(5000, self.cooldown - 1000))
\ No newline at end of file
@@ -36,8 +36,8 @@ class GameClearScreen:
         title_text = self.title_font.render("GAME CLEAR!!", True, (255, 255, 0)) # 黄色
         msg_text = self.msg_font.render("Press Enter to Title", True, (255, 255, 255))
         
-        title_rect = title_text.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2 - 50))
-        msg_rect = msg_text.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2 + 50))
+        title_rect = title_text.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT // 2 - 50))
+        msg_rect = msg_text.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT // 2 + 50))
         
         screen.blit(title_text, title_rect)
         screen.blit(msg_text, msg_rect)
\ No newline at end of file
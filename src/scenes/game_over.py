@@ -17,7 +17,7 @@ class GameOverScreen:
         self.selected_index = 0
         
         self.title_surf = self.title_font.render("GAME OVER", True, config.GAME_OVER_TEXT_COLOR)
-        self.title_rect = self.title_surf.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 3))
+        self.title_rect = self.title_surf.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT // 3))
 
     def update(self, dt):
         pass
@@ -55,10 +55,10 @@ class GameOverScreen:
 
     # ★追加: ホバー判定用メソッド
     def check_mouse_hover(self, mouse_pos):
-        base_y = config.SCREEN_HEIGHT * 2 // 3
+        base_y = config.DISPLAY_HEIGHT * 2 // 3
         opt_width = 200
         spacing = 300
-        start_x = (config.SCREEN_WIDTH - (len(self.options) * opt_width + (len(self.options) - 1) * spacing)) // 2
+        start_x = (config.DISPLAY_WIDTH - (len(self.options) * opt_width + (len(self.options) - 1) * spacing)) // 2
 
         for i, option in enumerate(self.options):
             opt_x = start_x + i * (opt_width + spacing)
@@ -68,10 +68,10 @@ class GameOverScreen:
                 self.selected_index = i
 
     def check_mouse_click(self, mouse_pos):
-        base_y = config.SCREEN_HEIGHT * 2 // 3
+        base_y = config.DISPLAY_HEIGHT * 2 // 3
         opt_width = 200
         spacing = 300
-        start_x = (config.SCREEN_WIDTH - (len(self.options) * opt_width + (len(self.options) - 1) * spacing)) // 2
+        start_x = (config.DISPLAY_WIDTH - (len(self.options) * opt_width + (len(self.options) - 1) * spacing)) // 2
 
         for i, option in enumerate(self.options):
             opt_x = start_x + i * (opt_width + spacing)
@@ -89,10 +89,10 @@ class GameOverScreen:
         screen.blit(shadow_surf, self.title_rect.move(-4, -4))
         screen.blit(self.title_surf, self.title_rect)
         
-        base_y = config.SCREEN_HEIGHT * 2 // 3
+        base_y = config.DISPLAY_HEIGHT * 2 // 3
         opt_width = 200
         spacing = 300
-        start_x = (config.SCREEN_WIDTH - (len(self.options) * opt_width + (len(self.options) - 1) * spacing)) // 2
+        start_x = (config.DISPLAY_WIDTH - (len(self.options) * opt_width + (len(self.options) - 1) * spacing)) // 2
         
         for i, option in enumerate(self.options):
             color = config.GAME_OVER_SELECT_COLOR if i == self.selected_index else config.GAME_OVER_OPTION_COLOR
@@ -2,9 +2,13 @@
 import pygame
 import random
 import time
+import heapq
+import operator
+from collections import deque
 import config
 from src.entities.player import Player
 from src.entities.enemy import Enemy
+from src.system import frame_state, timer_wheel, texture_renderer
 from src.entities.weapons import (
     PencilGun, BreadShield, BearSmash, WoodenStick,
     ThunderStaff, IceCream, LaserCannon,
@@ -29,7 +33,7 @@ class FloatingText(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(center=pos)
         self.pos = pygame.math.Vector2(pos)
         self.vel = pygame.math.Vector2(0, -50)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = frame_state.get_ticks()
         self.lifetime = 1200 
 
     def render_text_with_shadow(self, text, font, color):
@@ -45,13 +49,22 @@ class FloatingText(pygame.sprite.Sprite):
     def update(self, dt):
         self.pos += self.vel * dt
         self.rect.center = (round(self.pos.x), round(self.pos.y))
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if frame_state.get_ticks() - self.spawn_time > self.lifetime:
             self.kill()
 
 # ==========================================
 # カメラ＆描画管理クラス
 # ==========================================
+# 奥行き (Yソート) のキー
+_depth_key = operator.attrgetter("rect.centery")
+
+
 class CameraGroup(pygame.sprite.Group):
+    # 描画は2つの層を合わせて Y 順にする
+    #   静的な層: チャンクの障害物。読み込んだ時にチャンクごとに centery 順に並べておき、
+    #            チャンクが入れ替わった時だけ全体の並びを作り直す (毎フレームは並べない)
+    #   動的な層: それ以外 (プレイヤー・敵・弾・テキストなど)。前フレームの並びを持ち越して
+    #            並べ直すので、ほぼ整列済みの list.sort になる (少し動いただけなら O(n) に近い)
     def __init__(self):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
@@ -59,81 +72,200 @@ class CameraGroup(pygame.sprite.Group):
         self.margin = 100 
         self.debug_mode = False 
 
+        # メンバーの出入りの回数 (リーク確認用、membership() で取る)
+        self.added_count = 0
+        self.removed_count = 0
+        # MapGenerator のチャンク通知で登録した障害物
+        self.chunk_registered = 0
+        self.chunk_unregistered = 0
+
+        # 静的な層
+        self.static_chunks = {}     # chunk_coord -> centery 順の障害物
+        self.static_sprites = set()
+        self.static_sorted = []     # 読み込み済みチャンク全体を centery 順に
+        self.static_dirty = False
+        # 動的な層
+        self.dynamic_order = []     # 前フレームの並び
+        self.dynamic_new = []       # 前フレームの後に入ったスプライト
+        self.dynamic_removed = False
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.added_count += 1
+        if sprite not in self.static_sprites:
+            self.dynamic_new.append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.removed_count += 1
+        if sprite in self.static_sprites:
+            # チャンク通知以外で外された障害物 (並びは次の描画で作り直す)
+            self.static_sprites.discard(sprite)
+            self.static_dirty = True
+        else:
+            self.dynamic_removed = True
+
+    # --- チャンク通知 (MapGenerator.add_chunk_listener に渡す) ---
+    # 障害物は読み込まれた時に1回だけ登録し、破棄される時に外す (装飾は custom_draw に別で渡す)
+    def chunk_loaded(self, chunk_coord, obstacles, decorations):
+        self.static_chunks[chunk_coord] = sorted(obstacles, key=_depth_key)
+        self.static_sprites.update(obstacles)
+        self.static_dirty = True
+        self.add(obstacles)
+        self.chunk_registered += len(obstacles)
+
+    def chunk_unloaded(self, chunk_coord, obstacles, decorations):
+        self.static_chunks.pop(chunk_coord, None)
+        self.remove(obstacles)
+        self.static_sprites.difference_update(obstacles)
+        self.static_dirty = True
+        self.chunk_unregistered += len(obstacles)
+
+    # --- 描画順 ---
+    def _static_layer(self):
+        if self.static_dirty:
+            members = self.spritedict
+            merged = heapq.merge(*self.static_chunks.values(), key=_depth_key)
+            self.static_sorted = [s for s in merged if s in members]
+            self.static_dirty = False
+        return self.static_sorted
+
+    def _dynamic_layer(self):
+        order = self.dynamic_order
+        members = self.spritedict
+        # 同じフレームで外して入れ直したスプライトは新しい方だけ残す
+        new = dict.fromkeys(s for s in self.dynamic_new if s in members)
+        # 入ってすぐ外れたスプライトしか無くても (new が空でも) 毎フレーム空にする
+        self.dynamic_new = []
+        if self.dynamic_removed:
+            order = [s for s in order if s in members and s not in new]
+            self.dynamic_removed = False
+        if new:
+            order.extend(new)
+        order.sort(key=_depth_key)
+        self.dynamic_order = order
+        return order
+
+    def depth_sorted(self, camera_rect):
+        """camera_rect に入るスプライトを centery 順に (同じ高さなら静的な層が先)"""
+        collide = camera_rect.colliderect
+        static = [s for s in self._static_layer() if collide(s.rect)]
+        dynamic = [s for s in self._dynamic_layer() if collide(s.rect)]
+        if not static:
+            return dynamic
+
+        merged = []
+        i = j = 0
+        ns, nd = len(static), len(dynamic)
+        while i < ns and j < nd:
+            if dynamic[j].rect.centery < static[i].rect.centery:
+                merged.append(dynamic[j])
+                j += 1
+            else:
+                merged.append(static[i])
+                i += 1
+        merged.extend(static[i:])
+        merged.extend(dynamic[j:])
+        return merged
+
+    def membership(self):
+        """
+        出入りの回数と今の数。chunk_live と障害物グループの数がずれていたら、
+        破棄したチャンクの障害物が残っている (または登録漏れ)
+        """
+        return {
+            "live": len(self),
+            "added": self.added_count,
+            "removed": self.removed_count,
+            "chunk_registered": self.chunk_registered,
+            "chunk_unregistered": self.chunk_unregistered,
+            "chunk_live": self.chunk_registered - self.chunk_unregistered,
+        }
+
+    def view_rect(self):
+        """描画対象にする範囲 (ワールド座標、画面 + margin)"""
+        return pygame.Rect(
+            self.offset.x - self.margin, 
+            self.offset.y - self.margin, 
+            config.SCREEN_WIDTH + self.margin * 2, 
+            config.SCREEN_HEIGHT + self.margin * 2
+        )
+
     def custom_draw(self, player, background_color, decorations):
         self.offset.x = player.rect.centerx - config.SCREEN_WIDTH // 2
         self.offset.y = player.rect.centery - config.SCREEN_HEIGHT // 2
         
         self.display_surface.fill(background_color)
         
-        camera_rect = pygame.Rect(
-            self.offset.x - self.margin, 
-            self.offset.y - self.margin, 
-            config.SCREEN_WIDTH + self.margin * 2, 
-            config.SCREEN_HEIGHT + self.margin * 2
-        )
+        camera_rect = self.view_rect()
 
         for sprite in decorations:
             if camera_rect.colliderect(sprite.rect): 
                 offset_pos = sprite.rect.topleft - self.offset
                 self.display_surface.blit(sprite.image, offset_pos)
 
-        # 通常スプライトとFloatingTextをYソートしつつ描画
-        for sprite in sorted(self.sprites(), key=lambda s: s.rect.centery):
-            if camera_rect.colliderect(sprite.rect): 
-                offset_pos = sprite.rect.topleft - self.offset
-                
-                # FloatingTextは透過処理しない
-                if isinstance(sprite, FloatingText):
-                     self.display_surface.blit(sprite.image, offset_pos)
-                     continue
-
-                # 半透明処理
-                if sprite != player and sprite.rect.centery > player.rect.centery:
-                    if sprite.rect.colliderect(player.rect.inflate(10, 10)):
-                        sprite.image.set_alpha(100)
-                        self.display_surface.blit(sprite.image, offset_pos)
-                        sprite.image.set_alpha(255)
-                    else:
-                        self.display_surface.blit(sprite.image, offset_pos)
+        # 通常スプライトとFloatingTextをYソートしつつ描画 (静的な層と動的な層を合わせた順)
+        for sprite in self.depth_sorted(camera_rect):
+            offset_pos = sprite.rect.topleft - self.offset
+            
+            # FloatingTextは透過処理しない
+            if isinstance(sprite, FloatingText):
+                 self.display_surface.blit(sprite.image, offset_pos)
+                 continue
+
+            # 半透明処理
+            if sprite != player and sprite.rect.centery > player.rect.centery:
+                if sprite.rect.colliderect(player.rect.inflate(10, 10)):
+                    sprite.image.set_alpha(100)
+                    self.display_surface.blit(sprite.image, offset_pos)
+                    sprite.image.set_alpha(255)
                 else:
                     self.display_surface.blit(sprite.image, offset_pos)
+            else:
+                self.display_surface.blit(sprite.image, offset_pos)
 
-                # デバッグ表示
-                if self.debug_mode and hasattr(sprite, 'hitbox'):
-                    hitbox_rect = sprite.hitbox.copy()
-                    hitbox_rect.topleft -= self.offset
-                    pygame.draw.rect(self.display_surface, (255, 0, 0), hitbox_rect, 1)
+            # デバッグ表示
+            if self.debug_mode and hasattr(sprite, 'hitbox'):
+                hitbox_rect = sprite.hitbox.copy()
+                hitbox_rect.topleft -= self.offset
+                texture_renderer.draw_rect(self.display_surface, (255, 0, 0), hitbox_rect, 1)
 
 # ==========================================
 # ダメージ等のフローティングテキストクラス（追加）
 # ==========================================
 class FloatingText(pygame.sprite.Sprite):
+    # フォントは全インスタンスで共有 (1個ごとに Font を作ると重い)
+    _font = None
+    # 浮き上がる向きの揺らぎ用の乱数 (見た目だけなので、ゲームの乱数 random とは分ける。
+    # 表示数が変わってもモブの出現などの展開が変わらないように)
+    _jitter = random.Random(0)
+
     def __init__(self, pos, text, color=(255, 255, 255), duration=1000):
         super().__init__()
         # フォント設定（configにパスがあれば使用、なければデフォルト）
-        try:
-            self.font = pygame.font.Font(config.FONT_PATH, 24)
-        except:
-            self.font = pygame.font.SysFont(None, 24)
-            
-        # テキストの描画（視認性を高めるため、黒い縁取りまたは影を付ける）
-        self.image_original = self.font.render(str(text), True, color)
-        self.image_shadow = self.font.render(str(text), True, (0, 0, 0))
-        
-        width = self.image_original.get_width() + 2
-        height = self.image_original.get_height() + 2
-        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
-        self.image.blit(self.image_shadow, (2, 2)) # 影を少しずらして描画
-        self.image.blit(self.image_original, (0, 0)) # 本体を描画
-        
+        if FloatingText._font is None:
+            try:
+                FloatingText._font = pygame.font.Font(config.FONT_PATH, 24)
+            except:
+                FloatingText._font = pygame.font.SysFont(None, 24)
+        self.font = FloatingText._font
+        self.color = color
+
+        self.render(text)
         self.rect = self.image.get_rect(center=pos)
         self.pos = pygame.math.Vector2(pos)
         # 上方向へ少しランダムに浮き上がる動き
-        self.vel = pygame.math.Vector2(random.uniform(-1, 1), -2)
+        self.vel = pygame.math.Vector2(FloatingText._jitter.uniform(-1, 1), -2)
         
         self.duration = duration
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = frame_state.get_ticks()
         self.alpha = 255
+        # 寿命はタイマーホイールで (無ければ update で時刻を比べる)
+        self.expire_timer = timer_wheel.call_later(duration + 1, self.kill)
+
+    def kill(self):
+        timer_wheel.cancel(self.expire_timer)
+        super().kill()
 
     def update(self, dt):
         # 位置の更新
@@ -141,13 +273,90 @@ class FloatingText(pygame.sprite.Sprite):
         self.rect.center = (round(self.pos.x), round(self.pos.y))
         
         # フェードアウト処理
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         elapsed = current_time - self.start_time
         
         if elapsed > self.duration:
-            self.kill()
+            if self.expire_timer is None:
+                self.kill()
         elif elapsed > self.duration * 0.7:
             # 寿命の残り30%でフェードアウト
             fade_ratio = 1.0 - ((elapsed - self.duration * 0.7) / (self.duration * 0.3))
             self.alpha = int(255 * fade_ratio)
             self.image.set_alpha(self.alpha)
+
+    def render(self, text):
+        # テキストの描画（視認性を高めるため、黒い縁取りまたは影を付ける）
+        self.image_original = self.font.render(str(text), True, self.color)
+        self.image_shadow = self.font.render(str(text), True, (0, 0, 0))
+        
+        width = self.image_original.get_width() + 2
+        height = self.image_original.get_height() + 2
+        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.image.blit(self.image_shadow, (2, 2)) # 影を少しずらして描画
+        self.image.blit(self.image_original, (0, 0)) # 本体を描画
+
+    def set_text(self, text):
+        """表示中の文字を変える (位置・寿命はそのまま)"""
+        self.render(text)
+        self.rect = self.image.get_rect(center=self.rect.center)
+
+
+# ==========================================
+# ダメージ数字のまとめ表示と、テキスト数の上限
+# ==========================================
+# 同じ敵への連続ヒットは window_ms の間1つの数字に足し込み (数字は浮き上がり続ける)、
+# このクラスから出したテキストが max_texts を超えたら古いものから消します。
+# 武器の数や種類に関係なく、画面上のテキストの数が一定以下に収まります。
+class DamageNumbers:
+    def __init__(self, camera_group):
+        self.camera_group = camera_group
+        settings = config.DAMAGE_TEXT
+        self.window = settings.get("window_ms", 300)
+        self.max_texts = settings.get("max_texts", 80)
+        self.show_weapon_damage = settings.get("show_weapon_damage", False)
+
+        # 敵 -> [テキスト, 合計ダメージ, まとめる期限]
+        self.active = {}
+        # 合計が変わって描き直しが必要な敵 (refresh でまとめて描き直す)
+        self.changed = set()
+        # 出したテキスト (古い順)
+        self.live = deque()
+        self.dropped = 0
+
+    def spawn(self, pos, text, color=(255, 255, 255), duration=1000):
+        live = self.live
+        while live and not live[0].alive():
+            live.popleft()
+        while len(live) >= self.max_texts:
+            live.popleft().kill()
+            self.dropped += 1
+        floating = FloatingText(pos, text, color, duration)
+        self.camera_group.add(floating)
+        live.append(floating)
+        return floating
+
+    def add_damage(self, target, amount, pos, color=(255, 255, 0)):
+        now = frame_state.get_ticks()
+        entry = self.active.get(target)
+        if entry is not None and now < entry[2] and entry[0].alive():
+            entry[1] += amount
+            self.changed.add(target)
+            return
+        floating = self.spawn(pos, amount, color)
+        self.active[target] = [floating, amount, now + self.window]
+
+    def refresh(self):
+        """合計が変わった数字を描き直す (同じフレームに何回当たっても1回だけ)"""
+        for target in self.changed:
+            entry = self.active.get(target)
+            if entry is not None and entry[0].alive():
+                entry[0].set_text(entry[1])
+        self.changed.clear()
+
+    def prune(self):
+        """まとめる期限が切れた敵を忘れる (フレームに1回)"""
+        now = frame_state.get_ticks()
+        expired = [target for target, entry in self.active.items() if now >= entry[2]]
+        for target in expired:
+            del self.active[target]
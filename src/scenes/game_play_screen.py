@@ -1,6 +1,5 @@
 import pygame
 import random
-import time
 import config
 import math
 
@@ -20,10 +19,23 @@ from src.entities.items import (
 from src.system.db_manager import DBManager
 from src.system.evolution import EvolutionManager
 from src.system.map_generator import MapGenerator
+from src.system.flow_field import FlowField
+from src.system import game_data
+from src.system.memory_stats import MemoryTelemetry
+from src.system.events import EventBus
+from src.system.timer_wheel import TimerWheel
+from src.system import timer_wheel
+from src.system import render_target
+from src.system import texture_renderer
+from src.system import events
+from src.system.spatial_grid import SpatialGroup
+from src.system.item_system import ItemGroup
+from src.system import frame_state
 from src.scenes.game_play import CameraGroup
-from src.scenes.game_play import FloatingText
+from src.scenes.game_play import FloatingText, DamageNumbers
+from src.scenes.hud import HudLayer, WeaponSlotRenderer
 from src.entities.grave import GraveFlower
-from src.entities.enemy_projectile import EnemyProjectile
+from src.entities.enemy_projectile import ProjectileField
 
 AGGRO_PHRASES = ["Ouch!", "Hey!", "Stop it!", "No!", "Why!", "It hurts!", "Watch out!"]
 
@@ -55,10 +67,10 @@ class GameplayScreen:
         self.spawn_interval = 800
         self.last_damage_time = 0
         self.enemies_group = pygame.sprite.Group()
-        self.enemy_bullets = pygame.sprite.Group()
+        self.enemy_bullets = ProjectileField()
 
         # ★追加: ゲーム開始時刻とボス管理
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = frame_state.get_ticks()
         self.active_boss = None
         self.spawned_boss_minutes = set() # すでに出現させた時間を記録
 
@@ -74,22 +86,46 @@ class GameplayScreen:
 
         self.camera_group = CameraGroup()
         self.bullets_group = pygame.sprite.Group()
-        self.enemies_group = pygame.sprite.Group()
+        # 敵はグリッドで近傍検索できるグループにする (毎フレーム rebuild_grid する)
+        self.enemies_group = SpatialGroup()
+        Enemy.configure_lod()
+        # 寿命・信管・スタン解除のタイマー (期限が来たものだけ update_world の最初に呼ぶ)
+        self.timers = TimerWheel()
+        timer_wheel.set_active(self.timers)
         self.obstacles = pygame.sprite.Group()
         self.decorations = pygame.sprite.Group()
-        self.items_group = pygame.sprite.Group()
+        self.items_group = ItemGroup()
 
         self.map_gen = MapGenerator(self.biome)
         self.map_gen.setup(self.obstacles, self.decorations)
+        # 障害物はチャンクの読み込み・破棄の時だけカメラに出し入れする
+        self.map_gen.add_chunk_listener(self.camera_group.chunk_loaded, self.camera_group.chunk_unloaded)
+        # 敵の追跡経路 (全モブで共有)
+        self.flow_field = FlowField(self.map_gen)
+        Enemy.flow_field = self.flow_field
         
-        self.bg_color = config.STAGE_SETTINGS.get(self.biome, {}).get("bg_color", (34, 139, 34))
+        stage = game_data.STAGES.get(self.biome)
+        self.bg_color = stage.bg_color if stage is not None else (34, 139, 34)
 
         self.player = Player((0, 0), self.camera_group, self.bullets_group, self.enemies_group)
         self.player.items_group = self.items_group
         self.camera_group.add(self.player)
+
+        # 撃破・ダメージ・回収・回復のイベント (update の最後にまとめて処理する)
+        # text_spawner を先に呼ぶ (乱数を使う順番を以前と同じにするため)
+        self.events = EventBus()
+        self.damage_numbers = DamageNumbers(self.camera_group)
+        Enemy.event_bus = self.events
+        self.player.events = self.events
+        intervals = config.EVENT_BUS["intervals"]
+        self.events.subscribe("text_spawner", (events.DAMAGE, events.HEAL), self.spawn_event_texts, intervals["text_spawner"])
+        self.events.subscribe("db_logger", (events.KILL,), self.log_kills, intervals["db_logger"])
+        self.events.subscribe("drop_spawner", (events.KILL,), self.spawn_drops, intervals["drop_spawner"])
+        self.events.subscribe("stats", (events.KILL, events.DAMAGE, events.PICKUP, events.HEAL),
+                              self.update_stats, intervals["stats"])
+        self.run_stats = {"kills": 0, "damage_dealt": 0, "damage_taken": 0, "pickups": 0, "exp": 0, "healed": 0}
         
         self.map_gen.update(self.player.pos)
-        self.camera_group.add(self.obstacles.sprites())
         
         try:
             self.ui_font = pygame.font.Font(config.FONT_PATH, 20)
@@ -100,54 +136,100 @@ class GameplayScreen:
             self.ui_font_large = pygame.font.SysFont(None, 40)
             self.ui_font_bold = pygame.font.SysFont(None, 22)
 
+        # HUDのテキストキャッシュ (値が変わった時だけ font.render する)
+        self.hud = HudLayer()
+        self.hud.add("exp_label", self.ui_font_bold, config.WHITE, shadow_color=config.BLACK)
+        self.hud.add("level", self.ui_font_large, config.WHITE, shadow_color=config.BLACK)
+        self.hud.add("timer", self.ui_font_large, (255, 255, 255))
+        self.hud.add("boss_name", self.ui_font_bold, (255, 255, 255), shadow_color=(0, 0, 0))
+
+        # 武器スロットの描画キャッシュ
+        self.weapon_slots = WeaponSlotRenderer(self.ui_font, self.ui_font_bold,
+                                               cooldown_steps=config.UI_COOLDOWN_STEPS)
+
+        # レベルアップ画面のキャッシュ (start_level_up_sequence で作り直す)
+        self.level_up_fonts = None
+        self.level_up_panel = None
+        self.level_up_items = []
+
+        # メモリの内訳 (H のデバッグ表示に要約、M で tracemalloc 込みのレポート)
+        self.memory = MemoryTelemetry(self)
+
+    def close(self):
+        """ゲームプレイを抜ける時に呼ぶ。クラス・モジュールに登録した参照を外して DB を閉じる
+        (タイマーホイールに残ったタイマーが、前のゲームの弾・敵・武器を持ち続けないようにする)"""
+        if timer_wheel.get_active() is self.timers:
+            timer_wheel.set_active(None)
+        if Enemy.flow_field is self.flow_field:
+            Enemy.flow_field = None
+        if Enemy.event_bus is self.events:
+            Enemy.event_bus = None
+        self.db.close()
+
     def update(self, dt):
         if self.game_state == "LEVEL_UP": return
 
+        self.memory.update()
+        result = self.update_world(dt)
+
+        # このフレームのイベントをまとめて処理 (ダメージ表示・DB 記録・ドロップ・撃破数)
+        # ゲームが終わるフレームは間引き中の処理も呼んで取りこぼさない
+        self.events.flush(force=result is not None)
+
+        # ★追加: 状態に応じたリターン処理
+        if self.game_state == "GAME_OVER":
+            return "GAME_OVER"
+        
+        # ★追加: ゲームクリア時の遷移
+        if self.game_state == "GAME_CLEAR":
+            return "GAME_CLEAR"
+
+        return result
+
+    def update_world(self, dt):
         # ★追加: 10分経過チェック (10分 * 60秒 * 1000ミリ秒)
-        elapsed_ms = pygame.time.get_ticks() - self.start_time
+        elapsed_ms = frame_state.get_ticks() - self.start_time
         if elapsed_ms >= 10 * 60 * 1000:
             print("Time Limit Reached! Game Over.")
             self.game_state = "GAME_OVER"
             return "GAME_OVER"
-        
-        self.enemy_bullets.update(dt)
+
+        self.timers.advance(frame_state.get_ticks())
 
         # ボス出現チェック
         self.check_boss_spawn()
 
         self.map_gen.update(self.player.pos)
-        self.camera_group.add(self.obstacles.sprites())
+        self.flow_field.update(self.player.pos)
         self.spawn_enemies()
+        self.enemies_group.rebuild_grid()
         
+        Enemy.reset_lod_counts()
         self.camera_group.update(dt)
 
-        # ★追加: 敵の弾 vs プレイヤーの当たり判定
-        hits_bullet = pygame.sprite.spritecollide(self.player, self.enemy_bullets, False, collided=collide_hit_rect)
-        for bullet in hits_bullet:
-            damage = bullet.damage
-            
+        # ★追加: 敵の弾 vs プレイヤーの当たり判定 (弾の移動・寿命切れもここでまとめて処理)
+        hits_bullet = self.enemy_bullets.step(dt, self.player.hitbox)
+        for damage in hits_bullet:
             # ダメージ表示
             if self.player.take_damage(damage):
                 # True（ダメージが通った）ときだけ、テキストを出す
-                dmg_text = FloatingText(self.player.rect.center, f"-{damage}", (255, 50, 50))
-                self.camera_group.add(dmg_text)
+                x, y = self.player.rect.center
+                self.events.push(events.DAMAGE, "enemy_bullet", self.player, damage, x, y)
             
             if self.player.hp <= 0:
                 self.game_state = "GAME_OVER"
                 return "GAME_OVER"
 
-        # アイテム更新
-        self.items_group.update(dt, self.player.rect.center)
-
-        # アイテム回収判定
-        hits_items = pygame.sprite.spritecollide(self.player, self.items_group, True, collided=collide_hit_rect)
+        # アイテム更新 (吸い寄せ・ThunderStaff の引き寄せ・回収判定をまとめて処理)
+        hits_items = self.items_group.step(dt, self.player.rect.center)
         for item in hits_items:
+            self.events.push(events.PICKUP, item)
             if isinstance(item, HealingItem):
                 recover = item.value
                 if self.player.hp < self.player.max_hp:
                     self.player.hp = min(self.player.hp + recover, self.player.max_hp)
-                    heal_text = FloatingText(self.player.rect.center, f"+{recover}", (0, 255, 0))
-                    self.camera_group.add(heal_text)
+                    x, y = self.player.rect.center
+                    self.events.push(events.HEAL, "item", recover, x, y)
             elif hasattr(item, 'value'):
                 self.current_exp += item.value
                 self.check_level_up()
@@ -171,27 +253,19 @@ class GameplayScreen:
         hits = pygame.sprite.groupcollide(self.bullets_group, self.enemies_group, True, False, collided=collide_hit_rect)
         for bullet, enemies_hit in hits.items():
             for enemy in enemies_hit:
-                enemy.take_damage(bullet.damage)
-                dmg_text = FloatingText(enemy.rect.center, str(bullet.damage), (255, 255, 0))
-                self.camera_group.add(dmg_text)
+                # ダメージ表示は DAMAGE イベントから
+                enemy.take_damage(bullet.damage, source="bullet")
 
         # 敵 vs プレイヤー
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         hits_player = pygame.sprite.spritecollide(self.player, self.enemies_group, False, collided=collide_hit_rect)
         if hits_player:
             if current_time - self.last_damage_time > 500:
                 damage = 10 
-                self.player.take_damage(damage)
+                if self.player.take_damage(damage):
+                    self.events.push(events.DAMAGE, "contact", self.player, damage,
+                                     self.player.rect.centerx, self.player.rect.top)
                 self.last_damage_time = current_time
-                
-                dmg_pos = (self.player.rect.centerx + random.randint(-10, 10), self.player.rect.top)
-                dmg_text = FloatingText(dmg_pos, f"-{damage}", (255, 0, 0))
-                self.camera_group.add(dmg_text)
-
-                text_pos = (self.player.rect.centerx, self.player.rect.top - 40)
-                phrase = random.choice(AGGRO_PHRASES)
-                floating_text = FloatingText(text_pos, phrase)
-                self.camera_group.add(floating_text)
 
                 if self.player.hp <= 0:
                     self.game_state = "GAME_OVER"
@@ -200,21 +274,13 @@ class GameplayScreen:
         for enemy in self.enemies_group:
             if enemy.stats["hp"] <= 0:
                 self.handle_enemy_death(enemy)
-        
-        # ★追加: 状態に応じたリターン処理
-        if self.game_state == "GAME_OVER":
-            return "GAME_OVER"
-        
-        # ★追加: ゲームクリア時の遷移
-        if self.game_state == "GAME_CLEAR":
-            return "GAME_CLEAR"
 
         return None
 
 # src/scenes/game_play_screen.py
 
     def check_boss_spawn(self):
-        elapsed_ms = pygame.time.get_ticks() - self.start_time
+        elapsed_ms = frame_state.get_ticks() - self.start_time
         current_minute = elapsed_ms // 60000
         
         # スケジュールにあり、かつ まだ出現させていない場合
@@ -250,7 +316,9 @@ class GameplayScreen:
     def handle_events(self, events):
         for event in events:
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE: return "TITLE"
+                if event.key == pygame.K_ESCAPE:
+                    self.events.flush(force=True)
+                    return "TITLE"
                 if event.key == pygame.K_l: 
                     self.current_exp += self.next_level_exp
                     self.check_level_up()
@@ -259,6 +327,8 @@ class GameplayScreen:
                 if event.key == pygame.K_t:
                     self.start_time -= 10000
                     print("Debug: Time skipped +1 min")
+                if event.key == pygame.K_m:
+                    self.memory.snapshot()
 
 
             if self.game_state == "LEVEL_UP":
@@ -268,42 +338,71 @@ class GameplayScreen:
     # src/scenes/game_play_screen.py
 
     def handle_enemy_death(self, enemy):
-        enemy.death_time = time.time()
-        self.db.log_mob_death(enemy, generation=self.current_generation, biome=self.biome)
-        
-        if enemy == self.active_boss:
-            self.active_boss = None 
-            
-            # 花畑演出
-            GraveFlower(enemy.rect.center, [self.camera_group, self.decorations], "grave_flower_main.png")
-            sub_flowers = ["grave_flower_orange.png", "grave_flower_blue.png", "grave_flower_yellow.png"]
-            flower_count = 12
-            for i in range(flower_count):
-                angle = (360 / flower_count) * i + random.uniform(-15, 15)
-                distance = random.uniform(40, 80)
-                rad = math.radians(angle)
-                offset_x = math.cos(rad) * distance
-                offset_y = math.sin(rad) * distance
-                flower_pos = (enemy.rect.centerx + offset_x, enemy.rect.centery + offset_y)
-                color_img = random.choice(sub_flowers)
-                GraveFlower(flower_pos, [self.camera_group, self.decorations], color_img)
-
-            for _ in range(5):
-                scatter_pos = (
-                    enemy.rect.centerx + random.randint(-50, 50),
-                    enemy.rect.centery + random.randint(-50, 50)
-                )
-                ExpPurple(scatter_pos, groups=[self.camera_group, self.items_group])
-
-            print("BOSS DEFEATED!")
-
-            # ★追加: ラスボス判定とゲームクリア処理
-            boss_name = enemy.stats.get("name", "")
-            if boss_name == "ANCIENT GOLEM":
-                print("CONGRATULATIONS! GAME CLEAR!")
-                self.game_state = "GAME_CLEAR"
+        # グループから外して KILL イベントを出すだけ (DB 記録・ドロップ・撃破数はフレームの最後にまとめて)
+        enemy.death_time = frame_state.get_time()
+        enemy.kill()
+        self.events.push(events.KILL, enemy, self.current_generation)
+
+    # ==========================================
+    # イベントの処理 (EventBus の consumer、登録順に呼ばれる)
+    # ==========================================
+    def spawn_event_texts(self, batch):
+        """ダメージ・回復の数字を出す (敵へのダメージは敵ごとにまとめる)"""
+        numbers = self.damage_numbers
+        numbers.prune()
+        for source, target, amount, x, y in batch[events.DAMAGE]:
+            if source == "bullet" or (source == "weapon" and numbers.show_weapon_damage):
+                numbers.add_damage(target, amount, (x, y))
+            elif source == "enemy_bullet":
+                numbers.spawn((x, y), f"-{amount}", (255, 50, 50))
+            elif source == "contact":
+                dmg_pos = (x + random.randint(-10, 10), y)
+                numbers.spawn(dmg_pos, f"-{amount}", (255, 0, 0))
+
+                text_pos = (x, y - 40)
+                phrase = random.choice(AGGRO_PHRASES)
+                numbers.spawn(text_pos, phrase)
+
+        for source, amount, x, y in batch[events.HEAL]:
+            # ミルクは武器側で遅れて数字を出すのでここでは出さない
+            if source == "item":
+                numbers.spawn((x, y), f"+{amount}", (0, 255, 0))
+        numbers.refresh()
+
+    def log_kills(self, batch):
+        """倒したモブを世代ごとにまとめて DB に記録する"""
+        by_generation = {}
+        for enemy, generation in batch[events.KILL]:
+            by_generation.setdefault(generation, []).append(enemy)
+        for generation, mobs in by_generation.items():
+            self.db.log_mob_deaths(mobs, generation=generation, biome=self.biome)
+
+    def spawn_drops(self, batch):
+        """倒した敵のドロップ (ボスは花畑と紫の経験値)"""
+        for enemy, _ in batch[events.KILL]:
+            if isinstance(enemy, Boss):
+                # 花畑演出
+                GraveFlower(enemy.rect.center, [self.camera_group, self.decorations], "grave_flower_main.png")
+                sub_flowers = ["grave_flower_orange.png", "grave_flower_blue.png", "grave_flower_yellow.png"]
+                flower_count = 12
+                for i in range(flower_count):
+                    angle = (360 / flower_count) * i + random.uniform(-15, 15)
+                    distance = random.uniform(40, 80)
+                    rad = math.radians(angle)
+                    offset_x = math.cos(rad) * distance
+                    offset_y = math.sin(rad) * distance
+                    flower_pos = (enemy.rect.centerx + offset_x, enemy.rect.centery + offset_y)
+                    color_img = random.choice(sub_flowers)
+                    GraveFlower(flower_pos, [self.camera_group, self.decorations], color_img)
+
+                for _ in range(5):
+                    scatter_pos = (
+                        enemy.rect.centerx + random.randint(-50, 50),
+                        enemy.rect.centery + random.randint(-50, 50)
+                    )
+                    ExpPurple(scatter_pos, groups=[self.camera_group, self.items_group])
+                continue
 
-        else:
             # 通常モブのドロップ
             drop_count = random.randint(1, 2)
             for _ in range(drop_count):
@@ -322,10 +421,35 @@ class GameplayScreen:
                 elif r < 0.9: Chocolate(enemy.rect.center, groups=[self.camera_group, self.items_group])
                 else: ChortCake(enemy.rect.center, groups=[self.camera_group, self.items_group])
 
-        enemy.kill()
-        self.mobs_killed_in_wave += 1
-        self.kill_count += 1
-        if self.mobs_killed_in_wave >= self.wave_threshold: self.start_next_wave()
+    def update_stats(self, batch):
+        """撃破数・ウェーブ・ボス撃破と、プレイの集計"""
+        stats = self.run_stats
+        for enemy, _ in batch[events.KILL]:
+            if enemy is self.active_boss:
+                self.active_boss = None
+                print("BOSS DEFEATED!")
+
+                # ★追加: ラスボス判定とゲームクリア処理
+                boss_name = enemy.stats.get("name", "")
+                if boss_name == "ANCIENT GOLEM":
+                    print("CONGRATULATIONS! GAME CLEAR!")
+                    self.game_state = "GAME_CLEAR"
+
+            self.mobs_killed_in_wave += 1
+            self.kill_count += 1
+            if self.mobs_killed_in_wave >= self.wave_threshold: self.start_next_wave()
+        stats["kills"] += len(batch[events.KILL])
+
+        for source, target, amount, x, y in batch[events.DAMAGE]:
+            if source in ("bullet", "weapon"):
+                stats["damage_dealt"] += amount
+            else:
+                stats["damage_taken"] += amount
+        for (item,) in batch[events.PICKUP]:
+            stats["pickups"] += 1
+            stats["exp"] += getattr(item, "value", 0) if not isinstance(item, HealingItem) else 0
+        for source, amount, x, y in batch[events.HEAL]:
+            stats["healed"] += amount
 
     def check_level_up(self):
         if self.current_exp >= self.next_level_exp:
@@ -362,10 +486,13 @@ class GameplayScreen:
         count = min(len(all_weapons), 3)
         self.upgrade_options = random.sample(all_weapons, count)
 
+        # 選択肢が決まったので、パネルをここで一度だけ描いておく
+        self.build_level_up_panel()
+
     def handle_levelup_click(self, mouse_pos):
         layout = config.LEVELUP_SCREEN
-        panel_x = (config.SCREEN_WIDTH - layout["panel_width"]) // 2
-        panel_y = (config.SCREEN_HEIGHT - layout["panel_height"]) // 2
+        panel_x = (config.DISPLAY_WIDTH - layout["panel_width"]) // 2
+        panel_y = (config.DISPLAY_HEIGHT - layout["panel_height"]) // 2
         current_y = panel_y + layout["list_start_y"]
         for i, (weapon_class, w_key) in enumerate(self.upgrade_options):
             item_width = layout["panel_width"] - 80 
@@ -385,7 +512,7 @@ class GameplayScreen:
             self.pending_stats_queue.extend(new_stats_list)
 
     def spawn_enemies(self):
-        current_time = pygame.time.get_ticks()
+        current_time = frame_state.get_ticks()
         if current_time - self.last_spawn_time > self.spawn_interval:
             spawn_pos = self.get_random_spawn_pos()
             stats_to_use = self.pending_stats_queue.pop(0) if self.pending_stats_queue else None
@@ -410,14 +537,40 @@ class GameplayScreen:
         return (cx, cy)
 
     def draw(self, screen):
+        # Texture バックエンドではワールドを Renderer に送り、screen (透明) には HUD だけを描く
+        backend = texture_renderer.get_active()
+        if backend is not None:
+            self.draw_world(backend.begin_world())
+            screen.fill((0, 0, 0, 0))
+            self.draw_hud(screen)
+            return
+
+        # 低解像度モードではワールドを内部の Surface に描いて、ここで1回だけ拡大する
+        target = render_target.get_active()
+        if target is None:
+            self.draw_world(screen)
+        else:
+            self.draw_world(target.surface)
+            target.present(screen)
+        self.draw_hud(screen)
+
+    def draw_world(self, surface):
+        """ワールド (config.SCREEN_* の大きさ) を描く"""
+        self.camera_group.display_surface = surface
         self.camera_group.custom_draw(self.player, self.bg_color, self.decorations)
-        self.draw_player_health_bar(screen)
-        
+        # ボスの弾 (スプライトではないのでカメラグループとは別に描く)
+        self.enemy_bullets.draw(surface, self.camera_group.offset, self.camera_group.view_rect())
+        self.draw_player_health_bar(surface)
+
+    def draw_hud(self, screen):
+        """HUD・レベルアップ画面 (ウィンドウの解像度 config.DISPLAY_* で描く)"""
         # ★追加: ボスHPバー表示
         if self.active_boss and self.active_boss.alive():
             self.draw_boss_health_bar(screen)
 
         self.draw_ui(screen)
+        if self.camera_group.debug_mode:
+            self.memory.draw_overlay(screen, self.ui_font)
         if self.game_state == "LEVEL_UP":
             self.draw_level_up_screen(screen)
 
@@ -430,7 +583,7 @@ class GameplayScreen:
         
         bar_w = 600
         bar_h = 25
-        x = (config.SCREEN_WIDTH - bar_w) // 2
+        x = (config.DISPLAY_WIDTH - bar_w) // 2
         y = 100 # 画面上部
         
         # 背景
@@ -440,13 +593,12 @@ class GameplayScreen:
         # 枠
         pygame.draw.rect(screen, (255, 255, 255), (x, y, bar_w, bar_h), 3)
         
-        # 名前表示
-        name_surf = self.ui_font_bold.render(boss.stats.get("name", "BOSS"), True, (255, 255, 255))
-        name_rect = name_surf.get_rect(midbottom=(config.SCREEN_WIDTH // 2, y - 5))
-        # 影
-        shadow_surf = self.ui_font_bold.render(boss.stats.get("name", "BOSS"), True, (0, 0, 0))
-        screen.blit(shadow_surf, (name_rect.x+2, name_rect.y+2))
-        screen.blit(name_surf, name_rect)
+        # 名前表示 (影付き、名前が変わった時だけ再レンダリング)
+        name = boss.stats.get("name", "BOSS")
+        name_widget = self.hud.prepare("boss_name", name)
+        name_rect = pygame.Rect((0, 0), name_widget.text_size)
+        name_rect.midbottom = (config.DISPLAY_WIDTH // 2, y - 5)
+        self.hud.draw(screen, "boss_name", name, name_rect.topleft)
 
     def draw_player_health_bar(self, screen):
         if self.player.hp <= 0: return
@@ -460,157 +612,92 @@ class GameplayScreen:
         
         hp_ratio = max(0, self.player.hp / self.player.max_hp)
         
-        pygame.draw.rect(screen, (0, 0, 0), (draw_x, draw_y, bar_width, bar_height))
+        # ワールドに描くので、Texture バックエンドでも描ける draw_rect を使う
+        draw_rect = texture_renderer.draw_rect
+        draw_rect(screen, (0, 0, 0), (draw_x, draw_y, bar_width, bar_height))
         color = (0, 255, 0) if hp_ratio > 0.3 else (255, 0, 0)
-        pygame.draw.rect(screen, color, (draw_x, draw_y, bar_width * hp_ratio, bar_height))
-        pygame.draw.rect(screen, (255, 255, 255), (draw_x, draw_y, bar_width, bar_height), 1)
+        draw_rect(screen, color, (draw_x, draw_y, bar_width * hp_ratio, bar_height))
+        draw_rect(screen, (255, 255, 255), (draw_x, draw_y, bar_width, bar_height), 1)
 
     def draw_ui(self, screen):
         xp_ratio = min(1.0, self.current_exp / self.next_level_exp) if self.next_level_exp > 0 else 0
         
         bar_h = config.UI_XP_BAR_HEIGHT 
-        bar_y = config.SCREEN_HEIGHT - bar_h
+        bar_y = config.DISPLAY_HEIGHT - bar_h
         
-        pygame.draw.rect(screen, config.UI_XP_BG_COLOR, (0, bar_y, config.SCREEN_WIDTH, bar_h))
-        pygame.draw.rect(screen, config.UI_XP_COLOR, (0, bar_y, config.SCREEN_WIDTH * xp_ratio, bar_h))
-        pygame.draw.rect(screen, config.WHITE, (0, bar_y, config.SCREEN_WIDTH, bar_h), 1)
+        pygame.draw.rect(screen, config.UI_XP_BG_COLOR, (0, bar_y, config.DISPLAY_WIDTH, bar_h))
+        pygame.draw.rect(screen, config.UI_XP_COLOR, (0, bar_y, config.DISPLAY_WIDTH * xp_ratio, bar_h))
+        pygame.draw.rect(screen, config.WHITE, (0, bar_y, config.DISPLAY_WIDTH, bar_h), 1)
 
+        # テキストは self.hud にキャッシュされ、値が変わった時だけ描き直される
         exp_text = "EXP"
-        shadow = self.ui_font_bold.render(exp_text, True, config.BLACK)
-        main = self.ui_font_bold.render(exp_text, True, config.WHITE)
-        text_y = bar_y + (bar_h - main.get_height()) // 2
-        screen.blit(shadow, (12, text_y + 2))
-        screen.blit(main, (10, text_y))
-
-        level_text = self.ui_font_large.render(f"LV {self.level}", True, config.WHITE)
-        level_shadow = self.ui_font_large.render(f"LV {self.level}", True, config.BLACK)
-        lvl_x = config.SCREEN_WIDTH - level_text.get_width() - 20
+        exp_widget = self.hud.prepare("exp_label", exp_text)
+        text_y = bar_y + (bar_h - exp_widget.text_size[1]) // 2
+        self.hud.draw(screen, "exp_label", exp_text, (10, text_y))
+
+        level_str = f"LV {self.level}"
+        level_widget = self.hud.prepare("level", level_str)
+        lvl_x = config.DISPLAY_WIDTH - level_widget.text_size[0] - 20
         lvl_y = 20
-        screen.blit(level_shadow, (lvl_x + 2, lvl_y + 2))
-        screen.blit(level_text, (lvl_x, lvl_y))
+        self.hud.draw(screen, "level", level_str, (lvl_x, lvl_y))
         
         # 時間表示 (オプション)
-        elapsed_sec = (pygame.time.get_ticks() - self.start_time) // 1000
+        elapsed_sec = (frame_state.get_ticks() - self.start_time) // 1000
         mins = elapsed_sec // 60
         secs = elapsed_sec % 60
         time_str = f"{mins:02}:{secs:02}"
-        time_surf = self.ui_font_large.render(time_str, True, (255, 255, 255))
-        screen.blit(time_surf, (config.SCREEN_WIDTH // 2 - time_surf.get_width() // 2, 20))
+        time_widget = self.hud.prepare("timer", time_str)
+        self.hud.draw(screen, "timer", time_str, (config.DISPLAY_WIDTH // 2 - time_widget.text_size[0] // 2, 20))
         
         self.draw_weapon_slots(screen)
 
     def draw_weapon_slots(self, screen):
-        # 設定
-        icon_size = 60       # アイコンの大きさ
-        padding = 4          # アイコン同士の間隔
-        start_x = 0          # 左端の開始位置
-        start_y = 0          # 上端の開始位置
-        
+        # アイコン・枠・クールダウン円弧はキャッシュ済み (src/scenes/hud.py)
         weapons = getattr(self.player, "weapons", [])
-        current_time = pygame.time.get_ticks()
-
-        for i, weapon in enumerate(weapons):
-            x = start_x + (icon_size + padding) * i
-            y = start_y
-            
-            slot_rect = pygame.Rect(x, y, icon_size, icon_size)
-            
-            # --- クールダウン計算 ---
-            cooldown = getattr(weapon, "cooldown", 0)
-            last_attack = getattr(weapon, "last_attack_time", 0)
-            progress = 1.0
-            
-            if cooldown > 0:
-                elapsed = current_time - last_attack
-                progress = min(1.0, elapsed / cooldown)
-            
-            # 1. 背景ボックス (進行度に応じて色を変える演出も可能)
-            s = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 128)) # 半透明の黒
-            screen.blit(s, (x, y))
-            
-            # 2. クールダウンゲージ (時計型)
-            if progress < 1.0:
-                # ゲージの背景 (暗い円)
-                center = (x + icon_size // 2, y + icon_size // 2)
-                radius = icon_size // 2 - 2
-                pygame.draw.circle(screen, (50, 50, 50), center, radius, 2)
-                
-                # ゲージ本体 (扇形を描く)
-                # pygame.draw.arc はラジアン指定 (0が右、時計回りに増える)
-                start_angle = -math.pi / 2 # 上 (12時) から開始
-                end_angle = start_angle + (2 * math.pi * progress)
-                
-                # arcは矩形指定で線を描くため、少し工夫が必要
-                # ここでは簡易的に「線」で円弧を描くか、
-                # もしくは「四角形の高さを変える」バー形式の方が実装は楽ですが、
-                # 「時計っぽい」という要望に合わせて円弧を描きます。
-                
-                # 塗りつぶしの扇形を描くのはPygameでは少し面倒なので、
-                # ここでは「半透明の黒いオーバーレイ」の高さを変える方式で代用します
-                # (時計型に見えるように円形マスクをかけるのがベストですが、コードが長くなるため)
-                
-                # 代替案: 「円形のプログレスバー（線）」を描画
-                rect = pygame.Rect(x + 2, y + 2, icon_size - 4, icon_size - 4)
-                if progress > 0:
-                    pygame.draw.arc(screen, (0, 255, 255), rect, start_angle, end_angle, 4)
+        self.weapon_slots.draw(screen, weapons, frame_state.get_ticks())
 
-            # 3. 武器アイコンの描画
+    def load_level_up_fonts(self):
+        # レベルアップ画面のフォントは一度だけ読み込む
+        if self.level_up_fonts is None:
+            layout = config.LEVELUP_SCREEN
             try:
-                img = None
-                if hasattr(weapon, "image") and weapon.image:
-                    img = weapon.image
-                elif hasattr(weapon, "bullet_image") and weapon.bullet_image:
-                    img = weapon.bullet_image
-                
-                if img:
-                    img = pygame.transform.scale(img, (icon_size - 8, icon_size - 8))
-                    
-                    # クールダウン中は暗くする
-                    if progress < 1.0:
-                        dark_img = img.copy()
-                        dark_img.fill((100, 100, 100, 255), special_flags=pygame.BLEND_RGBA_MULT)
-                        screen.blit(dark_img, (x + 4, y + 4))
-                    else:
-                        screen.blit(img, (x + 4, y + 4))
-                else:
-                    name = getattr(weapon, "name", "?")
-                    text_surf = self.ui_font_bold.render(name[:1], True, (255, 255, 255))
-                    text_rect = text_surf.get_rect(center=(x + icon_size//2, y + icon_size//2))
-                    screen.blit(text_surf, text_rect)
-
-            except Exception as e:
-                print(f"Icon draw error: {e}")
-
-            # 4. 枠線 (使用可能なら明るく)
-            border_color = (255, 255, 0) if progress >= 1.0 else (100, 100, 100)
-            pygame.draw.rect(screen, border_color, slot_rect, 2)
-
-            # 5. レベル表示
-            lvl = getattr(weapon, "level", 1)
-            lvl_surf = self.ui_font.render(str(lvl), True, (255, 255, 0))
-            lvl_rect = lvl_surf.get_rect(bottomright=(x + icon_size - 2, y + icon_size - 2))
-            screen.blit(lvl_surf, lvl_rect)
+                self.level_up_fonts = (
+                    pygame.font.Font(config.FONT_PATH, layout["font_size_title"]),
+                    pygame.font.Font(config.FONT_PATH, layout["font_size_name"]),
+                    pygame.font.Font(config.FONT_PATH, layout["font_size_detail"])
+                )
+            except FileNotFoundError:
+                self.level_up_fonts = (
+                    pygame.font.SysFont(None, 60),
+                    pygame.font.SysFont(None, 40),
+                    pygame.font.SysFont(None, 24)
+                )
+        return self.level_up_fonts
 
-    def draw_level_up_screen(self, screen):
-        overlay = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-        
+    def build_level_up_panel(self):
+        """
+        レベルアップ画面を1枚の画像として作っておく。
+        毎フレームはこの画像と、ホバー状態に応じた各項目の画像を blit するだけ。
+        """
         layout = config.LEVELUP_SCREEN
         colors = config.UI_COLORS
-        panel_x = (config.SCREEN_WIDTH - layout["panel_width"]) // 2
-        panel_y = (config.SCREEN_HEIGHT - layout["panel_height"]) // 2
+        title_font, name_font, detail_font = self.load_level_up_fonts()
+
+        # 暗幕 + パネル + リボン + タイトル
+        panel = pygame.Surface((config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+
+        panel_x = (config.DISPLAY_WIDTH - layout["panel_width"]) // 2
+        panel_y = (config.DISPLAY_HEIGHT - layout["panel_height"]) // 2
         
         panel_rect = pygame.Rect(panel_x, panel_y, layout["panel_width"], layout["panel_height"])
-        pygame.draw.rect(screen, colors["bg"], panel_rect)
-        pygame.draw.rect(screen, colors["border"], panel_rect, layout["border_thickness"])
+        pygame.draw.rect(panel, colors["bg"], panel_rect)
+        pygame.draw.rect(panel, colors["border"], panel_rect, layout["border_thickness"])
         
-        ribbon_x = (config.SCREEN_WIDTH - layout["ribbon_width"]) // 2
+        ribbon_x = (config.DISPLAY_WIDTH - layout["ribbon_width"]) // 2
         ribbon_y = panel_y - layout["ribbon_offset_y"]
-        pygame.draw.rect(screen, colors["ribbon"], (ribbon_x, ribbon_y, layout["ribbon_width"], layout["ribbon_height"]))
-        pygame.draw.rect(screen, colors["ribbon_border"], (ribbon_x, ribbon_y, layout["ribbon_width"], layout["ribbon_height"]), 4)
+        pygame.draw.rect(panel, colors["ribbon"], (ribbon_x, ribbon_y, layout["ribbon_width"], layout["ribbon_height"]))
+        pygame.draw.rect(panel, colors["ribbon_border"], (ribbon_x, ribbon_y, layout["ribbon_width"], layout["ribbon_height"]), 4)
 
         def draw_text_with_shadow(surf, text, font, color, center_pos=None, top_left=None):
             shadow_s = font.render(text, False, (0, 0, 0))
@@ -626,46 +713,59 @@ class GameplayScreen:
             surf.blit(shadow_s, s_rect)
             surf.blit(main_s, m_rect)
 
-        try:
-            title_font = pygame.font.Font(config.FONT_PATH, layout["font_size_title"])
-            name_font = pygame.font.Font(config.FONT_PATH, layout["font_size_name"])
-            detail_font = pygame.font.Font(config.FONT_PATH, layout["font_size_detail"])
-        except FileNotFoundError:
-            title_font = pygame.font.SysFont(None, 60)
-            name_font = pygame.font.SysFont(None, 40)
-            detail_font = pygame.font.SysFont(None, 24)
-
-        draw_text_with_shadow(screen, "LEVEL UP!", title_font, colors["text_title"], 
-            center_pos=(config.SCREEN_WIDTH // 2, ribbon_y + layout["ribbon_height"] // 2))
-        
+        draw_text_with_shadow(panel, "LEVEL UP!", title_font, colors["text_title"], 
+            center_pos=(config.DISPLAY_WIDTH // 2, ribbon_y + layout["ribbon_height"] // 2))
+
+        # 各項目は通常/ホバーの2枚を作る (座標は項目の左上基準)
+        items = []
         current_y = panel_y + layout["list_start_y"]
-        mouse_pos = pygame.mouse.get_pos()
+        item_width = layout["panel_width"] - 80 
+        icon_size = layout["icon_size"]
 
         for i, (weapon_class, w_key) in enumerate(self.upgrade_options):
-            item_width = layout["panel_width"] - 80 
             item_rect = pygame.Rect(panel_x + 40, current_y, item_width, layout["item_height"])
             
-            is_hovered = item_rect.collidepoint(mouse_pos)
-            bg_col = colors["item_bg_hover"] if is_hovered else colors["item_bg_normal"]
-            border_col = colors["item_border_hover"] if is_hovered else colors["item_border_normal"]
-            
-            pygame.draw.rect(screen, bg_col, item_rect)
-            pygame.draw.rect(screen, border_col, item_rect, 4 if is_hovered else 2)
-
-            stats = config.WEAPON_STATS.get(w_key, {})
+            stats = game_data.WEAPONS.get(w_key, {})
             name_text = stats.get("name", "Unknown Weapon")
-            
-            icon_size = layout["icon_size"]
+            detail_text = f"Tier: {stats.get('tier', 1)}  Damage: {stats.get('damage', 0)}"
+
             img = load_weapon_image(w_key)
             if img:
                 img = pygame.transform.scale(img, (icon_size, icon_size))
-                img_rect = img.get_rect(center=(item_rect.left + icon_size//2 + 30, item_rect.centery))
-                screen.blit(img, img_rect)
-            
-            text_x = item_rect.left + icon_size + 60
-            draw_text_with_shadow(screen, name_text, name_font, colors["text_body"], top_left=(text_x, item_rect.top + 25))
-            
-            detail_text = f"Tier: {stats.get('tier', 1)}  Damage: {stats.get('damage', 0)}"
-            screen.blit(detail_font.render(detail_text, False, colors["text_detail"]), (text_x, item_rect.top + 80))
-            
-            current_y += layout["item_height"] + layout["item_gap"]
\ No newline at end of file
+
+            variants = []
+            for is_hovered in (False, True):
+                item = pygame.Surface(item_rect.size, pygame.SRCALPHA)
+                local_rect = item.get_rect()
+                bg_col = colors["item_bg_hover"] if is_hovered else colors["item_bg_normal"]
+                border_col = colors["item_border_hover"] if is_hovered else colors["item_border_normal"]
+                
+                pygame.draw.rect(item, bg_col, local_rect)
+                pygame.draw.rect(item, border_col, local_rect, 4 if is_hovered else 2)
+
+                if img:
+                    img_rect = img.get_rect(center=(icon_size//2 + 30, local_rect.centery))
+                    item.blit(img, img_rect)
+                
+                text_x = icon_size + 60
+                draw_text_with_shadow(item, name_text, name_font, colors["text_body"], top_left=(text_x, 25))
+                item.blit(detail_font.render(detail_text, False, colors["text_detail"]), (text_x, 80))
+                variants.append(item)
+
+            items.append((item_rect, variants[0], variants[1]))
+            current_y += layout["item_height"] + layout["item_gap"]
+
+        self.level_up_panel = panel
+        self.level_up_items = items
+
+    def draw_level_up_screen(self, screen):
+        if self.level_up_panel is None:
+            self.build_level_up_panel()
+
+        screen.blit(self.level_up_panel, (0, 0))
+
+        # 毎フレーム変わるのはホバー状態だけ
+        mouse_pos = frame_state.get_mouse_pos()
+        for item_rect, normal_surf, hover_surf in self.level_up_items:
+            is_hovered = item_rect.collidepoint(mouse_pos)
+            screen.blit(hover_surf if is_hovered else normal_surf, item_rect)
\ No newline at end of file
@@ -0,0 +1,171 @@
+# src/scenes/hud.py
+# HUD の描画キャッシュ
+#
+# font.render や transform.scale は重いので、表示する値が変わった時だけ描き直し、
+# それ以外のフレームは前回の Surface をそのまま blit します。
+import math
+import pygame
+
+
+class CachedText:
+    """1つの表示項目 (値が変わった時だけ再レンダリング)"""
+    def __init__(self, font, color, shadow_color=None, shadow_offset=(2, 2)):
+        self.font = font
+        self.color = color
+        self.shadow_color = shadow_color
+        self.shadow_offset = shadow_offset if shadow_color is not None else (0, 0)
+
+        self.value = None
+        self.surface = None
+        self.text_size = (0, 0)   # 影を含まない文字部分のサイズ
+        self.render_count = 0
+
+    def update(self, value):
+        """値が変わっていれば描き直して True を返す"""
+        if self.surface is not None and value == self.value:
+            return False
+
+        text = str(value)
+        main = self.font.render(text, True, self.color)
+        self.text_size = main.get_size()
+
+        if self.shadow_color is None:
+            self.surface = main
+        else:
+            # 影 + 本体を1枚にまとめておく (本体の左上が (0, 0))
+            ox, oy = self.shadow_offset
+            shadow = self.font.render(text, True, self.shadow_color)
+            self.surface = pygame.Surface((main.get_width() + ox, main.get_height() + oy), pygame.SRCALPHA)
+            self.surface.blit(shadow, (ox, oy))
+            self.surface.blit(main, (0, 0))
+
+        self.value = value
+        self.render_count += 1
+        return True
+
+
+class HudLayer:
+    """名前付きの CachedText をまとめて管理する"""
+    def __init__(self):
+        self.widgets = {}
+
+    def add(self, name, font, color, shadow_color=None, shadow_offset=(2, 2)):
+        self.widgets[name] = CachedText(font, color, shadow_color, shadow_offset)
+        return self.widgets[name]
+
+    def prepare(self, name, value):
+        """値を更新して CachedText を返す (位置計算に text_size を使いたい時用)"""
+        widget = self.widgets[name]
+        widget.update(value)
+        return widget
+
+    def draw(self, screen, name, value, pos):
+        widget = self.widgets[name]
+        widget.update(value)
+        return screen.blit(widget.surface, pos)
+
+
+class WeaponSlotRenderer:
+    """
+    画面左上の武器スロット。
+    アイコン (通常/クールダウン中の暗い版)、背景枠、クールダウンの円弧を
+    キャッシュしておき、毎フレームは blit するだけにする。
+    """
+    def __init__(self, font_level, font_name, icon_size=60, padding=4, cooldown_steps=48):
+        self.font_level = font_level
+        self.font_name = font_name
+        self.icon_size = icon_size
+        self.padding = padding
+        self.cooldown_steps = cooldown_steps
+
+        # 背景 + 枠線 (使用可能 / クールダウン中)
+        self.frames = {
+            True: self._build_frame((255, 255, 0)),
+            False: self._build_frame((100, 100, 100))
+        }
+        self.arc_cache = {}      # 量子化した進捗 -> 円弧の Surface
+        self.icon_cache = {}     # 武器 -> (元画像, レベル, 通常アイコン, 暗いアイコン)
+        self.text_cache = {}     # (フォント種別, 文字列) -> Surface
+
+    def _build_frame(self, border_color):
+        s = pygame.Surface((self.icon_size, self.icon_size), pygame.SRCALPHA)
+        s.fill((0, 0, 0, 128)) # 半透明の黒
+        pygame.draw.rect(s, border_color, s.get_rect(), 2)
+        return s
+
+    def _get_arc(self, progress):
+        step = int(progress * self.cooldown_steps)
+        arc = self.arc_cache.get(step)
+        if arc is None:
+            size = self.icon_size
+            arc = pygame.Surface((size, size), pygame.SRCALPHA)
+            # ゲージの背景 (暗い円)
+            pygame.draw.circle(arc, (50, 50, 50), (size // 2, size // 2), size // 2 - 2, 2)
+            # 「円形のプログレスバー（線）」 (12時から時計回り)
+            if step > 0:
+                start_angle = -math.pi / 2
+                end_angle = start_angle + (2 * math.pi * step / self.cooldown_steps)
+                pygame.draw.arc(arc, (0, 255, 255), pygame.Rect(2, 2, size - 4, size - 4), start_angle, end_angle, 4)
+            self.arc_cache[step] = arc
+        return arc
+
+    def _get_icons(self, weapon, img, level):
+        cached = self.icon_cache.get(weapon)
+        if cached is None or cached[0] is not img or cached[1] != level:
+            icon = pygame.transform.scale(img, (self.icon_size - 8, self.icon_size - 8))
+            # クールダウン中は暗くする
+            dark = icon.copy()
+            dark.fill((100, 100, 100, 255), special_flags=pygame.BLEND_RGBA_MULT)
+            cached = (img, level, icon, dark)
+            self.icon_cache[weapon] = cached
+        return cached[2], cached[3]
+
+    def _get_text(self, kind, text, color):
+        key = (kind, text)
+        surf = self.text_cache.get(key)
+        if surf is None:
+            font = self.font_level if kind == "level" else self.font_name
+            surf = font.render(text, True, color)
+            self.text_cache[key] = surf
+        return surf
+
+    def draw(self, screen, weapons, current_time, start_x=0, start_y=0):
+        size = self.icon_size
+        # 外した武器のキャッシュは捨てる
+        if len(self.icon_cache) > len(weapons):
+            self.icon_cache = {w: v for w, v in self.icon_cache.items() if w in weapons}
+
+        for i, weapon in enumerate(weapons):
+            x = start_x + (size + self.padding) * i
+            y = start_y
+
+            # --- クールダウン計算 ---
+            cooldown = getattr(weapon, "cooldown", 0)
+            last_attack = getattr(weapon, "last_attack_time", 0)
+            progress = 1.0
+            if cooldown > 0:
+                elapsed = current_time - last_attack
+                progress = min(1.0, elapsed / cooldown)
+            ready = progress >= 1.0
+
+            # 1. 背景ボックス + 枠線
+            screen.blit(self.frames[ready], (x, y))
+
+            # 2. クールダウンゲージ (時計型)
+            if not ready:
+                screen.blit(self._get_arc(progress), (x, y))
+
+            # 3. 武器アイコン
+            lvl = getattr(weapon, "level", 1)
+            img = getattr(weapon, "image", None) or getattr(weapon, "bullet_image", None)
+            if img:
+                icon, dark = self._get_icons(weapon, img, lvl)
+                screen.blit(icon if ready else dark, (x + 4, y + 4))
+            else:
+                name = getattr(weapon, "name", "?")
+                text_surf = self._get_text("name", name[:1], (255, 255, 255))
+                screen.blit(text_surf, text_surf.get_rect(center=(x + size // 2, y + size // 2)))
+
+            # 4. レベル表示
+            lvl_surf = self._get_text("level", str(lvl), (255, 255, 0))
+            screen.blit(lvl_surf, lvl_surf.get_rect(bottomright=(x + size - 2, y + size - 2)))
@@ -1,6 +1,7 @@
 import pygame
 import os
 import config
+from src.system.asset_loader import load_scaled_image
 
 class StageSelectScreen:
     def __init__(self):
@@ -20,8 +21,7 @@ class StageSelectScreen:
         
         try:
             if os.path.exists(map_path):
-                self.map_image = pygame.image.load(map_path).convert()
-                self.map_image = pygame.transform.scale(self.map_image, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+                self.map_image = load_scaled_image(map_path, (config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT)).convert()
             else:
                 print(f"Warning: Stage map image not found at {map_path}")
         except Exception as e:
@@ -55,7 +55,7 @@ class StageSelectScreen:
         # 自動配置用の基準値（手動設定がない場合に使用）
         start_x = 200
         step_x = 250
-        base_y = config.SCREEN_HEIGHT // 2
+        base_y = config.DISPLAY_HEIGHT // 2
         
         # ステージの並び順を決定
         stage_keys = list(raw_stages.keys())
@@ -244,6 +244,6 @@ class StageSelectScreen:
                 msg_color = (200, 200, 200)
                 
             msg = self.font.render(msg_text, True, msg_color)
-            msg_rect = msg.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT - 50))
+            msg_rect = msg.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT - 50))
             pygame.draw.rect(screen, (0, 0, 0, 180), msg_rect.inflate(20, 10), border_radius=5)
             screen.blit(msg, msg_rect)
\ No newline at end of file
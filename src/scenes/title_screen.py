@@ -2,9 +2,13 @@ import pygame
 import os
 import math
 import config
+from src.system.asset_loader import load_scaled_image, get_source_size
 
 class TitleScreen:
-    def __init__(self):
+    def __init__(self, preloader=None):
+        # 起動時の画像プリロード (終わるまでは進捗バーを表示して入力を受け付けない)
+        self.preloader = preloader
+
         # フォント設定
         try:
             # 少し大きめのフォントを使用
@@ -24,9 +28,8 @@ class TitleScreen:
         # 1. 背景画像の読み込みとスケーリング
         try:
             if os.path.exists(bg_path):
-                bg_img = pygame.image.load(bg_path).convert()
                 # 画面サイズに合わせてリサイズ
-                self.background = pygame.transform.scale(bg_img, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+                self.background = load_scaled_image(bg_path, (config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT)).convert()
             else:
                 print(f"Warning: Title background not found at {bg_path}")
         except Exception as e:
@@ -35,14 +38,14 @@ class TitleScreen:
         # 2. ロゴ画像の読み込みとスケーリング
         try:
             if os.path.exists(logo_path):
-                logo_img = pygame.image.load(logo_path).convert_alpha()
+                logo_w, logo_h = get_source_size(logo_path)
                 
                 # ロゴを画面幅の 60% くらいの幅に合わせてリサイズ
-                target_width = int(config.SCREEN_WIDTH * 0.6)
-                scale = target_width / logo_img.get_width()
-                target_height = int(logo_img.get_height() * scale)
+                target_width = int(config.DISPLAY_WIDTH * 0.6)
+                scale = target_width / logo_w
+                target_height = int(logo_h * scale)
                 
-                self.logo = pygame.transform.scale(logo_img, (target_width, target_height))
+                self.logo = load_scaled_image(logo_path, (target_width, target_height))
             else:
                 print(f"Warning: Title logo not found at {logo_path}")
         except Exception as e:
@@ -50,8 +53,17 @@ class TitleScreen:
 
         self.start_time = pygame.time.get_ticks()
 
+    def is_loading(self):
+        return self.preloader is not None and not self.preloader.done
+
     def handle_events(self, events):
         for event in events:
+            # 読み込み中は ESC (終了) 以外を無視
+            if self.is_loading():
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return "QUIT"
+                continue
+
             # キーを押すかクリックでゲーム開始
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -65,6 +77,8 @@ class TitleScreen:
         return None
 
     def update(self, dt):
+        if self.is_loading():
+            self.preloader.poll()
         return None
 
     def draw(self, screen):
@@ -78,14 +92,39 @@ class TitleScreen:
         # 2. ロゴ描画
         if self.logo:
             # 画面上部 (30%の位置) に配置
-            logo_rect = self.logo.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT * 0.3))
+            logo_rect = self.logo.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT * 0.3))
             screen.blit(self.logo, logo_rect)
         else:
             # ロゴがない場合のテキスト表示
             title_text = self.font.render("MobMania of Evolution", True, (255, 255, 255))
-            title_rect = title_text.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT * 0.3))
+            title_rect = title_text.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT * 0.3))
             screen.blit(title_text, title_rect)
 
+        # 読み込み中は「PRESS ANY KEY」の代わりに進捗バーを出す
+        if self.is_loading():
+            self.draw_loading_bar(screen)
+        else:
+            self.draw_press_any_key(screen)
+        
+        # 4. クレジット表記（右下）
+        credit_text = self.small_font.render("Database Project 2025", True, (200, 200, 200))
+        credit_rect = credit_text.get_rect(bottomright=(config.DISPLAY_WIDTH - 20, config.DISPLAY_HEIGHT - 20))
+        screen.blit(credit_text, credit_rect)
+
+    def draw_loading_bar(self, screen):
+        bar_w = int(config.DISPLAY_WIDTH * 0.4)
+        bar_h = 24
+        x = (config.DISPLAY_WIDTH - bar_w) // 2
+        y = int(config.DISPLAY_HEIGHT * 0.75)
+
+        pygame.draw.rect(screen, (0, 0, 0), (x, y, bar_w, bar_h))
+        pygame.draw.rect(screen, config.UI_XP_COLOR, (x, y, bar_w * self.preloader.progress, bar_h))
+        pygame.draw.rect(screen, (255, 255, 255), (x, y, bar_w, bar_h), 2)
+
+        text = self.small_font.render(f"LOADING... {int(self.preloader.progress * 100)}%", True, (255, 255, 255))
+        screen.blit(text, text.get_rect(midbottom=(config.DISPLAY_WIDTH // 2, y - 8)))
+
+    def draw_press_any_key(self, screen):
         # 3. 「PRESS ANY KEY」の点滅演出
         current_time = pygame.time.get_ticks()
         # sin波を使ってアルファ値（透明度）をなめらかに変化させる (50〜255)
@@ -93,7 +132,7 @@ class TitleScreen:
         
         press_text = self.font.render("PRESS ANY KEY TO START", True, (255, 255, 255))
         press_text.set_alpha(int(alpha))
-        press_rect = press_text.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT * 0.75))
+        press_rect = press_text.get_rect(center=(config.DISPLAY_WIDTH // 2, config.DISPLAY_HEIGHT * 0.75))
         
         # 視認性を上げるための影
         shadow_text = self.font.render("PRESS ANY KEY TO START", True, (0, 0, 0))
@@ -101,9 +140,4 @@ class TitleScreen:
         shadow_rect = shadow_text.get_rect(center=(press_rect.centerx + 3, press_rect.centery + 3))
         
         screen.blit(shadow_text, shadow_rect)
-        screen.blit(press_text, press_rect)
-        
-        # 4. クレジット表記（右下）
-        credit_text = self.small_font.render("Database Project 2025", True, (200, 200, 200))
-        credit_rect = credit_text.get_rect(bottomright=(config.SCREEN_WIDTH - 20, config.SCREEN_HEIGHT - 20))
-        screen.blit(credit_text, credit_rect)
\ No newline at end of file
+        screen.blit(press_text, press_rect)
\ No newline at end of file
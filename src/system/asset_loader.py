@@ -0,0 +1,200 @@
+# src/system/asset_loader.py
+# 画像の一括プリロード
+#
+# 起動時に assets/images 以下の PNG をスレッドプールでデコードしておき、
+# convert_alpha() はメインスレッドで少しずつ実行します。
+# ゲームで使う (画像, サイズ) の組 (atlas.build_manifest) のうち、アトラスにもディスクキャッシュにも
+# 無いサイズは、デコードした後に同じく少しずつ拡大縮小しておきます (プレイ中に初めて scale しない)。
+# 各エンティティは pygame.image.load の代わりに load_image() を使うことで、
+# デコード済みの画像をキャッシュから受け取れます。
+import os
+import struct
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+import config
+
+IMAGE_ROOT = os.path.join("assets", "images")
+
+# パス -> convert_alpha 済みの Surface (共有なので書き換えないこと)
+_image_cache = {}
+# (パス, サイズ) -> 拡大縮小済みの Surface (同上)
+_scaled_cache = {}
+
+# GLOBAL_SCALE 用のテクスチャアトラス (src/system/atlas.py, なければ None)
+_atlas = None
+# 拡大縮小済み画像のディスクキャッシュ (src/system/scaled_cache.py, なければ None)
+_disk_cache = None
+
+
+def set_atlas(atlas):
+    global _atlas
+    _atlas = atlas
+
+
+def set_disk_cache(cache):
+    global _disk_cache
+    _disk_cache = cache
+
+
+def load_image(path):
+    """
+    convert_alpha 済みの画像を返す。プリロード済みならキャッシュから返す。
+    ファイルがない場合は pygame.image.load と同じく例外を投げる。
+    """
+    key = os.path.normpath(path)
+    img = _image_cache.get(key)
+    if img is None:
+        img = pygame.image.load(key).convert_alpha()
+        _image_cache[key] = img
+    return img
+
+
+def load_scaled_image(path, size):
+    """
+    指定サイズに拡大縮小した画像を返す。
+    アトラス -> ディスクキャッシュ -> 読み込んで scale の順に探す。
+    """
+    size = (int(size[0]), int(size[1]))
+    key = (os.path.normpath(path), size)
+    img = _scaled_cache.get(key)
+    if img is None:
+        if _atlas is not None:
+            img = _atlas.get(path, size)
+        if img is None and _disk_cache is not None:
+            img = _disk_cache.get(path, size)
+        if img is None:
+            img = pygame.transform.scale(load_image(path), size)
+            if _disk_cache is not None:
+                _disk_cache.put(path, size, img)
+        _scaled_cache[key] = img
+    return img
+
+
+def get_source_size(path):
+    """元画像のサイズ (アトラスの記録か PNG ヘッダーから、デコードせずに返す)"""
+    if _atlas is not None:
+        size = _atlas.source_size(path)
+        if size:
+            return size
+    key = os.path.normpath(path)
+    if key in _image_cache:
+        return _image_cache[key].get_size()
+    with open(key, "rb") as f:
+        header = f.read(24)
+    # PNG: シグネチャ(8) + IHDR チャンク長(4) + "IHDR"(4) + 幅(4) + 高さ(4)
+    if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+        return struct.unpack(">II", header[16:24])
+    return load_image(path).get_size()
+
+
+def _decode(path):
+    # ワーカースレッドで実行 (convert はディスプレイが必要なのでここではしない)
+    return pygame.image.load(path)
+
+
+class AssetPreloader:
+    def __init__(self, root=IMAGE_ROOT):
+        self.root = root
+        settings = config.ASSET_PRELOAD
+        self.enabled = settings.get("enabled", True)
+        self.workers = settings.get("workers", 4)
+        self.convert_budget_ms = settings.get("convert_budget_ms", 8)
+
+        self.paths = []
+        self.pending = {}
+        # パス -> プリロードで拡大縮小しておくサイズのリスト
+        self.scale_jobs = {}
+        self.loaded_count = 0
+        self.executor = None
+        self.start_ticks = 0
+        self.ready_ticks = None
+
+    def start(self):
+        self.start_ticks = pygame.time.get_ticks()
+
+        if self.enabled:
+            all_paths = []
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in sorted(filenames):
+                    if name.lower().endswith(".png"):
+                        all_paths.append(os.path.normpath(os.path.join(dirpath, name)))
+
+            # 使うサイズが分かっている画像は (パス, サイズ) ごとに、アトラスかディスクキャッシュにあるか調べる。
+            # 1サイズでも無ければ元ファイルを読んで、そのサイズだけ拡大縮小しておく
+            from src.system.atlas import build_manifest
+            known = set()
+            for path, size in build_manifest(config.GLOBAL_SCALE):
+                path = os.path.normpath(path)
+                known.add(path)
+                if _atlas is not None and _atlas.has(path, size):
+                    continue
+                if _disk_cache is not None and _disk_cache.has(path, size):
+                    continue
+                self.scale_jobs.setdefault(path, []).append(size)
+
+            # 使うサイズが分からない画像 (背景など) は、どれかのサイズがあれば読まない
+            covered = set()
+            if _atlas is not None:
+                covered |= _atlas.covered_paths()
+            if _disk_cache is not None:
+                covered |= _disk_cache.cached_paths([p for p in all_paths if p not in known])
+            self.paths = [p for p in all_paths
+                          if p in self.scale_jobs or (p not in known and p not in covered)]
+
+        if not self.paths:
+            self._finish()
+            return
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        for path in self.paths:
+            self.pending[path] = self.executor.submit(_decode, path)
+
+    def poll(self):
+        """
+        デコードが終わった画像をメインスレッドで convert_alpha する。
+        1フレームあたり convert_budget_ms までしか使わない。
+        """
+        if self.done:
+            return
+
+        start = pygame.time.get_ticks()
+        for path, future in list(self.pending.items()):
+            if not future.done():
+                continue
+
+            del self.pending[path]
+            self.loaded_count += 1
+            try:
+                img = future.result()
+                if path not in _image_cache:
+                    _image_cache[path] = img.convert_alpha()
+                # 足りないサイズを作る (ディスクキャッシュにも書くので次回の起動では不要になる)
+                for size in self.scale_jobs.pop(path, ()):
+                    load_scaled_image(path, size)
+            except (FileNotFoundError, pygame.error) as e:
+                print(f"Warning: Failed to preload {path}: {e}")
+
+            if pygame.time.get_ticks() - start >= self.convert_budget_ms:
+                break
+
+        if not self.pending:
+            self._finish()
+
+    def _finish(self):
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        self.ready_ticks = pygame.time.get_ticks()
+        load_ms = self.ready_ticks - self.start_ticks
+        print(f"Assets preloaded: {self.loaded_count} images in {load_ms} ms "
+              f"(time to interactive: {self.ready_ticks} ms)")
+
+    @property
+    def done(self):
+        return self.ready_ticks is not None
+
+    @property
+    def progress(self):
+        if not self.paths:
+            return 1.0
+        return self.loaded_count / len(self.paths)
@@ -0,0 +1,220 @@
+# src/system/atlas.py
+# テクスチャアトラス (ビルドツール + 実行時ローダー)
+#
+# ビルド:
+#   python -m src.system.atlas --scale 2.4
+#
+# config から「どの画像をどのサイズで使うか」を集めて、GLOBAL_SCALE 適用後の
+# サイズに縮小した状態で数枚のシートに詰め込み、index.json と一緒に
+# assets/atlas/x<scale>/ に書き出します。
+# 実行時は main.py が GLOBAL_SCALE に一致するアトラスを読み込み、
+# load_scaled_image() がシートの subsurface を返します。
+import argparse
+import json
+import os
+import pygame
+import config
+from src.system.asset_loader import get_source_size
+
+ATLAS_DIR = os.path.join("assets", "atlas")
+IMAGE_ROOT = os.path.join("assets", "images")
+
+
+def atlas_dir_for_scale(scale):
+    return os.path.join(ATLAS_DIR, f"x{scale:.3f}")
+
+
+def entry_key(path, size):
+    return f"{os.path.normpath(path)}@{size[0]}x{size[1]}"
+
+
+def _image_path(*parts):
+    return os.path.normpath(os.path.join(*parts))
+
+
+def build_manifest(scale):
+    """
+    ゲーム内で実際に使われる (画像パス, 表示サイズ) の一覧を config から作る。
+    サイズの計算式は各エンティティのコードと一致させること。
+    """
+    manifest = set()
+
+    # モブ・プレイヤー (GLOBAL_SCALE 依存)
+    for base in config.MOB_BASE_STATS.values():
+        size = int(base["size"] * scale)
+        manifest.add((_image_path(config.MOB_IMAGE_DIR, base["image"]), (size, size)))
+    size = int(config.PLAYER_SIZE * scale)
+    manifest.add((_image_path(config.PLAYER_IMAGE_DIR, config.PLAYER_IMAGE), (size, size)))
+
+    # ボスとボスの弾
+    for boss in config.BOSS_SCHEDULE.values():
+        manifest.add((_image_path(IMAGE_ROOT, "boss", boss["filename"]), tuple(boss["scale"])))
+        for atk in boss.get("attacks", []):
+            if atk.get("size"):
+                manifest.add((_image_path(IMAGE_ROOT, "attack", atk["image"]), tuple(atk["size"])))
+
+    # 武器 (本体サイズ + レベルアップ画面のアイコン)
+    icon_size = config.LEVELUP_SCREEN["icon_size"]
+    for stats in config.WEAPON_STATS.values():
+        path = _image_path(config.ITEM_IMAGE_DIR, stats["image"])
+        size = stats.get("size", 32)
+        manifest.add((path, (size, size)))
+        manifest.add((path, (icon_size, icon_size)))
+
+    # ドロップアイテム・お墓の花
+    drops_dir = os.path.join(IMAGE_ROOT, "drops")
+    for name in _png_names(drops_dir):
+        size = config.DROP_SETTINGS["exp_size"] if name.startswith("exp_") else config.DROP_SETTINGS["healing_size"]
+        manifest.add((_image_path(drops_dir, name), tuple(size)))
+    grave_dir = os.path.join(IMAGE_ROOT, "grave")
+    for name in _png_names(grave_dir):
+        manifest.add((_image_path(grave_dir, name), (64, 64)))
+
+    # マップオブジェクト (MapGenerator._preload_images と同じ計算)
+    for stage in config.STAGE_SETTINGS.values():
+        assets = stage.get("assets", {})
+        for name in assets.get("obstacles", []) + assets.get("decorations", []):
+            file_name = name if name.lower().endswith(".png") else name + ".png"
+            path = _image_path(config.MAP_IMAGE_DIR, file_name)
+            if not os.path.exists(path):
+                continue
+            props = config.MAP_OBJECT_SETTINGS.get(file_name, {})
+            src_w, src_h = get_source_size(path)
+            target_w = int(80 * props.get("scale", 1.0))
+            target_h = int(target_w * (src_h / src_w))
+            manifest.add((path, (target_w, target_h)))
+
+    return sorted(m for m in manifest if os.path.exists(m[0]))
+
+
+def _png_names(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(n for n in os.listdir(directory) if n.lower().endswith(".png"))
+
+
+def _pack(sizes, sheet_size, padding):
+    """
+    シェルフ詰め (高さ順に並べて左から詰め、溢れたら次の段・次のシートへ)
+    sizes: {key: (w, h)} -> 戻り値: {key: (sheet_index, x, y)}
+    """
+    placements = {}
+    sheet = 0
+    x = y = shelf_h = 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda kv: (-kv[1][1], -kv[1][0], kv[0])):
+        if x + w > sheet_size:
+            x = 0
+            y += shelf_h + padding
+            shelf_h = 0
+        if y + h > sheet_size:
+            sheet += 1
+            x = y = shelf_h = 0
+        placements[key] = (sheet, x, y)
+        x += w + padding
+        shelf_h = max(shelf_h, h)
+    return placements
+
+
+def build_atlas(scale, sheet_size=None, padding=2):
+    settings = config.ATLAS_SETTINGS
+    sheet_size = sheet_size or settings.get("sheet_size", 2048)
+
+    manifest = build_manifest(scale)
+    # シートより大きい画像は詰めようがないので対象外 (実行時は通常読み込みになる)
+    manifest = [(p, s) for p, s in manifest if s[0] <= sheet_size and s[1] <= sheet_size]
+
+    sizes = {entry_key(p, s): s for p, s in manifest}
+    placements = _pack(sizes, sheet_size, padding)
+
+    sources = {}
+    sheet_count = max([p[0] for p in placements.values()] + [-1]) + 1
+    sheets = [pygame.Surface((sheet_size, sheet_size), pygame.SRCALPHA) for _ in range(sheet_count)]
+    entries = {}
+    for path, size in manifest:
+        img = pygame.image.load(path)
+        sources[path] = list(img.get_size())
+        # ゲーム内と同じ pygame.transform.scale (ドット絵なので補間しない)
+        scaled = pygame.transform.scale(img.convert_alpha(), size)
+        key = entry_key(path, size)
+        sheet, x, y = placements[key]
+        sheets[sheet].blit(scaled, (x, y))
+        entries[key] = {"sheet": sheet, "rect": [x, y, size[0], size[1]]}
+
+    out_dir = atlas_dir_for_scale(scale)
+    os.makedirs(out_dir, exist_ok=True)
+    sheet_files = []
+    for i, sheet in enumerate(sheets):
+        name = f"sheet_{i}.png"
+        pygame.image.save(sheet, os.path.join(out_dir, name))
+        sheet_files.append(name)
+
+    index = {"scale": scale, "sheets": sheet_files, "entries": entries, "sources": sources}
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+
+    print(f"Atlas built: {len(entries)} images in {len(sheet_files)} sheets -> {out_dir}")
+    return out_dir
+
+
+class TextureAtlas:
+    """index.json を読んで、名前 (パス@サイズ) から subsurface を返す"""
+    def __init__(self, directory, index):
+        self.directory = directory
+        self.entries = index["entries"]
+        self.sources = {os.path.normpath(k): tuple(v) for k, v in index.get("sources", {}).items()}
+        self.sheets = [pygame.image.load(os.path.join(directory, name)).convert_alpha() for name in index["sheets"]]
+        self._subsurfaces = {}
+
+    @classmethod
+    def load_for_scale(cls, scale):
+        """GLOBAL_SCALE に一致するアトラスがあれば読み込む (なければ None)"""
+        directory = atlas_dir_for_scale(scale)
+        index_path = os.path.join(directory, "index.json")
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            atlas = cls(directory, index)
+        except (OSError, ValueError, KeyError, pygame.error) as e:
+            print(f"Warning: Failed to load atlas {directory}: {e}")
+            return None
+        print(f"Atlas loaded: {len(atlas.entries)} images from {directory}")
+        return atlas
+
+    def get(self, path, size):
+        key = entry_key(path, size)
+        sub = self._subsurfaces.get(key)
+        if sub is None:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            sub = self.sheets[entry["sheet"]].subsurface(pygame.Rect(entry["rect"]))
+            self._subsurfaces[key] = sub
+        return sub
+
+    def source_size(self, path):
+        return self.sources.get(os.path.normpath(path))
+
+    def covered_paths(self):
+        return set(self.sources)
+
+    def has(self, path, size):
+        return entry_key(path, size) in self.entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a pre-scaled texture atlas")
+    parser.add_argument("--scale", type=float, required=True, help="GLOBAL_SCALE to build for (monitor width / BASE_SCREEN_WIDTH)")
+    parser.add_argument("--sheet-size", type=int, default=None, help="atlas sheet width/height in pixels")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    build_atlas(args.scale, sheet_size=args.sheet_size)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
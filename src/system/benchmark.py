@@ -0,0 +1,407 @@
+# src/system/benchmark.py
+# ヘッドレスのベンチマーク
+#
+# 使い方:
+#   python -m src.system.benchmark                          # 全シナリオを実行して結果を表示
+#   python -m src.system.benchmark --out bench.json         # 結果を JSON に保存
+#   python -m src.system.benchmark --compare benchmarks/baseline.json
+#                                                           # ベースラインと比べて遅くなっていれば終了コード 1
+#   python -m src.system.benchmark --save-baseline          # benchmarks/baseline.json を更新
+#   python -m src.system.benchmark --runs 3 --save-baseline # 各シナリオを3回動かして中央値で保存
+#   python -m src.system.benchmark --size 1920x1080 --render low_res
+#                                                           # ワールドを内部解像度で描いた時の速さ
+#   python -m src.system.benchmark --backend texture        # SDL2 の Renderer/Texture で描いた時の速さ
+#                                                           # (ダミードライバでは software の Renderer)
+#
+# 各シナリオは GameplayScreen をダミーのビデオドライバで動かし、
+# update + draw の時間をフレームごとに測ります (時刻は 16ms 固定で進める)。
+# ピークメモリをシナリオごとに測るため、1シナリオ = 1サブプロセスで実行します。
+# DB は一時コピーを使うので、ゲームのデータは書き換えません。
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pygame
+import config
+from src.system import frame_state, render_target, texture_renderer
+from src.entities.enemy import Enemy
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+FRAME_MS = 16
+WARMUP_FRAMES = 30
+MAX_WEAPON_LEVEL = 8
+
+# ベースラインからこの割合以上悪化したら回帰とみなす
+DEFAULT_TOLERANCE = 0.15
+# p99 はフレーム数が少ないと最悪の数フレーム (DB のコミットや GC) そのものになるので、
+# 両方がこのフレーム数以上あり、かつこのミリ秒以上悪化した時だけ回帰とみなす
+P99_MIN_FRAMES = 200
+P99_FLOOR_MS = 2.0
+# --runs で複数回動かした時に中央値を取る項目
+MEDIAN_KEYS = ("fps", "avg_ms", "p99_ms", "max_ms", "peak_rss_mb")
+
+
+def build_scenarios():
+    """シナリオ名 -> 設定。ボス戦は config.BOSS_SCHEDULE から作る"""
+    scenarios = {
+        "mobs_500": {"mobs": 500, "frames": 300},
+        "mobs_2000": {"mobs": 2000, "frames": 120},
+        "mobs_5000": {"mobs": 5000, "frames": 60},
+        "max_loadout": {"mobs": 300, "loadout": MAX_WEAPON_LEVEL, "frames": 300},
+        # 群れが広く散らばった状態 (大半が画面外の中・遠距離 LOD に入る)。
+        # _no_lod は同じ配置を LOD なしで動かして、LOD の効果を比べる
+        "mobs_spread": {"mobs": 3000, "spread": (300, 4500), "frames": 120},
+        "mobs_spread_no_lod": {"mobs": 3000, "spread": (300, 4500), "frames": 120, "lod": False},
+    }
+    for minute, boss in sorted(config.BOSS_SCHEDULE.items()):
+        scenarios[f"boss_{minute}"] = {"boss": minute, "mobs": 100, "frames": 300, "label": boss["name"]}
+    scenarios["chunk_walk"] = {"walk": True, "frames": 600}
+    return scenarios
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * ratio))
+    return sorted_values[index]
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # Windows には resource がない
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイト
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def _entity_counts(scene):
+    return {
+        "enemies": len(scene.enemies_group),
+        "enemy_bullets": len(scene.enemy_bullets),
+        "bullets": len(scene.bullets_group),
+        "items": len(scene.items_group),
+        "obstacles": len(scene.obstacles),
+        "decorations": len(scene.decorations),
+        "camera_sprites": len(scene.camera_group),
+        "camera_chunk_obstacles": scene.camera_group.membership()["chunk_live"],
+        "lod_near": Enemy.lod_counts["near"],
+        "lod_mid": Enemy.lod_counts["mid"],
+        "lod_far": Enemy.lod_counts["far"],
+    }
+
+
+def _make_tanky(enemy):
+    # 計測中に数が減らないように倒されないようにする
+    enemy.stats["hp"] = enemy.stats["max_hp"] = 10 ** 9
+
+
+def run_scenario(name, spec, frames_scale=1.0, screen_size=(1280, 720), render_mode="native",
+                 backend_name="software"):
+    """1シナリオを実行して結果の辞書を返す (この関数は子プロセスで呼ばれる)"""
+    from src.system import db_manager
+    from src.system.replay import RecordedKeys, TRACKED_KEYS
+    from src.scenes.game_play_screen import GameplayScreen
+    from src.entities.weapons import (
+        PencilGun, BreadShield, BearSmash, ThunderStaff, IceCream, LaserCannon
+    )
+
+    # low_res なら RENDER_SETTINGS の内部解像度でワールドを描く (src/system/render_target.py)
+    settings = dict(config.RENDER_SETTINGS, mode=render_mode, backend=backend_name)
+    render_target.configure(screen_size, settings)
+    # texture なら Renderer に描き、毎フレーム present まで測る (使えなければ software で測る)
+    backend = texture_renderer.setup(screen_size, settings=settings)
+    if backend:
+        screen = backend.canvas
+    else:
+        screen = pygame.display.set_mode(screen_size)
+        render_target.setup(screen)
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_")
+    tmp_db = os.path.join(tmp_dir, "game_data.db")
+    if os.path.exists(db_manager.DB_PATH):
+        shutil.copy(db_manager.DB_PATH, tmp_db)
+    db_manager.DB_PATH = tmp_db
+
+    try:
+        random.seed(spec.get("seed", 1))
+        ticks = 10000
+        center = (screen_size[0] // 2, screen_size[1] // 2)
+        frame_state.set_frame(ticks, RecordedKeys(0), center, epoch_base=0.0)
+
+        if "lod" in spec:
+            config.ENEMY_LOD = dict(config.ENEMY_LOD, enabled=spec["lod"])
+
+        biome = spec.get("biome", next(iter(config.STAGE_SETTINGS)))
+        scene = GameplayScreen(biome)
+        player = scene.player
+        player.max_hp = player.hp = 10 ** 9
+
+        # 武器 (指定レベルまで上げる)
+        level = spec.get("loadout")
+        if level:
+            for weapon_class in (PencilGun, BreadShield, BearSmash, ThunderStaff, IceCream, LaserCannon):
+                for _ in range(level):
+                    player.add_weapon(weapon_class)
+
+        # モブをプレイヤーの周りにばらまく
+        for _ in range(spec.get("mobs", 0)):
+            angle = random.uniform(0, math.tau)
+            dist = random.uniform(*spec.get("spread", (300, 1500)))
+            pos = (player.pos.x + math.cos(angle) * dist, player.pos.y + math.sin(angle) * dist)
+            enemy = Enemy(pos, player, scene.enemies_group)
+            _make_tanky(enemy)
+            scene.camera_group.add(enemy)
+            scene.enemies_group.add(enemy)
+
+        # ボス戦: 出現時刻まで時計を進めて、すぐ近くに出す
+        boss_minute = spec.get("boss")
+        if boss_minute is not None:
+            scene.start_time = ticks - boss_minute * 60000
+
+        keys = RecordedKeys(0)
+        if spec.get("walk"):
+            player.speed *= 8
+            # 右下へ歩き続けてチャンクの境界をまたぐ
+            keys = RecordedKeys((1 << TRACKED_KEYS.index(pygame.K_RIGHT)) | (1 << TRACKED_KEYS.index(pygame.K_DOWN)))
+
+        frame_count = max(1, int(spec["frames"] * frames_scale))
+        frame_times = []
+        peak_counts = {}
+        result = None
+        for i in range(WARMUP_FRAMES + frame_count):
+            ticks += FRAME_MS
+            aim = (center[0] + int(200 * math.cos(i / 20)), center[1] + int(200 * math.sin(i / 20)))
+            frame_state.set_frame(ticks, keys, aim)
+
+            start = time.perf_counter()
+            result = scene.update(FRAME_MS / 1000.0)
+            scene.draw(screen)
+            if backend:
+                backend.present(screen)
+            elapsed = (time.perf_counter() - start) * 1000.0
+
+            if scene.active_boss is not None and not getattr(scene.active_boss, "_bench_placed", False):
+                boss = scene.active_boss
+                boss.pos.update(player.pos.x + 400, player.pos.y)
+                boss.rect.center = (round(boss.pos.x), round(boss.pos.y))
+                _make_tanky(boss)
+                boss._bench_placed = True
+
+            # レベルアップ画面で止まらないようにする
+            if scene.game_state == "LEVEL_UP":
+                scene.game_state = "PLAYING"
+
+            if i >= WARMUP_FRAMES:
+                frame_times.append(elapsed)
+                for key, value in _entity_counts(scene).items():
+                    peak_counts[key] = max(peak_counts.get(key, 0), value)
+            if result:
+                break
+
+        total = sum(frame_times)
+        ordered = sorted(frame_times)
+        scene.close()
+        return {
+            "label": spec.get("label", name),
+            "frames": len(frame_times),
+            "fps": round(len(frame_times) / (total / 1000.0), 1) if total > 0 else 0.0,
+            "avg_ms": round(total / len(frame_times), 3) if frame_times else 0.0,
+            "p99_ms": round(_percentile(ordered, 0.99), 3),
+            "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+            "entities_final": _entity_counts(scene),
+            "entities_peak": peak_counts,
+            # イベント処理ごとの呼び出し回数・処理時間 (src/system/events.py)
+            "event_consumers": scene.events.report(),
+            # タイマーホイールの登録待ち・呼び出し数 (src/system/timer_wheel.py)
+            "timers": scene.timers.report(),
+            # Texture バックエンドのキャッシュ・描画命令数 (src/system/texture_renderer.py)
+            "textures": backend.report() if backend else None,
+            "ended": result,
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _run_child(name, frames_scale, screen_size, render_mode="native", backend_name="software"):
+    """シナリオを子プロセスで実行して結果を受け取る"""
+    fd, out_path = tempfile.mkstemp(suffix=".json", prefix="bench_")
+    os.close(fd)
+    cmd = [
+        sys.executable, "-m", "src.system.benchmark", "--child", name, "--child-out", out_path,
+        "--frames-scale", str(frames_scale), "--size", f"{screen_size[0]}x{screen_size[1]}",
+        "--render", render_mode, "--backend", backend_name,
+    ]
+    try:
+        # ゲーム側の print が大量に出るので捨てる
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr)
+            return {"error": f"exit code {proc.returncode}"}
+        with open(out_path, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(out_path)
+
+
+def _median_result(runs):
+    """複数回の結果をまとめる。MEDIAN_KEYS は各項目の中央値、それ以外は fps が中央値の回のもの"""
+    runs = [r for r in runs if "error" not in r]
+    if not runs:
+        return {"error": "all runs failed"}
+    middle = len(runs) // 2
+    result = dict(sorted(runs, key=lambda r: r["fps"])[middle])
+    for key in MEDIAN_KEYS:
+        result[key] = sorted(r[key] for r in runs)[middle]
+    result["runs"] = len(runs)
+    return result
+
+
+def run_all(names=None, frames_scale=1.0, screen_size=(1280, 720), render_mode="native",
+            backend_name="software", runs=1):
+    scenarios = build_scenarios()
+    results = {}
+    for name in names or scenarios:
+        if name not in scenarios:
+            print(f"Unknown scenario: {name} (available: {', '.join(scenarios)})")
+            continue
+        print(f"Running {name} ...", flush=True)
+        if runs > 1:
+            results[name] = _median_result([_run_child(name, frames_scale, screen_size, render_mode, backend_name)
+                                            for _ in range(runs)])
+        else:
+            results[name] = _run_child(name, frames_scale, screen_size, render_mode, backend_name)
+        r = results[name]
+        if "error" not in r:
+            print(f"  {r['fps']} fps, p99 {r['p99_ms']} ms, peak RSS {r['peak_rss_mb']} MB, "
+                  f"enemies {r['entities_peak'].get('enemies', 0)}", flush=True)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "screen": list(screen_size),
+            "render": render_mode,
+            "backend": backend_name,
+            "frames_scale": frames_scale,
+            "runs": runs,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """ベースラインより悪化した項目のリストを返す"""
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        cur = report["scenarios"].get(name)
+        # 今回動かしていないシナリオ・ベースライン側が失敗していたシナリオは比べない
+        if cur is None or "error" in base:
+            continue
+        # ベースラインでは動いたのに今回落ちたシナリオは回帰にする
+        if "error" in cur:
+            print(f"  {name:<18} {'error':<12} {cur['error']} REGRESSION")
+            regressions.append((name, "error", None, cur["error"]))
+            continue
+        checks = [
+            # (項目, 現在値, 基準値, 大きいほど悪いか)
+            ("fps", cur["fps"], base["fps"], False),
+            ("p99_ms", cur["p99_ms"], base["p99_ms"], True),
+            ("peak_rss_mb", cur["peak_rss_mb"], base["peak_rss_mb"], True),
+        ]
+        # フレーム数が少ないシナリオの p99 は比べるだけで回帰にはしない
+        p99_gated = min(cur.get("frames", 0), base.get("frames", 0)) >= P99_MIN_FRAMES
+        for metric, value, ref, higher_is_worse in checks:
+            if value is None or ref is None or ref == 0:
+                continue
+            change = (value - ref) / ref
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            if metric == "p99_ms" and (not p99_gated or value - ref < P99_FLOOR_MS):
+                status = "noisy" if worse else "ok"
+                worse = False
+            else:
+                status = "REGRESSION" if worse else "ok"
+            print(f"  {name:<18} {metric:<12} {ref:>10} -> {value:>10} ({change:+.1%}) {status}")
+            if worse:
+                regressions.append((name, metric, ref, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless gameplay benchmarks")
+    parser.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    parser.add_argument("--out", default=None, help="write the report to this JSON file")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown ratio (default 0.15)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the report to {BASELINE_PATH}")
+    parser.add_argument("--runs", type=int, default=1, help="run each scenario N times and keep the medians")
+    parser.add_argument("--frames-scale", type=float, default=1.0, help="multiply every scenario's frame count")
+    parser.add_argument("--size", default="1280x720", help="screen size WxH")
+    parser.add_argument("--render", default="native", choices=("native", "low_res"),
+                        help="draw the world at the native size or at RENDER_SETTINGS' internal size")
+    parser.add_argument("--backend", default="software", choices=("software", "texture"),
+                        help="blit to a Surface or draw through the SDL2 texture renderer")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    screen_size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    if args.list:
+        for name, spec in build_scenarios().items():
+            print(f"{name:<18} {spec}")
+        return
+
+    if args.child:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+        spec = build_scenarios()[args.child]
+        result = run_scenario(args.child, spec, args.frames_scale, screen_size, args.render, args.backend)
+        with open(args.child_out, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        pygame.quit()
+        return
+
+    report = run_all(args.scenarios, args.frames_scale, screen_size, args.render, args.backend,
+                     max(1, args.runs))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved: {BASELINE_PATH}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.compare} (tolerance {args.tolerance:.0%})")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) found")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 # src/system/db_manager.py
 import sqlite3
 import os
+import glob
+import time
+import config
 
 DB_PATH = "assets/database/game_data.db"
 
+# 集計対象の列 (mob_rollup_hist の metric 名と一致させる)
+ROLLUP_METRICS = ("survival_time", "speed", "hp")
+
 class DBManager:
     def __init__(self):
         # フォルダがない場合は作成
@@ -12,6 +18,7 @@ class DBManager:
         self.conn = sqlite3.connect(DB_PATH)
         self.cursor = self.conn.cursor()
         self.create_tables()
+        self.run_maintenance()
 
     def create_tables(self):
         # モブの戦績履歴テーブル
@@ -30,10 +37,61 @@ class DBManager:
         )
         """
         self.cursor.execute(query)
+
+        # 進化クエリ (get_top_survivors) 用のインデックス
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mob_history_biome_survival
+        ON mob_history (biome, survival_time DESC)
+        """)
+
+        # (biome, generation) ごとの集計テーブル
+        # 平均・分散は sum / sq_sum から計算する
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS mob_rollup (
+            biome TEXT,
+            generation INTEGER,
+            count INTEGER,
+            survival_sum REAL,
+            survival_sq_sum REAL,
+            survival_min REAL,
+            survival_max REAL,
+            speed_sum REAL,
+            hp_sum REAL,
+            PRIMARY KEY (biome, generation)
+        )
+        """)
+
+        # 分布 (パーセンタイル用) のヒストグラム
+        # bucket: 値 // config.DB_ROLLUP_BUCKETS[metric]
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS mob_rollup_hist (
+            biome TEXT,
+            generation INTEGER,
+            metric TEXT,
+            bucket INTEGER,
+            count INTEGER,
+            PRIMARY KEY (biome, generation, metric, bucket)
+        )
+        """)
         self.conn.commit()
 
+        # 既存DBで集計テーブルが空なら、生ログから作り直す
+        self.cursor.execute("SELECT COUNT(*) FROM mob_rollup")
+        if self.cursor.fetchone()[0] == 0:
+            self.rebuild_rollups()
+
     def log_mob_death(self, mob, generation=1, biome="grass"):
         """モブが死んだ時にデータを保存する"""
+        self._insert_mob_death(mob, generation, biome)
+        self.conn.commit()
+
+    def log_mob_deaths(self, mobs, generation=1, biome="grass"):
+        """同じフレームに死んだモブをまとめて保存する (コミットは1回)"""
+        for mob in mobs:
+            self._insert_mob_death(mob, generation, biome)
+        self.conn.commit()
+
+    def _insert_mob_death(self, mob, generation, biome):
         survival_time = mob.death_time - mob.spawn_time
         
         query = """
@@ -49,10 +107,195 @@ class DBManager:
             mob.death_time,
             survival_time
         ))
-        self.conn.commit()
+        # 集計テーブルも同じトランザクションで更新
+        self._update_rollup(biome, generation, mob.stats["speed"], mob.stats["hp"], survival_time)
         # デバッグ用: コンソールに生存時間を表示
         print(f"Mob logged: Speed={mob.stats['speed']}, Survived={survival_time:.2f}s")
     
+    def _update_rollup(self, biome, generation, speed, hp, survival_time):
+        """1件分を集計テーブルに加算する (UPSERT)"""
+        self.cursor.execute("""
+        INSERT INTO mob_rollup (biome, generation, count, survival_sum, survival_sq_sum,
+                                survival_min, survival_max, speed_sum, hp_sum)
+        VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (biome, generation) DO UPDATE SET
+            count = count + 1,
+            survival_sum = survival_sum + excluded.survival_sum,
+            survival_sq_sum = survival_sq_sum + excluded.survival_sq_sum,
+            survival_min = MIN(survival_min, excluded.survival_min),
+            survival_max = MAX(survival_max, excluded.survival_max),
+            speed_sum = speed_sum + excluded.speed_sum,
+            hp_sum = hp_sum + excluded.hp_sum
+        """, (biome, generation, survival_time, survival_time * survival_time,
+              survival_time, survival_time, speed, hp))
+
+        values = {"survival_time": survival_time, "speed": speed, "hp": hp}
+        for metric in ROLLUP_METRICS:
+            self.cursor.execute("""
+            INSERT INTO mob_rollup_hist (biome, generation, metric, bucket, count)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (biome, generation, metric, bucket) DO UPDATE SET count = count + 1
+            """, (biome, generation, metric, self._bucket(metric, values[metric])))
+
+    def _bucket(self, metric, value):
+        width = config.DB_ROLLUP_BUCKETS.get(metric, 1)
+        return int((value or 0) // width)
+
+    def rebuild_rollups(self):
+        """mob_history 全体から集計テーブルを作り直す"""
+        self.cursor.execute("DELETE FROM mob_rollup")
+        self.cursor.execute("DELETE FROM mob_rollup_hist")
+
+        read_cursor = self.conn.cursor()
+        read_cursor.execute("SELECT biome, generation, speed, hp, survival_time FROM mob_history")
+        count = 0
+        while True:
+            rows = read_cursor.fetchmany(1000)
+            if not rows:
+                break
+            for biome, generation, speed, hp, survival_time in rows:
+                self._update_rollup(biome, generation, speed or 0, hp or 0, survival_time or 0)
+            count += len(rows)
+        self.conn.commit()
+
+        if count > 0:
+            print(f"Rollup rebuilt from {count} mob_history rows")
+
+    def get_rollup(self, biome, generation):
+        """
+        指定バイオーム・世代の集計値を返す (生ログが削除済みでも取得できる)
+        """
+        self.cursor.execute("""
+        SELECT count, survival_sum, survival_sq_sum, survival_min, survival_max, speed_sum, hp_sum
+        FROM mob_rollup
+        WHERE biome = ? AND generation = ?
+        """, (biome, generation))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+
+        count, s_sum, s_sq_sum, s_min, s_max, speed_sum, hp_sum = row
+        mean = s_sum / count
+        variance = max(0.0, s_sq_sum / count - mean * mean)
+
+        hists = {metric: self.get_distribution(biome, generation, metric) for metric in ROLLUP_METRICS}
+
+        return {
+            "count": count,
+            "survival_mean": mean,
+            "survival_std": variance ** 0.5,
+            "survival_min": s_min,
+            "survival_max": s_max,
+            "survival_p50": self._percentile(hists["survival_time"], count, 0.5, "survival_time", s_max),
+            "survival_p90": self._percentile(hists["survival_time"], count, 0.9, "survival_time", s_max),
+            "speed_mean": speed_sum / count,
+            "hp_mean": hp_sum / count,
+            "speed_hist": hists["speed"],
+            "hp_hist": hists["hp"]
+        }
+
+    def get_distribution(self, biome, generation, metric):
+        """ヒストグラムを [(バケット下限値, 件数), ...] で返す"""
+        self.cursor.execute("""
+        SELECT bucket, count
+        FROM mob_rollup_hist
+        WHERE biome = ? AND generation = ? AND metric = ?
+        ORDER BY bucket
+        """, (biome, generation, metric))
+        width = config.DB_ROLLUP_BUCKETS.get(metric, 1)
+        return [(bucket * width, count) for bucket, count in self.cursor.fetchall()]
+
+    def _percentile(self, hist, total, q, metric, upper_limit):
+        # ヒストグラムから近似値を求める (該当バケットの上端、ただし最大値は超えない)
+        width = config.DB_ROLLUP_BUCKETS.get(metric, 1)
+        target = total * q
+        running = 0
+        for lower, count in hist:
+            running += count
+            if running >= target:
+                return min(lower + width, upper_limit)
+        return upper_limit
+
+    def run_maintenance(self):
+        """保持ポリシーの適用 (VACUUM はゲーム終了時の compact_database で行う)"""
+        policy = config.DB_RETENTION
+        if not policy.get("enabled", False):
+            return
+
+        elite_keep = policy.get("elite_keep", 100)
+        recent_keep = policy.get("recent_keep", 500)
+        if self.count_retention_policy(elite_keep, recent_keep) == 0:
+            return
+
+        # 生ログを削る回は毎回、削る前の DB を丸ごと残しておく (history_export 用の生データ)
+        self.write_rotating_backup(policy.get("backup_path") or DB_PATH + ".bak",
+                                   policy.get("backup_keep", 5))
+
+        removed = self.apply_retention_policy(elite_keep, recent_keep)
+        if removed > 0:
+            print(f"DB retention: pruned {removed} mob_history rows")
+
+    def write_rotating_backup(self, backup_path, keep):
+        """backup_path に実行日時を付けた名前でバックアップし、新しい keep 個だけ残す
+        (game_data.db.bak -> game_data.db.20250101_120000.bak)"""
+        root, ext = os.path.splitext(backup_path)
+        path = f"{root}.{time.strftime('%Y%m%d_%H%M%S')}{ext}"
+        self.backup(path)
+
+        old = sorted(glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}"))
+        for stale in old[:-max(1, keep)]:
+            os.remove(stale)
+
+    def backup(self, path):
+        """DB 全体を path にコピーする (sqlite のオンラインバックアップ)。
+        一時ファイルに書いてから置き換えるので、途中で止まっても前のファイルは壊れない"""
+        self.conn.commit()
+        tmp_path = path + ".tmp"
+        dest = sqlite3.connect(tmp_path)
+        try:
+            self.conn.backup(dest)
+        finally:
+            dest.close()
+        os.replace(tmp_path, path)
+        print(f"DB backup written: {path}")
+
+    # 保持ポリシーで消す行 (バイオームごとに「上位 elite_keep 件」と「直近 recent_keep 件」以外)
+    RETENTION_WHERE = """
+            WHERE biome = ?
+              AND id NOT IN (
+                SELECT id FROM mob_history WHERE biome = ? ORDER BY survival_time DESC LIMIT ?
+              )
+              AND id NOT IN (
+                SELECT id FROM mob_history WHERE biome = ? ORDER BY id DESC LIMIT ?
+              )
+            """
+
+    def count_retention_policy(self, elite_keep, recent_keep):
+        """apply_retention_policy で消える行数 (消さずに数えるだけ)"""
+        removed = 0
+        for biome in self._history_biomes():
+            self.cursor.execute("SELECT COUNT(*) FROM mob_history" + self.RETENTION_WHERE,
+                                (biome, biome, elite_keep, biome, recent_keep))
+            removed += self.cursor.fetchone()[0]
+        return removed
+
+    def apply_retention_policy(self, elite_keep, recent_keep):
+        """
+        バイオームごとに「上位 elite_keep 件」と「直近 recent_keep 件」だけ生ログを残す
+        (削除された分の統計は mob_rollup に残っている)
+        """
+        removed = 0
+        for biome in self._history_biomes():
+            self.cursor.execute("DELETE FROM mob_history" + self.RETENTION_WHERE,
+                                (biome, biome, elite_keep, biome, recent_keep))
+            removed += self.cursor.rowcount
+        self.conn.commit()
+        return removed
+
+    def _history_biomes(self):
+        self.cursor.execute("SELECT DISTINCT biome FROM mob_history")
+        return [r[0] for r in self.cursor.fetchall()]
+
     def get_top_survivors(self, biome, limit=10):
         """
         指定されたバイオームで、生存時間が長かった上位の個体のステータスを取得する
@@ -75,4 +318,22 @@ class DBManager:
         return survivors
 
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        self.conn.close()
+
+
+def compact_database(path=None):
+    """空きページが多ければ VACUUM する (数百ms かかるので、シーンの途中ではなく終了時に呼ぶ)"""
+    path = path or DB_PATH
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count > 0 and free_count / page_count > config.DB_RETENTION.get("vacuum_free_ratio", 0.25):
+            conn.execute("VACUUM")
+            print(f"DB vacuumed: {free_count}/{page_count} pages were free")
+            return True
+        return False
+    finally:
+        conn.close()
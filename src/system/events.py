@@ -0,0 +1,95 @@
+# src/system/events.py
+# ゲームプレイ中のイベントキュー
+#
+# 当たり判定や武器はその場で DB 記録・ドロップ・テキスト表示をせず、
+# 小さなタプルのイベントを push するだけにします。
+# GameplayScreen.update の最後に flush() すると、登録した処理 (consumer) が
+# 種類ごとにまとめたイベントを1回ずつ受け取ります。
+#   KILL   : (enemy, generation)            倒した敵 (グループからは外し済み) と倒した時の世代
+#   DAMAGE : (source, target, amount, x, y) source は DAMAGE_SOURCES のどれか
+#   PICKUP : (item,)                        回収したアイテム
+#   HEAL   : (source, amount, x, y)         実際に回復した量
+# consumer は interval フレームに1回だけ呼ぶように間引けます (イベントはその間ためておく)。
+# consumer ごとの呼び出し回数・イベント数・処理時間を report() で取れます。
+import time
+
+KILL = 0
+DAMAGE = 1
+PICKUP = 2
+HEAL = 3
+EVENT_NAMES = ("kill", "damage", "pickup", "heal")
+
+# bullet: プレイヤーの弾 / weapon: その他の武器 / enemy_bullet: ボスの弾 / contact: 敵との接触
+DAMAGE_SOURCES = ("bullet", "weapon", "enemy_bullet", "contact")
+
+
+class Consumer:
+    def __init__(self, name, kinds, handler, interval=1):
+        self.name = name
+        self.kinds = tuple(kinds)
+        self.handler = handler
+        self.interval = max(1, interval)
+        self.pending = {kind: [] for kind in self.kinds}
+        self.frames_waited = 0
+
+        # 計測用
+        self.calls = 0
+        self.events = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+
+class EventBus:
+    def __init__(self):
+        self.queues = [[] for _ in EVENT_NAMES]
+        self.consumers = []
+        self.frame_count = 0
+
+    def subscribe(self, name, kinds, handler, interval=1):
+        """handler(batch) を登録する。batch は {種類: [イベント, ...]} (登録順に呼ばれる)"""
+        consumer = Consumer(name, kinds, handler, interval)
+        self.consumers.append(consumer)
+        return consumer
+
+    def push(self, kind, *payload):
+        self.queues[kind].append(payload)
+
+    def flush(self, force=False):
+        """1フレーム分のイベントを consumer に配る (force なら間引き中でも呼ぶ)"""
+        self.frame_count += 1
+        # 処理中に push されたイベントは次のフレームに回す
+        queues = self.queues
+        self.queues = [[] for _ in EVENT_NAMES]
+        for consumer in self.consumers:
+            pending = consumer.pending
+            for kind in consumer.kinds:
+                if queues[kind]:
+                    pending[kind].extend(queues[kind])
+
+            consumer.frames_waited += 1
+            if not force and consumer.frames_waited < consumer.interval:
+                continue
+            consumer.frames_waited = 0
+
+            count = sum(len(events) for events in pending.values())
+            if not count:
+                continue
+            consumer.pending = {kind: [] for kind in consumer.kinds}
+            start = time.perf_counter()
+            consumer.handler(pending)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            consumer.calls += 1
+            consumer.events += count
+            consumer.total_ms += elapsed
+            consumer.last_ms = elapsed
+
+    def report(self):
+        return {
+            c.name: {
+                "calls": c.calls,
+                "events": c.events,
+                "total_ms": round(c.total_ms, 3),
+                "last_ms": round(c.last_ms, 3),
+            }
+            for c in self.consumers
+        }
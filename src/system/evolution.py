@@ -1,6 +1,6 @@
 # src/system/evolution.py
 import random
-import config
+from src.system import game_data
 
 class EvolutionManager:
     def __init__(self, db_manager):
@@ -19,8 +19,8 @@ class EvolutionManager:
             parent_b = random.choice(parents)
             
             # まずベースとなる種族を選ぶ
-            type_id = random.choice(list(config.MOB_BASE_STATS.keys()))
-            base_data = config.MOB_BASE_STATS[type_id]
+            type_id = random.choice(game_data.MOB_TYPE_IDS)
+            base_data = game_data.MOB_TYPES[type_id]
 
             # 速度とHPの継承（親の平均）
             evolved_speed = (parent_a["speed"] + parent_b["speed"]) // 2
@@ -33,7 +33,7 @@ class EvolutionManager:
                 evolved_hp += random.randint(-5, 5)
 
             # ★重要: 種族ごとの限界値で速度を制限 (クランプ)
-            evolved_speed = max(base_data["min_speed"], min(base_data["max_speed"], evolved_speed))
+            evolved_speed = max(base_data.min_speed, min(base_data.max_speed, evolved_speed))
             
             # HPも1以下にならないように
             evolved_hp = max(1, evolved_hp)
@@ -41,12 +41,12 @@ class EvolutionManager:
             child_stats = {
                 # 種族データ
                 "type_id": type_id,
-                "name": base_data["name"],
-                "image": base_data["image"],
-                "size": base_data["size"], # ★サイズを設定
-                "attack": base_data["attack"],
-                "defense_rate": base_data["defense_rate"],
-                "attack_type": base_data["attack_type"],
+                "name": base_data.name,
+                "image": base_data.image,
+                "size": base_data.size, # ★サイズを設定
+                "attack": base_data.attack,
+                "defense_rate": base_data.defense_rate,
+                "attack_type": base_data.attack_type,
 
                 # 進化データ
                 "speed": evolved_speed,
@@ -0,0 +1,249 @@
+# src/system/flow_field.py
+# 敵の追跡用フローフィールド
+#
+# 読み込み済みチャンク全体をマス目に区切り、プレイヤーのマスから BFS して
+# 「各マスから次に向かうマス」を1回だけ計算します。
+# 敵は Enemy.update で自分のマスを1回引くだけで障害物を避ける方向が分かるので、
+# 敵の数が増えても経路計算のコストは増えません。
+# 障害物 (Obstacle.hitbox) が重なるマスは通れないマスになります。
+# 再計算するのは読み込み済みチャンクが変わった時と、プレイヤーが rebuild_cells マス以上動いた時だけで、
+# どちらも rebuild_interval フレームに1回までに抑えます。
+# BFS は1フレームに build_budget マスずつ進め、終わるまでは前のフィールド (前のグリッドの座標のまま) を
+# 引きます。1フレームで BFS 全体を行うとフレーム時間が跳ねるためです。
+# フィールドがまだ1つも無い時 (ステージ開始直後) だけは、最初の lookup でその場で作ります。
+# BFS はプレイヤーから「前回の作り直し以降に lookup された一番遠い敵」+ reach_margin マスまでで止めます
+# (敵が近くにしかいない時に、読み込み済みチャンク全体を調べない)。
+import array
+import config
+
+# 隣のマス (上下左右を先に調べて、斜めは後回し)
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1))
+
+UNREACHABLE = -1
+DIRECT = -2     # プレイヤーのすぐ近く: 直接プレイヤーへ向かう
+
+
+class FlowField:
+    def __init__(self, map_gen):
+        self.map_gen = map_gen
+
+        settings = config.FLOW_FIELD
+        self.enabled = settings.get("enabled", True)
+        self.cell_size = settings.get("cell_size", 50)
+        self.rebuild_interval = max(1, settings.get("rebuild_interval", 6))
+        self.direct_steps = settings.get("direct_steps", 2)
+        self.rebuild_cells = max(1, settings.get("rebuild_cells", 2))
+        self.build_budget = settings.get("build_budget", 1500)
+        self.reach_margin = settings.get("reach_margin", 6)
+
+        # 今のチャンクのグリッド (ワールド座標の原点と大きさ)
+        self.origin_x = 0
+        self.origin_y = 0
+        self.cols = 0
+        self.rows = 0
+        self.stride = 2
+        self.blocked = bytearray()
+
+        # lookup が引くフィールド (origin_x, origin_y, cols, rows, stride, next_cell)
+        # next_cell はマスごとの「次に向かうマス」の添字 (UNREACHABLE / DIRECT もあり)
+        self.field = None
+
+        self.chunk_key = None       # blocked を作った時の読み込み済みチャンク
+        self.player_cell = None     # 最後に BFS を始めた時のプレイヤーのマス
+        self.grid_changed = False   # チャンクが変わり、今のグリッドでまだ BFS を始めていない
+        self.frames_since_build = 0
+        self.pending = None         # 作りかけの BFS [next_cell, steps, queue, head, max_steps]
+        self.build_now = False      # フィールドが無いので、最初の lookup で BFS を最後まで進める
+        self.looked_up = False      # 前の update 以降に lookup されたか (敵がいなければ BFS を進めない)
+        # lookup された位置のプレイヤーからの最大距離 (ピクセル、x と y の大きい方)
+        self.player_x = 0.0
+        self.player_y = 0.0
+        self.reach = 0.0
+        self.rebuild_count = 0
+
+    # --- グリッド ---
+    # 外周に1マス分の塞がったマスを足して持つ (BFS で範囲チェックを省くため)
+    # 添字は (row + 1) * stride + (col + 1)
+    def _rebuild_blocked(self):
+        """読み込み済みチャンクを覆うグリッドを作り、障害物のマスを塞ぐ"""
+        map_gen = self.map_gen
+        chunks = map_gen.loaded_chunks
+        chunk_px = map_gen.chunk_pixel_size
+        cs = self.cell_size
+
+        min_cx = min(cx for cx, _ in chunks)
+        max_cx = max(cx for cx, _ in chunks)
+        min_cy = min(cy for _, cy in chunks)
+        max_cy = max(cy for _, cy in chunks)
+
+        self.origin_x = min_cx * chunk_px
+        self.origin_y = min_cy * chunk_px
+        self.cols = -(-(max_cx - min_cx + 1) * chunk_px // cs)
+        self.rows = -(-(max_cy - min_cy + 1) * chunk_px // cs)
+        cols, rows = self.cols, self.rows
+        stride = cols + 2
+        self.stride = stride
+
+        blocked = bytearray(stride * (rows + 2))
+        for c in range(stride):
+            blocked[c] = 1
+            blocked[(rows + 1) * stride + c] = 1
+        for r in range(rows + 2):
+            blocked[r * stride] = 1
+            blocked[r * stride + cols + 1] = 1
+
+        if map_gen.obstacles_group is not None:
+            for obstacle in map_gen.obstacles_group:
+                if not obstacle.is_solid:
+                    continue
+                hb = obstacle.hitbox
+                if hb.width <= 0 or hb.height <= 0:
+                    continue
+                c0 = max(0, (hb.left - self.origin_x) // cs)
+                c1 = min(cols - 1, (hb.right - 1 - self.origin_x) // cs)
+                r0 = max(0, (hb.top - self.origin_y) // cs)
+                r1 = min(rows - 1, (hb.bottom - 1 - self.origin_y) // cs)
+                for r in range(r0, r1 + 1):
+                    base = (r + 1) * stride + 1
+                    for c in range(c0, c1 + 1):
+                        blocked[base + c] = 1
+        self.blocked = blocked
+
+    def _start_build(self, start_col, start_row):
+        """プレイヤーのマスから BFS を始める (進めるのは _step_build)"""
+        size = len(self.blocked)
+        next_cell = array.array("i", [UNREACHABLE]) * size
+        steps = array.array("i", [-1]) * size
+        start = (start_row + 1) * self.stride + start_col + 1
+        next_cell[start] = DIRECT
+        steps[start] = 0
+        # まだ lookup が無い時 (reach 0) はグリッド全体
+        max_steps = int(self.reach // self.cell_size) + 1 + self.reach_margin if self.reach else len(self.blocked)
+        self.reach = 0.0
+        self.pending = [next_cell, steps, [start], 0, max_steps]
+
+    def _step_build(self, budget=None):
+        """作りかけの BFS を budget マス分進める (None なら最後まで)。終わったら field を入れ替える"""
+        next_cell, steps, queue, head, max_steps = self.pending
+        stride = self.stride
+        blocked = self.blocked
+        direct_steps = self.direct_steps
+
+        # (隣への添字の差, 斜めの時に空いている必要がある上下左右のマス2つ)
+        straight = [d + dr * stride for d, dr in NEIGHBORS[:4]]
+        diagonal = [(dc + dr * stride, dc, dr * stride) for dc, dr in NEIGHBORS[4:]]
+
+        end = len(queue) if budget is None else head + budget
+        while head < len(queue) and (budget is None or head < end):
+            i = queue[head]
+            head += 1
+            step = steps[i] + 1
+            if step > max_steps:
+                # 幅優先なので、ここから先のマスもすべて届かない範囲
+                head = len(queue)
+                break
+            target = DIRECT if step <= direct_steps else i
+
+            for d in straight:
+                n = i + d
+                if steps[n] < 0 and not blocked[n]:
+                    steps[n] = step
+                    next_cell[n] = target
+                    queue.append(n)
+            # 斜め移動は両側の上下左右が空いている時だけ (障害物の角をすり抜けない)
+            for d, side_a, side_b in diagonal:
+                n = i + d
+                if steps[n] < 0 and not blocked[n] and not blocked[i + side_a] and not blocked[i + side_b]:
+                    steps[n] = step
+                    next_cell[n] = target
+                    queue.append(n)
+
+        if head < len(queue):
+            self.pending[3] = head
+            return False
+        self.pending = None
+        self.field = (self.origin_x, self.origin_y, self.cols, self.rows, stride, next_cell)
+        self.rebuild_count += 1
+        return True
+
+    def _request_build(self, player_pos, looked_up):
+        """今のグリッドでプレイヤーのマスから BFS を始める"""
+        col = int((player_pos.x - self.origin_x) // self.cell_size)
+        row = int((player_pos.y - self.origin_y) // self.cell_size)
+        self.player_cell = (col, row)
+        self.frames_since_build = 0
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            # 読み込み済みチャンクの外: 全員直接プレイヤーを追う
+            self.pending = None
+            self.field = None
+            return
+        self._start_build(col, row)
+        if self.field is None:
+            self.build_now = True
+        elif looked_up:
+            self._step_build(self.build_budget or None)
+
+    def update(self, player_pos):
+        """
+        毎フレーム呼ぶ。作り直しが必要かを判定し、作りかけの BFS を build_budget マス分進める
+        (前のフレームに lookup が無ければ進めない。敵がいない時は計算しない)
+        """
+        self.frames_since_build += 1
+        looked_up = self.looked_up
+        self.looked_up = False
+        self.player_x = player_pos.x
+        self.player_y = player_pos.y
+        if not self.enabled or not self.map_gen.loaded_chunks:
+            return
+
+        chunk_key = frozenset(self.map_gen.loaded_chunks)
+        if chunk_key != self.chunk_key:
+            # グリッドが変わるので作りかけは捨てる (field は前のグリッドの座標のまま引ける)
+            self._rebuild_blocked()
+            self.chunk_key = chunk_key
+            self.pending = None
+            self.grid_changed = True
+
+        if self.pending is not None:
+            if looked_up:
+                self._step_build(self.build_budget or None)
+            return
+
+        # チャンクが変わったか、プレイヤーが rebuild_cells マス以上動いた時だけ、間隔をあけて作り直す
+        if self.field is not None and self.frames_since_build < self.rebuild_interval:
+            return
+        if not self.grid_changed:
+            col = int((player_pos.x - self.origin_x) // self.cell_size)
+            row = int((player_pos.y - self.origin_y) // self.cell_size)
+            old_col, old_row = self.player_cell
+            if max(abs(col - old_col), abs(row - old_row)) < self.rebuild_cells:
+                return
+        self.grid_changed = False
+        self._request_build(player_pos, looked_up)
+
+    def lookup(self, x, y):
+        """
+        (x, y) にいる敵が次に向かうワールド座標を返す。
+        グリッド外・到達できないマス・プレイヤーのすぐ近くでは None (直接プレイヤーを追う)
+        """
+        self.looked_up = True
+        reach = max(abs(x - self.player_x), abs(y - self.player_y))
+        if reach > self.reach:
+            self.reach = reach
+        if self.build_now:
+            self.build_now = False
+            if self.pending is not None:
+                self._step_build()
+        field = self.field
+        if field is None:
+            return None
+        origin_x, origin_y, cols, rows, stride, next_cell = field
+        cs = self.cell_size
+        col = int((x - origin_x) // cs)
+        row = int((y - origin_y) // cs)
+        if col < 0 or row < 0 or col >= cols or row >= rows:
+            return None
+        n = next_cell[(row + 1) * stride + col + 1]
+        if n < 0:
+            return None
+        return (origin_x + (n % stride - 0.5) * cs, origin_y + (n // stride - 0.5) * cs)
@@ -0,0 +1,60 @@
+# src/system/frame_state.py
+# 1フレーム分の時刻と入力
+#
+# ゲームプレイ中のコードは pygame.time.get_ticks() / pygame.key.get_pressed() /
+# pygame.mouse.get_pos() の代わりにここの関数を使います。
+# main.py がフレームの最初に capture() で値を固定し、リプレイ時は
+# src/system/replay.py が記録した値を set_frame() で流し込みます。
+# (フレームの途中で時刻が進まないので、同じ入力からは必ず同じ結果になります)
+# capture() される前 (ツールやテストから直接使う場合) は pygame の値をそのまま返します。
+import time
+import pygame
+
+_ticks = None
+_keys = None
+_mouse_pos = None
+# get_ticks() == 0 の時の UNIX 時刻 (DB に記録する時刻の計算用)
+_epoch_base = None
+
+
+def capture():
+    """今フレームの時刻と入力を固定する (main.py のループの先頭で呼ぶ)"""
+    global _ticks, _keys, _mouse_pos, _epoch_base
+    _ticks = pygame.time.get_ticks()
+    _keys = pygame.key.get_pressed()
+    _mouse_pos = pygame.mouse.get_pos()
+    if _epoch_base is None:
+        _epoch_base = time.time() - _ticks / 1000.0
+
+
+def set_frame(ticks, keys, mouse_pos, epoch_base=None):
+    """記録済みの値でフレームを進める (リプレイ用)"""
+    global _ticks, _keys, _mouse_pos, _epoch_base
+    _ticks = ticks
+    _keys = keys
+    _mouse_pos = mouse_pos
+    if epoch_base is not None:
+        _epoch_base = epoch_base
+
+
+def get_ticks():
+    return _ticks if _ticks is not None else pygame.time.get_ticks()
+
+
+def get_pressed():
+    return _keys if _keys is not None else pygame.key.get_pressed()
+
+
+def get_mouse_pos():
+    return _mouse_pos if _mouse_pos is not None else pygame.mouse.get_pos()
+
+
+def get_epoch_base():
+    if _epoch_base is None:
+        return time.time() - get_ticks() / 1000.0
+    return _epoch_base
+
+
+def get_time():
+    """DB に記録する時刻 (秒)。フレーム時刻から計算するのでリプレイでも同じ値になる"""
+    return get_epoch_base() + get_ticks() / 1000.0
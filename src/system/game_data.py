@@ -0,0 +1,193 @@
+# src/system/game_data.py
+# config.py のゲームデータを起動時に検証して、読み取り専用の表にまとめる
+#
+# モブの種類・ステージ・マップオブジェクト・武器の設定を、毎回 dict の
+# .get() を重ねて引く代わりに、ここで作った表から定数時間で引きます。
+#   MOB_TYPE_IDS : モブの type_id のタプル (random.choice にそのまま渡せる)
+#   MOB_TYPES    : type_id -> MobType
+#   STAGES       : バイオーム名 -> Stage (障害物・装飾は MapObject のタプル)
+#   MAP_OBJECTS  : ファイル名 (.png 付き) -> MapObject (当たり判定のパラメータ)
+#   WEAPONS      : 武器キー -> 読み取り専用の stats (MappingProxyType)
+# 設定に間違いがあれば import した時点で GameDataError にまとめて出します。
+# (プレイ中に KeyError で落ちるより、起動時に分かった方が直しやすいため)
+import types
+from collections import namedtuple
+import config
+
+
+class GameDataError(ValueError):
+    pass
+
+
+MobType = namedtuple("MobType", [
+    "type_id", "name", "image", "hp", "speed", "min_speed", "max_speed",
+    "size", "attack", "defense_rate", "attack_type",
+])
+
+# scale: 基準サイズ (80px) に対する倍率 / hitbox_w, hitbox_h: 画像に対する比率 / offset_y: 判定の縦ずれ
+MapObject = namedtuple("MapObject", ["file_name", "scale", "hitbox_w", "hitbox_h", "offset_y"])
+
+Stage = namedtuple("Stage", [
+    "key", "display_name", "desc", "difficulty", "bg_color",
+    "obstacle_threshold", "obstacle_density", "decoration_threshold", "frequency",
+    "obstacles", "decorations",
+])
+
+# MAP_OBJECT_SETTINGS に無い画像の値 (Obstacle の既定値と同じ)
+DEFAULT_MAP_OBJECT = MapObject("", 1.0, 0.6, 0.4, 0)
+
+MOB_REQUIRED = ("name", "image", "hp", "speed", "min_speed", "max_speed", "size", "attack", "defense_rate", "attack_type")
+WEAPON_REQUIRED = ("name", "image", "size", "damage")
+BOSS_ATTACK_TYPES = ("circle", "target", "random", "target_rapid")  # Boss.perform_skill が扱う種類
+
+MOB_TYPE_IDS = ()
+MOB_TYPES = {}
+STAGES = {}
+MAP_OBJECTS = {}
+WEAPONS = {}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _png_name(name):
+    return name if name.lower().endswith(".png") else name + ".png"
+
+
+def _compile_mobs(errors):
+    mobs = {}
+    for type_id, base in config.MOB_BASE_STATS.items():
+        where = f"MOB_BASE_STATS[{type_id!r}]"
+        missing = [k for k in MOB_REQUIRED if k not in base]
+        if missing:
+            errors.append(f"{where}: missing {', '.join(missing)}")
+            continue
+        for key in ("hp", "speed", "min_speed", "max_speed", "size", "attack", "defense_rate"):
+            if not _is_number(base[key]):
+                errors.append(f"{where}: {key} must be a number (got {base[key]!r})")
+        if any(not _is_number(base[k]) for k in ("hp", "speed", "min_speed", "max_speed", "size", "defense_rate")):
+            continue
+        if base["hp"] <= 0 or base["size"] <= 0 or base["defense_rate"] <= 0:
+            errors.append(f"{where}: hp, size and defense_rate must be positive")
+        if not base["min_speed"] <= base["speed"] <= base["max_speed"]:
+            errors.append(f"{where}: speed {base['speed']} is outside min_speed..max_speed")
+        mobs[type_id] = MobType(type_id, *(base[k] for k in MOB_REQUIRED))
+    if not mobs and not errors:
+        errors.append("MOB_BASE_STATS: at least one mob type is required")
+    return mobs
+
+
+def _compile_map_objects(errors):
+    objects = {}
+    for file_name, props in config.MAP_OBJECT_SETTINGS.items():
+        where = f"MAP_OBJECT_SETTINGS[{file_name!r}]"
+        unknown = set(props) - set(MapObject._fields)
+        if unknown:
+            errors.append(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+        values = {k: props.get(k, getattr(DEFAULT_MAP_OBJECT, k)) for k in ("scale", "hitbox_w", "hitbox_h", "offset_y")}
+        if not all(_is_number(v) for v in values.values()):
+            errors.append(f"{where}: values must be numbers")
+            continue
+        if values["scale"] <= 0:
+            errors.append(f"{where}: scale must be positive")
+        if not (0 < values["hitbox_w"] <= 1 and 0 < values["hitbox_h"] <= 1):
+            errors.append(f"{where}: hitbox_w / hitbox_h must be in (0, 1]")
+        objects[_png_name(file_name)] = MapObject(_png_name(file_name), **values)
+    return objects
+
+
+def _map_object(objects, name):
+    file_name = _png_name(name)
+    obj = objects.get(file_name)
+    if obj is None:
+        obj = DEFAULT_MAP_OBJECT._replace(file_name=file_name)
+    return obj
+
+
+def _compile_stages(errors, objects):
+    stages = {}
+    for key, settings in config.STAGE_SETTINGS.items():
+        where = f"STAGE_SETTINGS[{key!r}]"
+        gen = settings.get("generation", {})
+        assets = settings.get("assets", {})
+
+        bg_color = tuple(settings.get("bg_color", (34, 139, 34)))
+        if len(bg_color) != 3 or not all(isinstance(c, int) and 0 <= c <= 255 for c in bg_color):
+            errors.append(f"{where}: bg_color must be an (r, g, b) tuple")
+
+        obstacle_threshold = gen.get("obstacle_threshold", 0.75)
+        decoration_threshold = gen.get("decoration_threshold", 0.40)
+        obstacle_density = gen.get("obstacle_density", 0.3)
+        frequency = gen.get("frequency", 8.0)
+        if not all(_is_number(v) for v in (obstacle_threshold, decoration_threshold, obstacle_density, frequency)):
+            errors.append(f"{where}: generation values must be numbers")
+            continue
+        if decoration_threshold >= obstacle_threshold:
+            errors.append(f"{where}: decoration_threshold must be below obstacle_threshold")
+        if not 0 <= obstacle_density <= 1:
+            errors.append(f"{where}: obstacle_density must be in [0, 1]")
+
+        stages[key] = Stage(
+            key,
+            settings.get("display_name", key),
+            settings.get("desc", ""),
+            settings.get("difficulty", 1),
+            bg_color,
+            obstacle_threshold,
+            obstacle_density,
+            decoration_threshold,
+            frequency,
+            tuple(_map_object(objects, n) for n in assets.get("obstacles", [])),
+            tuple(_map_object(objects, n) for n in assets.get("decorations", [])),
+        )
+    return stages
+
+
+def _compile_weapons(errors):
+    weapons = {}
+    for key, stats in config.WEAPON_STATS.items():
+        where = f"WEAPON_STATS[{key!r}]"
+        missing = [k for k in WEAPON_REQUIRED if k not in stats]
+        if missing:
+            errors.append(f"{where}: missing {', '.join(missing)}")
+            continue
+        weapons[key] = types.MappingProxyType(dict(stats))
+    return weapons
+
+
+def _check_bosses(errors):
+    for minute, boss in getattr(config, "BOSS_SCHEDULE", {}).items():
+        where = f"BOSS_SCHEDULE[{minute!r}]"
+        for key in ("filename", "name", "hp", "damage", "scale"):
+            if key not in boss:
+                errors.append(f"{where}: missing {key}")
+        for i, atk in enumerate(boss.get("attacks", [])):
+            missing = [k for k in ("type", "image", "count", "speed") if k not in atk]
+            if missing:
+                errors.append(f"{where}.attacks[{i}]: missing {', '.join(missing)}")
+            elif atk["type"] not in BOSS_ATTACK_TYPES:
+                errors.append(f"{where}.attacks[{i}]: unknown type {atk['type']!r}")
+
+
+def load():
+    """config.py を検証して表を作り直す (間違いがあれば GameDataError)"""
+    global MOB_TYPE_IDS, MOB_TYPES, STAGES, MAP_OBJECTS, WEAPONS
+
+    errors = []
+    mobs = _compile_mobs(errors)
+    objects = _compile_map_objects(errors)
+    stages = _compile_stages(errors, objects)
+    weapons = _compile_weapons(errors)
+    _check_bosses(errors)
+    if errors:
+        raise GameDataError("Invalid game data in config.py:\n  " + "\n  ".join(errors))
+
+    MOB_TYPE_IDS = tuple(mobs)
+    MOB_TYPES = types.MappingProxyType(mobs)
+    STAGES = types.MappingProxyType(stages)
+    MAP_OBJECTS = types.MappingProxyType(objects)
+    WEAPONS = types.MappingProxyType(weapons)
+
+
+load()
@@ -0,0 +1,245 @@
+# src/system/history_export.py
+# 進化履歴のエクスポート (分析用)
+#
+# 使い方:
+#   python -m src.system.history_export --out exports
+#
+# ライブDBを読み取り専用で開き、fetchmany でチャンクごとに読みながら
+# テーブルごとに CSV と .npz (列ごとの .npy をまとめたもの) を書き出します。
+# テーブル全体をメモリに載せることはありません。
+# .npz は numpy なしで書き出しているので、このゲーム自体は numpy に依存しません。
+# (分析側では numpy.load("mob_history.npz") で読めます)
+#
+# 列の形式は PRAGMA table_info の宣言型から決め、実際の値が合わない時だけ広げます
+# (int -> float -> text。それまでに書いた分は一時ファイルを読み直して書き直す)。
+# NULL は float では NaN、text では -1 です。int の列に NULL があれば float に広げるので、
+# CSV の空欄が .npy で 0 になることはありません。
+import argparse
+import array
+import csv
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+
+from src.system.db_manager import DB_PATH
+
+EXPORT_TABLES = ["mob_history", "mob_rollup", "mob_rollup_hist"]
+DEFAULT_CHUNK_SIZE = 10000
+
+# .npy ヘッダーは後から行数を書き換えるので固定長にしておく (10 + 118 = 128 バイト)
+NPY_HEADER_LEN = 118
+
+
+def _npy_header(descr, length):
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, length)
+    header = header.ljust(NPY_HEADER_LEN - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", NPY_HEADER_LEN) + header.encode("latin1")
+
+
+# 形式の広さ (値が合わない時は右へ広げる)
+KIND_ORDER = ("int", "float", "text")
+ARRAY_CODES = {"int": "q", "float": "d", "text": "i"}
+
+
+class ColumnWriter:
+    """1列分の .npy を一時ファイルに追記していく"""
+    def __init__(self, path, kind):
+        self.path = path
+        self.kind = kind  # "int" / "float" / "text"
+        self.length = 0
+        self.file = open(path, "wb")
+        self.file.write(_npy_header(self.descr, 0))
+
+        # 文字列は辞書エンコード (コード値を int32 で保存し、辞書は最後に書く)
+        self.categories = {}
+        # 実数の値を書いたか (無ければ float の列の値はすべて元が整数か NULL)
+        self.has_real = False
+
+    @property
+    def descr(self):
+        return {"int": "<i8", "float": "<f8", "text": "<i4"}[self.kind]
+
+    def append(self, values):
+        kind = self._kind_for(values)
+        if kind != self.kind:
+            self.widen(kind)
+        self._write(values)
+
+    def _kind_for(self, values):
+        """values を入れるのに必要な形式 (今の形式より狭くはしない)"""
+        kind = self.kind
+        if kind == "text":
+            return kind
+        for v in values:
+            if isinstance(v, (str, bytes)):
+                return "text"
+            if isinstance(v, float):
+                self.has_real = True
+                kind = "float"
+            elif v is None and kind == "int":
+                kind = "float"
+        return kind
+
+    def _write(self, values):
+        if self.kind == "int":
+            data = array.array("q", [int(v) for v in values])
+        elif self.kind == "float":
+            data = array.array("d", [float("nan") if v is None else float(v) for v in values])
+        else:
+            codes = []
+            for v in values:
+                if v is None:
+                    codes.append(-1)
+                    continue
+                if not isinstance(v, str):
+                    # text に広げた列の数値は CSV と同じ文字列にする
+                    v = str(v)
+                if v not in self.categories:
+                    self.categories[v] = len(self.categories)
+                codes.append(self.categories[v])
+            data = array.array("i", codes)
+
+        if sys.byteorder == "big":
+            data.byteswap()
+        self.file.write(data.tobytes())
+        self.length += len(values)
+
+    def widen(self, kind):
+        """これまでに書いた値を kind の形式で書き直す"""
+        old_kind = self.kind
+        old_path = self.path + ".old"
+        self.file.close()
+        os.replace(self.path, old_path)
+
+        self.kind = kind
+        self.length = 0
+        self.file = open(self.path, "wb")
+        self.file.write(_npy_header(self.descr, 0))
+
+        code = ARRAY_CODES[old_kind]
+        step = array.array(code).itemsize * DEFAULT_CHUNK_SIZE
+        with open(old_path, "rb") as f:
+            f.seek(10 + NPY_HEADER_LEN)
+            while True:
+                chunk = f.read(step)
+                if not chunk:
+                    break
+                data = array.array(code)
+                data.frombytes(chunk)
+                if sys.byteorder == "big":
+                    data.byteswap()
+                values = data.tolist()
+                if kind == "text":
+                    # NaN (元は NULL) は None に戻し、元が整数の値は整数の文字列にする
+                    if old_kind == "float" and not self.has_real:
+                        values = [None if v != v else int(v) for v in values]
+                    else:
+                        values = [None if v != v else v for v in values]
+                self._write(values)
+        os.remove(old_path)
+
+    def close(self):
+        # 行数が確定したのでヘッダーを書き直す
+        self.file.seek(0)
+        self.file.write(_npy_header(self.descr, self.length))
+        self.file.close()
+
+    def write_categories(self, path):
+        names = sorted(self.categories, key=self.categories.get)
+        width = max([len(n) for n in names] + [1])
+        with open(path, "wb") as f:
+            f.write(_npy_header("<U%d" % width, len(names)))
+            for n in names:
+                f.write(n.ljust(width, "\0").encode("utf-32-le"))
+
+
+def _declared_kind(decl_type):
+    """宣言型から最初の形式を決める (SQLite の型アフィニティの規則と同じ順に見る)"""
+    decl = (decl_type or "").upper()
+    if "INT" in decl:
+        return "int"
+    if "CHAR" in decl or "CLOB" in decl or "TEXT" in decl:
+        return "text"
+    if "REAL" in decl or "FLOA" in decl or "DOUB" in decl:
+        return "float"
+    # NUMERIC・宣言なしは整数から始めて、値を見て広げる
+    return "int"
+
+
+def export_table(conn, table, out_dir, chunk_size=DEFAULT_CHUNK_SIZE):
+    """1テーブルを CSV と .npz に書き出し、行数を返す"""
+    info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    if not info:
+        print(f"Export: table {table} not found, skipped")
+        return 0
+    columns = [r[1] for r in info]
+    kinds = [_declared_kind(r[2]) for r in info]
+
+    csv_path = os.path.join(out_dir, f"{table}.csv")
+    npz_path = os.path.join(out_dir, f"{table}.npz")
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp_dir:
+        writers = [ColumnWriter(os.path.join(tmp_dir, f"{col}.npy"), kind) for col, kind in zip(columns, kinds)]
+
+        total = 0
+        cursor = conn.execute(f'SELECT * FROM "{table}"')
+        with open(csv_path, "w", newline="", encoding="utf-8") as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(columns)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                csv_writer.writerows(rows)
+                for i, writer in enumerate(writers):
+                    writer.append([r[i] for r in rows])
+                total += len(rows)
+
+        for writer in writers:
+            writer.close()
+
+        # 列ごとの .npy を1つの .npz にまとめる (numpy.savez と同じ無圧縮zip)
+        with zipfile.ZipFile(npz_path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for col, writer in zip(columns, writers):
+                zf.write(writer.path, f"{col}.npy")
+                if writer.kind == "text":
+                    cat_path = os.path.join(tmp_dir, f"{col}_categories.npy")
+                    writer.write_categories(cat_path)
+                    zf.write(cat_path, f"{col}_categories.npy")
+
+    return total
+
+
+def export_history(out_dir, db_path=DB_PATH, tables=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    os.makedirs(out_dir, exist_ok=True)
+
+    # ゲーム実行中でも使えるように読み取り専用で開く
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        for table in tables or EXPORT_TABLES:
+            start = time.perf_counter()
+            count = export_table(conn, table, out_dir, chunk_size)
+            elapsed = time.perf_counter() - start
+            print(f"Exported {table}: {count} rows in {elapsed:.2f}s -> {out_dir}")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export evolution history to CSV and .npz")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument("--tables", nargs="*", default=None, help=f"tables to export (default: {' '.join(EXPORT_TABLES)})")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per fetchmany chunk")
+    args = parser.parse_args()
+
+    export_history(args.out, db_path=args.db, tables=args.tables, chunk_size=args.chunk)
+
+
+if __name__ == "__main__":
+    main()
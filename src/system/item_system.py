@@ -0,0 +1,126 @@
+# src/system/item_system.py
+# ドロップアイテムの一括処理
+#
+# アイテムの座標・速度・吸い寄せフラグをスプライトごとに持たず、
+# グループ側の配列 (array / bytearray) にまとめて持ちます。
+# step() 1回で「吸い寄せ判定 → 加速・移動 → ThunderStaff の引き寄せ → 回収判定」
+# までを1ループで行い、回収されたアイテムのリストを返します。
+# (numpy は使わず、標準ライブラリの array で並列配列を持っています)
+import array
+import math
+import pygame
+import config
+
+
+class ItemGroup(pygame.sprite.Group):
+    def __init__(self, *sprites):
+        self.xs = array.array("d")
+        self.ys = array.array("d")
+        self.speeds = array.array("d")
+        self.magnetized = bytearray()
+        self.items = []     # 配列と同じ順番のスプライト
+        self.index = {}     # スプライト -> 配列の添字
+
+        settings = config.DROP_SETTINGS
+        self.acceleration = settings["acceleration"]
+        self.magnet_range = settings["magnet_range"]
+        self.pickup_radius = settings.get("pickup_radius", 50)
+
+        # ThunderStaff の引き寄せ (そのフレームだけ有効、step で消費する)
+        self.pull_radius = 0
+        self.pull_step = 0
+
+        super().__init__(*sprites)
+
+    # --- pygame.sprite.Group のフック (add / kill で配列も更新する) ---
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if sprite in self.index:
+            return
+        self.index[sprite] = len(self.items)
+        self.items.append(sprite)
+        x, y = sprite.pos
+        self.xs.append(x)
+        self.ys.append(y)
+        self.speeds.append(0.0)
+        self.magnetized.append(0)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        i = self.index.pop(sprite, None)
+        if i is None:
+            return
+        # 末尾と入れ替えて削除 (O(1))
+        last = len(self.items) - 1
+        if i != last:
+            moved = self.items[last]
+            self.items[i] = moved
+            self.xs[i] = self.xs[last]
+            self.ys[i] = self.ys[last]
+            self.speeds[i] = self.speeds[last]
+            self.magnetized[i] = self.magnetized[last]
+            self.index[moved] = i
+        self.items.pop()
+        self.xs.pop()
+        self.ys.pop()
+        self.speeds.pop()
+        self.magnetized.pop()
+
+    def request_pull(self, radius, step):
+        """このフレームだけ、半径 radius 以内のアイテムを step ピクセル引き寄せる"""
+        if radius > self.pull_radius:
+            self.pull_radius = radius
+            self.pull_step = step
+
+    def step(self, dt, player_pos):
+        """全アイテムを動かし、回収距離に入ったものを kill して返す"""
+        px, py = player_pos
+        xs, ys, speeds, magnetized, items = self.xs, self.ys, self.speeds, self.magnetized, self.items
+        accel = self.acceleration * dt
+        magnet_sq = self.magnet_range * self.magnet_range
+        pickup_sq = self.pickup_radius * self.pickup_radius
+        pull_sq = self.pull_radius * self.pull_radius
+        pull_step = self.pull_step
+        self.pull_radius = 0
+        self.pull_step = 0
+
+        picked = []
+        for i in range(len(items)):
+            x = xs[i]
+            y = ys[i]
+            dx = px - x
+            dy = py - y
+            dist_sq = dx * dx + dy * dy
+
+            if dist_sq <= pickup_sq:
+                picked.append(items[i])
+                continue
+
+            if not magnetized[i] and dist_sq < magnet_sq:
+                magnetized[i] = 1
+
+            if magnetized[i]:
+                # 吸い寄せ: 加速しながらプレイヤーへ (行き過ぎないように距離で止める)
+                dist = math.sqrt(dist_sq)
+                speed = speeds[i] + accel
+                speeds[i] = speed
+                move = min(speed * dt, dist)
+            elif dist_sq <= pull_sq and dist_sq > 100:
+                # ThunderStaff の範囲内: 一定距離ずつ引き寄せる
+                dist = math.sqrt(dist_sq)
+                move = min(pull_step, dist)
+            else:
+                continue
+
+            x += dx / dist * move
+            y += dy / dist * move
+            xs[i] = x
+            ys[i] = y
+
+            item = items[i]
+            item.pos.update(x, y)
+            item.rect.center = (round(x), round(y))
+
+        for item in picked:
+            item.kill()
+        return picked
@@ -4,6 +4,8 @@ import random
 import config
 import os
 from src.entities.obstacle import Obstacle
+from src.system.asset_loader import load_scaled_image, get_source_size
+from src.system import game_data
 
 class MapGenerator:
     def __init__(self, biome_type):
@@ -18,6 +20,9 @@ class MapGenerator:
         self.decoration_group = None
         self.loaded_obstacles = []
         self.loaded_decorations = []
+
+        # チャンクの読み込み・破棄を知らせる先 (add_chunk_listener で登録)
+        self.chunk_listeners = []
         
         # 設定値保持用
         self.obs_threshold = 0.75
@@ -28,29 +33,33 @@ class MapGenerator:
         self.obstacles_group = obstacles_group
         self.decoration_group = decoration_group
         
-        settings = config.STAGE_SETTINGS.get(self.biome, {})
-        gen_settings = settings.get("generation", {})
-        
-        # Config読み込み
-        self.obs_threshold = gen_settings.get("obstacle_threshold", 0.75)
-        self.obs_density = gen_settings.get("obstacle_density", 0.3) # ★デフォルト0.3
-        self.deco_threshold = gen_settings.get("decoration_threshold", 0.40)
-        
-        assets = settings.get("assets", {})
-        self.loaded_obstacles = self._preload_images(assets.get("obstacles", []), is_solid=True)
-        self.loaded_decorations = self._preload_images(assets.get("decorations", []), is_solid=False)
+        # Config読み込み (起動時に検証済みの表から)
+        stage = game_data.STAGES.get(self.biome)
+        if stage is not None:
+            self.obs_threshold = stage.obstacle_threshold
+            self.obs_density = stage.obstacle_density
+            self.deco_threshold = stage.decoration_threshold
+            self.loaded_obstacles = self._preload_images(stage.obstacles, is_solid=True)
+            self.loaded_decorations = self._preload_images(stage.decorations, is_solid=False)
 
         # フォールバック
         if not self.loaded_obstacles:
             s = pygame.Surface((60, 60))
             s.fill((139, 69, 19))
-            self.loaded_obstacles.append((s, {}))
+            self.loaded_obstacles.append((s, game_data.DEFAULT_MAP_OBJECT))
 
         if not self.loaded_decorations:
             s = pygame.Surface((60, 60))
             s.fill((50, 205, 50))
             s.set_alpha(150)
-            self.loaded_decorations.append((s, {}))
+            self.loaded_decorations.append((s, game_data.DEFAULT_MAP_OBJECT))
+
+    def add_chunk_listener(self, on_loaded, on_unloaded):
+        """
+        チャンクが読み込まれた時 on_loaded(chunk_coord, obstacles, decorations)、
+        破棄される時 (kill する前) on_unloaded(chunk_coord, obstacles, decorations) を呼ぶ
+        """
+        self.chunk_listeners.append((on_loaded, on_unloaded))
 
     def update(self, player_pos):
         if self.obstacles_group is None or self.decoration_group is None:
@@ -74,22 +83,19 @@ class MapGenerator:
             if chunk_coord not in visible_chunks:
                 self._unload_chunk(chunk_coord)
 
-    def _preload_images(self, names, is_solid):
+    def _preload_images(self, map_objects, is_solid):
         loaded = []
         base_size = 80
-        for name in names:
-            file_name = name
-            if not name.lower().endswith('.png'): file_name += ".png"
-            path = os.path.join(config.MAP_IMAGE_DIR, file_name)
-            props = config.MAP_OBJECT_SETTINGS.get(file_name, {})
-            scale_factor = props.get("scale", 1.0)
+        for props in map_objects:
+            path = os.path.join(config.MAP_IMAGE_DIR, props.file_name)
+            scale_factor = props.scale
             
             try:
-                img = pygame.image.load(path).convert_alpha()
+                src_w, src_h = get_source_size(path)
                 target_w = int(base_size * scale_factor)
-                aspect = img.get_height() / img.get_width()
+                aspect = src_h / src_w
                 target_h = int(target_w * aspect)
-                img = pygame.transform.scale(img, (target_w, target_h))
+                img = load_scaled_image(path, (target_w, target_h))
                 loaded.append((img, props))
             except:
                 continue
@@ -97,12 +103,19 @@ class MapGenerator:
 
     def _unload_chunk(self, chunk_coord):
         sprites = self.loaded_chunks.pop(chunk_coord)
+        if self.chunk_listeners:
+            obstacles = [s for s in sprites if s.is_solid]
+            decorations = [s for s in sprites if not s.is_solid]
+            for _, on_unloaded in self.chunk_listeners:
+                on_unloaded(chunk_coord, obstacles, decorations)
         for sprite in sprites:
             sprite.kill()
 
     def _generate_chunk(self, chunk_coord):
         cx, cy = chunk_coord
         new_sprites = []
+        new_obstacles = []
+        new_decorations = []
         
         chunk_seed = (cx * 73856093) ^ (cy * 19349663)
         random.seed(chunk_seed)
@@ -131,6 +144,7 @@ class MapGenerator:
                         s = Obstacle((world_x, world_y), img, is_solid=True, props=props)
                         self.obstacles_group.add(s)
                         new_sprites.append(s)
+                        new_obstacles.append(s)
                 
                 # 装飾 (草)
                 elif val > self.deco_threshold:
@@ -148,8 +162,11 @@ class MapGenerator:
                     s = Obstacle((world_x, world_y), img, is_solid=False, props=props)
                     self.decoration_group.add(s)
                     new_sprites.append(s)
+                    new_decorations.append(s)
 
         self.loaded_chunks[chunk_coord] = new_sprites
+        for on_loaded, _ in self.chunk_listeners:
+            on_loaded(chunk_coord, new_obstacles, new_decorations)
 
     def _generate_noise_grid(self, size):
         grid = []
@@ -0,0 +1,273 @@
+# src/system/memory_stats.py
+# メモリの内訳 (長時間プレイで RSS が増える原因を調べる用)
+#
+# 次の3つをまとめて1つのレポート (dict) にします。
+#   groups   : スプライトグループごとの数 (camera_group はクラス別の数と出入りの回数も)
+#   surfaces : Surface の推定バイト数を持ち主ごとに (画像キャッシュ・HUD・スプライト固有の画像)
+#   tracemalloc : 確保量の多い行 (前回のスナップショットからの増加分も)  ※ M キーで要求した時だけ
+# レポートは JSON Lines で config.MEMORY_TELEMETRY["log_path"] に追記し、
+# デバッグ表示 (H キー) 中は画面左上にも要約を出します。
+import json
+import os
+import sys
+import tracemalloc
+import pygame
+import config
+from src.system import frame_state
+from src.system import asset_loader
+from src.system import render_target, texture_renderer
+from src.entities import enemy_projectile
+from src.entities.enemy import Enemy
+
+# スプライト数を数えるグループ (GameplayScreen の属性名)
+GROUP_NAMES = ("camera_group", "enemies_group", "items_group", "decorations",
+               "obstacles", "bullets_group", "enemy_bullets")
+
+
+def surface_bytes(surface):
+    """Surface のピクセルが使うバイト数 (subsurface は親と共有なので 0)"""
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def _walk_surfaces(obj, out):
+    """dict / list / tuple の中の Surface を全部集める"""
+    if isinstance(obj, pygame.Surface):
+        out.append(obj)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _walk_surfaces(value, out)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _walk_surfaces(value, out)
+    return out
+
+
+def _count_bytes(surfaces, seen):
+    """まだ数えていない Surface だけ足す (同じ画像を複数の持ち主で二重に数えない)"""
+    total = 0
+    count = 0
+    for surface in surfaces:
+        key = id(surface)
+        if key in seen:
+            continue
+        seen.add(key)
+        total += surface_bytes(surface)
+        count += 1
+    return total, count
+
+
+def _rss_mb():
+    """現在の RSS (Linux 以外はピーク値で代用、取れなければ None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+class MemoryTelemetry:
+    def __init__(self, scene):
+        self.scene = scene
+        settings = config.MEMORY_TELEMETRY
+        self.enabled = settings.get("enabled", True)
+        self.log_path = settings.get("log_path", os.path.join("logs", "memory.jsonl"))
+        self.log_interval = settings.get("log_interval_ms", 60000)
+        self.top_n = settings.get("top_n", 10)
+        self.trace_frames = settings.get("trace_frames", 1)
+        self.overlay_refresh = settings.get("overlay_refresh_ms", 1000)
+
+        now = frame_state.get_ticks()
+        self.last_log_time = now
+        self.last_snapshot = None
+
+        # デバッグ表示 (1秒ごとに作り直す)
+        self.overlay = None
+        self.overlay_time = None
+
+        if self.enabled and settings.get("trace_on_start", False) and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+
+    # --- 集計 ---
+    def group_counts(self):
+        scene = self.scene
+        counts = {}
+        for name in GROUP_NAMES:
+            group = getattr(scene, name, None)
+            if group is not None:
+                counts[name] = len(group)
+
+        by_type = {}
+        for sprite in scene.camera_group:
+            name = type(sprite).__name__
+            by_type[name] = by_type.get(name, 0) + 1
+        counts["camera_by_type"] = dict(sorted(by_type.items(), key=lambda kv: -kv[1]))
+        counts["camera_membership"] = scene.camera_group.membership()
+        return counts
+
+    def surface_owners(self):
+        """持ち主ごとの Surface のバイト数。キャッシュを先に数え、スプライトは固有の画像だけ数える"""
+        scene = self.scene
+        owners = []
+        atlas = asset_loader._atlas
+        if atlas is not None:
+            owners.append(("atlas", atlas.sheets))
+        target = render_target.get_active()
+        if target is not None:
+            owners.append(("render_target", target.surface))
+        backend = texture_renderer.get_active()
+        if backend is not None:
+            # Texture 本体は Renderer 側のメモリなので、HUD 用の canvas だけ数える
+            owners.append(("texture_renderer.canvas", backend.canvas))
+        owners += [
+            ("asset_loader._image_cache", asset_loader._image_cache),
+            ("asset_loader._scaled_cache", asset_loader._scaled_cache),
+            ("Enemy._image_cache", Enemy._image_cache),
+            ("enemy_projectile._rotated_cache", enemy_projectile._rotated_cache),
+            ("hud", [w.surface for w in scene.hud.widgets.values()]),
+            ("weapon_slots", [scene.weapon_slots.frames, scene.weapon_slots.arc_cache,
+                              scene.weapon_slots.icon_cache, scene.weapon_slots.text_cache]),
+            ("level_up", [scene.level_up_panel, scene.level_up_items]),
+        ]
+
+        seen = set()
+        result = {}
+        for name, holder in owners:
+            total, count = _count_bytes(_walk_surfaces(holder, []), seen)
+            result[name] = {"bytes": total, "surfaces": count}
+
+        # スプライトの画像 (キャッシュに無いもの = インスタンスごとに作られた画像)
+        for group_name in ("camera_group", "decorations"):
+            per_type = {}
+            for sprite in getattr(scene, group_name):
+                image = getattr(sprite, "image", None)
+                if image is None:
+                    continue
+                name = f"sprites:{type(sprite).__name__}"
+                per_type.setdefault(name, []).append(image)
+            for name, images in per_type.items():
+                total, count = _count_bytes(images, seen)
+                entry = result.setdefault(name, {"bytes": 0, "surfaces": 0})
+                entry["bytes"] += total
+                entry["surfaces"] += count
+
+        return dict(sorted(result.items(), key=lambda kv: -kv[1]["bytes"]))
+
+    def trace(self):
+        """tracemalloc のスナップショット。初回は記録を始めるだけ (以降の呼び出しで結果が出る)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self.last_snapshot = None
+            return {"status": "started"}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        top = [
+            {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top_n]
+        ]
+        growth = []
+        if self.last_snapshot is not None:
+            growth = [
+                {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+                for stat in snapshot.compare_to(self.last_snapshot, "lineno")[:self.top_n]
+            ]
+        self.last_snapshot = snapshot
+        traced, peak = tracemalloc.get_traced_memory()
+        return {"status": "ok", "traced_mb": round(traced / (1024 * 1024), 1),
+                "peak_mb": round(peak / (1024 * 1024), 1), "top": top, "growth": growth}
+
+    def collect(self, include_trace=False):
+        now = frame_state.get_ticks()
+        report = {
+            "time": round(frame_state.get_time(), 3),
+            "elapsed_ms": now - self.scene.start_time,
+            "biome": self.scene.biome,
+            "rss_mb": _rss_mb(),
+            "groups": self.group_counts(),
+            "surfaces": self.surface_owners(),
+        }
+        report["surface_total_mb"] = round(sum(v["bytes"] for v in report["surfaces"].values()) / (1024 * 1024), 2)
+        if include_trace:
+            report["tracemalloc"] = self.trace()
+        return report
+
+    # --- 出力 ---
+    def write(self, report):
+        try:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        except OSError as e:
+            print(f"Memory log write failed: {e}")
+
+    def update(self):
+        """log_interval_ms ごとに JSON ログへ追記する (0 なら定期ログなし)"""
+        if not self.enabled or self.log_interval <= 0:
+            return
+        now = frame_state.get_ticks()
+        if now - self.last_log_time >= self.log_interval:
+            self.last_log_time = now
+            self.write(self.collect(include_trace=tracemalloc.is_tracing()))
+
+    def snapshot(self):
+        """デバッグキーから呼ぶ: tracemalloc 込みのレポートをログに書いて要約を表示"""
+        report = self.collect(include_trace=True)
+        self.write(report)
+        self.overlay_time = None
+
+        trace = report["tracemalloc"]
+        print(f"--- Memory: RSS {report['rss_mb']} MB, surfaces {report['surface_total_mb']} MB ---")
+        if trace["status"] == "started":
+            print("tracemalloc started (press again to see allocation sites)")
+        else:
+            print(f"tracemalloc: {trace['traced_mb']} MB traced (peak {trace['peak_mb']} MB)")
+            for entry in trace["growth"] or trace["top"]:
+                size = entry.get("size_diff_kb", entry.get("size_kb"))
+                print(f"  {size:>10} KB  {entry['site']}")
+        return report
+
+    def draw_overlay(self, screen, font, pos=(10, 120)):
+        now = frame_state.get_ticks()
+        if self.overlay is None or self.overlay_time is None or now - self.overlay_time >= self.overlay_refresh:
+            self.overlay_time = now
+            self.overlay = self._render_overlay(font, self.collect())
+        screen.blit(self.overlay, pos)
+
+    def _render_overlay(self, font, report):
+        groups = report["groups"]
+        lines = [f"RSS {report['rss_mb']} MB  surfaces {report['surface_total_mb']} MB"]
+        lines.append("  ".join(f"{name.replace('_group', '')} {groups[name]}" for name in GROUP_NAMES if name in groups))
+        lines.append("  ".join(f"{name} {n}" for name, n in list(groups["camera_by_type"].items())[:6]))
+        member = groups["camera_membership"]
+        lines.append(f"camera +{member['added']} -{member['removed']}  chunk obstacles {member['chunk_live']}"
+                     f" / {groups.get('obstacles', 0)}")
+        for name, entry in list(report["surfaces"].items())[:6]:
+            lines.append(f"{entry['bytes'] / 1024:>9.0f} KB  {entry['surfaces']:>5}  {name}")
+
+        rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(s.get_width() for s in rendered) + 12
+        height = sum(s.get_height() for s in rendered) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        y = 6
+        for surf in rendered:
+            panel.blit(surf, (6, y))
+            y += surf.get_height()
+        return panel
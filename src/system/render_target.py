@@ -0,0 +1,79 @@
+# src/system/render_target.py
+# 低解像度の内部描画 (ワールドだけ小さく描いて、1フレームに1回拡大する)
+#
+# 4K などの大きなモニターでは、背景の fill やスプライトの blit がすべて画面の画素数で行われ、
+# 内蔵 GPU の環境では描画 (塗りつぶす画素数) が一番重くなります。
+# config.RENDER_SETTINGS["mode"] が "low_res" の時は:
+#   config.SCREEN_WIDTH / SCREEN_HEIGHT  : ワールドを描く内部解像度 (GLOBAL_SCALE もこれに合わせる)
+#   config.DISPLAY_WIDTH / DISPLAY_HEIGHT: ウィンドウの解像度 (HUD・メニュー・マウスはこちら)
+# GameplayScreen はワールドを RenderTarget.surface に描き、present() で画面全体に1回だけ拡大してから
+# HUD をウィンドウの解像度のまま上に描きます。
+# "native" (既定) の時は2つの解像度が同じで、RenderTarget は作りません。
+import pygame
+import config
+
+
+def world_size(display_size, settings=None):
+    """ウィンドウの大きさから、ワールドを描く解像度を決める (縦横比はウィンドウと同じ)"""
+    settings = config.RENDER_SETTINGS if settings is None else settings
+    display_w, display_h = display_size
+    if settings.get("mode", "native") != "low_res":
+        return display_w, display_h
+
+    factor = settings.get("scale_factor")
+    if factor:
+        width = int(display_w / factor)
+    else:
+        width = settings.get("internal_width") or config.BASE_SCREEN_WIDTH
+    # ウィンドウより大きくはしない
+    width = max(1, min(display_w, int(width)))
+    height = max(1, round(display_h * width / display_w))
+    return width, height
+
+
+def configure(display_size, settings=None):
+    """config の解像度と GLOBAL_SCALE を決める (画像を読み込む前に呼ぶ)。ワールドの解像度を返す"""
+    size = world_size(display_size, settings)
+    config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT = display_size
+    config.SCREEN_WIDTH, config.SCREEN_HEIGHT = size
+    config.GLOBAL_SCALE = size[0] / getattr(config, "BASE_SCREEN_WIDTH", size[0])
+    return size
+
+
+class RenderTarget:
+    def __init__(self, size, smooth=False):
+        self.size = tuple(size)
+        self.smooth = smooth
+        self.surface = pygame.Surface(self.size)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+
+    def present(self, screen):
+        """内部の画像をウィンドウ全体に拡大して描く (新しい Surface は作らない)"""
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, screen.get_size(), screen)
+        else:
+            pygame.transform.scale(self.surface, screen.get_size(), screen)
+
+
+# 使用中の RenderTarget (低解像度モード以外は None)
+_active = None
+
+
+def set_active(target):
+    global _active
+    _active = target
+
+
+def get_active():
+    return _active
+
+
+def setup(screen):
+    """set_mode の後に呼ぶ。ワールドとウィンドウの解像度が違えば RenderTarget を作って使う"""
+    size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+    if size == screen.get_size():
+        set_active(None)
+    else:
+        set_active(RenderTarget(size, config.RENDER_SETTINGS.get("smooth", False)))
+    return _active
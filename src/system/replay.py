@@ -0,0 +1,352 @@
+# src/system/replay.py
+# プレイの記録と再生
+#
+# 記録 (main.py から自動):
+#   ゲームプレイ開始時に乱数シードを決めて random.seed し、毎フレームの
+#   時刻・dt・キー入力・マウス位置・イベントを gzip 圧縮のバイナリに書き出します。
+#   開始時点の DB は <名前>.db としてコピーしておきます (進化の結果が DB に依存するため)。
+#
+# 再生:
+#   python -m src.system.replay replays/run_20250101_120000_forest.mmr --out timings.json
+#
+#   ダミーのビデオドライバで GameplayScreen を作り、記録どおりの入力で最速で回します。
+#   フレームごとの処理時間を分単位で集計して表示・JSON 出力するので、
+#   「7分あたりで重い」といった報告を同じ条件で再現し、修正前後で比べられます。
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+import zlib
+
+import pygame
+import config
+from src.system import frame_state, render_target
+
+MAGIC = b"MMRP"
+VERSION = 2
+
+# 記録するキー (Player.move が見ているもの)
+TRACKED_KEYS = [
+    pygame.K_LEFT, pygame.K_a, pygame.K_RIGHT, pygame.K_d,
+    pygame.K_UP, pygame.K_w, pygame.K_DOWN, pygame.K_s,
+]
+
+# イベントの種類 (ゲームプレイ画面が反応するものだけ記録する)
+EVENT_KEYDOWN = 0
+EVENT_MOUSEDOWN = 1
+
+# ヘッダー: マジック, バージョン, シード, 開始時刻, UNIX時刻の基準, 画面サイズ, スケール, FPS, ウィンドウサイズ
+# (画面サイズはワールドの解像度。バージョン 1 にはウィンドウサイズが無く、画面サイズと同じ)
+HEADER = struct.Struct("<4sBQIdHHdHHH")
+HEADER_V1 = struct.Struct("<4sBQIdHHdH")
+# フレーム: 時刻の差分, dt(ms), キー, マウスx, マウスy, 敵の数(同期確認用), handle_events 回数, 記録イベント数
+FRAME = struct.Struct("<HHBhhHHB")
+# イベント: 種類, キー/ボタン, x, y
+EVENT = struct.Struct("<BIhh")
+
+
+def _pack_keys(keys):
+    mask = 0
+    for i, key in enumerate(TRACKED_KEYS):
+        if keys[key]:
+            mask |= 1 << i
+    return mask
+
+
+class RecordedKeys:
+    """pygame.key.get_pressed() の代わり (記録したキーだけ押されている)"""
+    def __init__(self, mask):
+        self.pressed = {key for i, key in enumerate(TRACKED_KEYS) if mask & (1 << i)}
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def _clamp16(v):
+    return max(-32768, min(32767, int(v)))
+
+
+class RunRecorder:
+    """1回のゲームプレイを記録する"""
+    def __init__(self, path, biome, seed, db_path):
+        self.path = path
+        self.frame_count = 0
+        self.last_ticks = frame_state.get_ticks()
+
+        # 開始時点の DB をコピー (ゲーム中に書き換わるので先に取る)
+        if os.path.exists(db_path):
+            src = sqlite3.connect(db_path)
+            dst = sqlite3.connect(path + ".db")
+            with dst:
+                src.backup(dst)
+            src.close()
+            dst.close()
+
+        self.file = gzip.open(path, "wb")
+        self.file.write(HEADER.pack(
+            MAGIC, VERSION, seed, self.last_ticks, frame_state.get_epoch_base(),
+            config.SCREEN_WIDTH, config.SCREEN_HEIGHT, config.GLOBAL_SCALE, config.FPS,
+            config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT
+        ))
+        name = biome.encode("utf-8")
+        self.file.write(struct.pack("<B", len(name)) + name)
+
+    def record_frame(self, dt_ms, events, scene):
+        """
+        1フレーム分を書く。events はこのフレームに scene.handle_events へ渡したリスト
+        (main.py はイベント1個につき1回 handle_events を呼ぶので、回数も記録する)
+        """
+        ticks = frame_state.get_ticks()
+        delta = max(0, min(65535, ticks - self.last_ticks))
+        self.last_ticks += delta
+
+        recorded = []
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                recorded.append(EVENT.pack(EVENT_KEYDOWN, event.key, 0, 0))
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                x, y = event.pos
+                recorded.append(EVENT.pack(EVENT_MOUSEDOWN, event.button, _clamp16(x), _clamp16(y)))
+
+        mx, my = frame_state.get_mouse_pos()
+        self.file.write(FRAME.pack(
+            delta, min(65535, dt_ms), _pack_keys(frame_state.get_pressed()),
+            _clamp16(mx), _clamp16(my), min(65535, len(scene.enemies_group)),
+            min(65535, len(events)), min(255, len(recorded))
+        ))
+        for data in recorded[:255]:
+            self.file.write(data)
+        self.frame_count += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            print(f"Replay saved: {self.path} ({self.frame_count} frames)")
+
+
+def start_recording(biome, db_path):
+    """
+    新しいプレイの記録を始める (GameplayScreen を作る直前に呼ぶ)。
+    乱数シードもここで決めて random.seed する。記録しない設定なら None。
+    """
+    settings = config.REPLAY_SETTINGS
+    seed = random.getrandbits(32)
+    random.seed(seed)
+    if not settings.get("record", True):
+        return None
+
+    directory = settings.get("dir", "replays")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _prune(directory, settings.get("keep", 10) - 1)
+        name = time.strftime("run_%Y%m%d_%H%M%S") + f"_{biome}.mmr"
+        return RunRecorder(os.path.join(directory, name), biome, seed, db_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: Failed to start replay recording: {e}")
+        return None
+
+
+def _prune(directory, keep):
+    runs = sorted(n for n in os.listdir(directory) if n.endswith(".mmr"))
+    for name in runs[:max(0, len(runs) - keep)]:
+        for path in (os.path.join(directory, name), os.path.join(directory, name + ".db")):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ==========================================
+# 読み込み・再生
+# ==========================================
+def read_replay(path):
+    """(ヘッダーの辞書, フレームのリスト) を返す。途中で切れたファイルも読めるところまで読む"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    # gzip.open だと末尾のないファイル (ゲームが落ちた場合など) で例外になるので、
+    # zlib で展開できたところまでを使う
+    data = zlib.decompressobj(wbits=31).decompress(raw)
+    magic, version = struct.unpack_from("<4sB", data, 0)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} is not a replay file (version {VERSION})")
+    if version == 1:
+        magic, version, seed, start_ticks, epoch_base, w, h, scale, fps = HEADER_V1.unpack_from(data, 0)
+        display_w, display_h = w, h
+        offset = HEADER_V1.size
+    else:
+        magic, version, seed, start_ticks, epoch_base, w, h, scale, fps, display_w, display_h = HEADER.unpack_from(data, 0)
+        offset = HEADER.size
+    name_len = data[offset]
+    biome = data[offset + 1:offset + 1 + name_len].decode("utf-8")
+    offset += 1 + name_len
+
+    header = {
+        "seed": seed, "start_ticks": start_ticks, "epoch_base": epoch_base,
+        "screen": (w, h), "display": (display_w, display_h), "scale": scale, "fps": fps, "biome": biome,
+    }
+
+    frames = []
+    ticks = start_ticks
+    try:
+        while offset < len(data):
+            delta, dt_ms, keys, mx, my, enemies, calls, n_events = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+            events = []
+            for _ in range(n_events):
+                kind, code, x, y = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                if kind == EVENT_KEYDOWN:
+                    events.append(pygame.event.Event(pygame.KEYDOWN, key=code, mod=0, unicode="", scancode=0))
+                else:
+                    events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=code, pos=(x, y)))
+            ticks += delta
+            frames.append((ticks, dt_ms, keys, (mx, my), enemies, calls, events))
+    except struct.error:
+        print(f"Warning: {path} is truncated, replaying {len(frames)} frames")
+    return header, frames
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * ratio))
+    return sorted_values[index]
+
+
+def replay(path, draw=True, db_snapshot=None):
+    """記録を最速で再生して、フレーム時間の集計を返す"""
+    from src.system import db_manager
+    from src.scenes.game_play_screen import GameplayScreen
+
+    header, frames = read_replay(path)
+
+    config.SCREEN_WIDTH, config.SCREEN_HEIGHT = header["screen"]
+    config.DISPLAY_WIDTH, config.DISPLAY_HEIGHT = header["display"]
+    config.GLOBAL_SCALE = header["scale"]
+    # 記録時と同じウィンドウの大きさにする (低解像度モードで記録したならワールドは内部解像度で描く)
+    screen = pygame.display.set_mode(header["display"])
+    render_target.setup(screen)
+
+    # 記録時の DB のコピーで動かす (スナップショット自体は書き換えない)
+    tmp_dir = tempfile.mkdtemp(prefix="replay_")
+    db_snapshot = db_snapshot or path + ".db"
+    tmp_db = os.path.join(tmp_dir, "game_data.db")
+    if os.path.exists(db_snapshot):
+        shutil.copy(db_snapshot, tmp_db)
+    else:
+        print(f"Warning: DB snapshot {db_snapshot} not found, starting from an empty DB (results may differ)")
+    original_db_path = db_manager.DB_PATH
+    db_manager.DB_PATH = tmp_db
+
+    frame_times = []
+    minutes = {}
+    diverged_at = None
+    result = None
+    try:
+        random.seed(header["seed"])
+        frame_state.set_frame(header["start_ticks"], RecordedKeys(0), (0, 0), header["epoch_base"])
+        scene = GameplayScreen(header["biome"])
+
+        start = time.perf_counter()
+        for index, (ticks, dt_ms, keys, mouse_pos, enemies, calls, events) in enumerate(frames):
+            frame_state.set_frame(ticks, RecordedKeys(keys), mouse_pos)
+            frame_start = time.perf_counter()
+
+            # main.py と同じく、イベント1個につき1回 handle_events を呼ぶ
+            events = events + [pygame.event.Event(pygame.NOEVENT)] * max(0, calls - len(events))
+            action = None
+            for _ in range(calls):
+                action = scene.handle_events(events)
+                if action:
+                    break
+            if action:
+                result = action
+                break
+
+            result = scene.update(dt_ms / 1000.0)
+            if draw:
+                scene.draw(screen)
+
+            elapsed_ms = (time.perf_counter() - frame_start) * 1000.0
+            frame_times.append(elapsed_ms)
+            minute = (ticks - header["start_ticks"]) // 60000
+            minutes.setdefault(minute, []).append(elapsed_ms)
+
+            if diverged_at is None and len(scene.enemies_group) != enemies:
+                diverged_at = index
+                print(f"Warning: replay diverged at frame {index} "
+                      f"(enemies {len(scene.enemies_group)} != recorded {enemies})")
+            if result:
+                break
+        total = time.perf_counter() - start
+        scene.close()
+    finally:
+        db_manager.DB_PATH = original_db_path
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    ordered = sorted(frame_times)
+    report = {
+        "replay": path,
+        "biome": header["biome"],
+        "frames": len(frame_times),
+        "recorded_frames": len(frames),
+        "wall_time_s": round(total, 3),
+        "fps": round(len(frame_times) / total, 1) if total > 0 else 0.0,
+        "avg_ms": round(sum(frame_times) / len(frame_times), 3) if frame_times else 0.0,
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+        "minutes": [
+            {
+                "minute": m,
+                "frames": len(times),
+                "avg_ms": round(sum(times) / len(times), 3),
+                "p99_ms": round(_percentile(sorted(times), 0.99), 3),
+                "max_ms": round(max(times), 3),
+            }
+            for m, times in sorted(minutes.items())
+        ],
+        "diverged_at": diverged_at,
+        "result": result,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded run headlessly and report frame timings")
+    parser.add_argument("replay", help="recorded .mmr file")
+    parser.add_argument("--db", default=None, help="DB snapshot to start from (default: <replay>.db)")
+    parser.add_argument("--no-draw", action="store_true", help="skip drawing (simulation only)")
+    parser.add_argument("--out", default=None, help="write the timing report to this JSON file")
+    parser.add_argument("--profile", default=None, help="write cProfile stats to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        report = profiler.runcall(replay, args.replay, not args.no_draw, args.db)
+        profiler.dump_stats(args.profile)
+    else:
+        report = replay(args.replay, draw=not args.no_draw, db_snapshot=args.db)
+
+    print(f"Replayed {report['frames']}/{report['recorded_frames']} frames in {report['wall_time_s']}s "
+          f"({report['fps']} fps, avg {report['avg_ms']} ms, p99 {report['p99_ms']} ms)")
+    for m in report["minutes"]:
+        print(f"  minute {m['minute']}: avg {m['avg_ms']} ms, p99 {m['p99_ms']} ms, max {m['max_ms']} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# src/system/scaled_cache.py
+# 拡大縮小済み画像のディスクキャッシュ
+#
+# (元ファイルのハッシュ, 表示サイズ) ごとに、scale 後の RGBA 生データを
+# <ハッシュ>_<幅>x<高さ>.rgba として保存します。
+# 次回起動時は mmap したファイルを pygame.image.frombuffer で読むだけなので、
+# PNG の展開も拡大縮小も行いません。
+# 元画像が変わればハッシュが変わるので、古いキャッシュは自動的に使われなくなります。
+#
+# 元画像のハッシュは manifest.json に (更新時刻, サイズ) と一緒に記録しておき、
+# どちらも変わっていなければファイルを読まずにそのハッシュを使います。
+# (起動のたびに全 PNG を読んでハッシュすると、キャッシュで短くしたい起動時間が戻ってしまう)
+import hashlib
+import json
+import mmap
+import os
+import pygame
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ScaledImageCache:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # 正規化パス -> ハッシュ (このプロセスで1回だけ求める)
+        self._hashes = {}
+        # 正規化パス -> [st_mtime_ns, st_size, ハッシュ] (起動をまたいで使う)
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+        self.manifest_dirty = False
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def save_manifest(self):
+        """新しく求めたハッシュがあれば manifest.json に書く"""
+        if not self.manifest_dirty:
+            return
+        try:
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+            self.manifest_dirty = False
+        except OSError as e:
+            print(f"Warning: Failed to write scaled cache manifest: {e}")
+
+    def file_hash(self, path):
+        key = os.path.normpath(path)
+        digest = self._hashes.get(key)
+        if digest is None:
+            st = os.stat(key)
+            entry = self.manifest.get(key)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                digest = entry[2]
+            else:
+                with open(key, "rb") as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()[:20]
+                self.manifest[key] = [st.st_mtime_ns, st.st_size, digest]
+                self.manifest_dirty = True
+            self._hashes[key] = digest
+        return digest
+
+    def _cache_path(self, path, size):
+        return os.path.join(self.directory, f"{self.file_hash(path)}_{size[0]}x{size[1]}.rgba")
+
+    def get(self, path, size):
+        """キャッシュがあれば convert_alpha 済みの Surface を返す (なければ None)"""
+        try:
+            cache_path = self._cache_path(path, size)
+            if os.path.getsize(cache_path) != size[0] * size[1] * 4:
+                return None
+            with open(cache_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    # convert_alpha でコピーされるので、mmap はすぐ閉じてよい
+                    return pygame.image.frombuffer(buf, size, "RGBA").convert_alpha()
+        except (OSError, ValueError, pygame.error):
+            return None
+
+    def has(self, path, size):
+        """(元画像, サイズ) のキャッシュファイルがあるか (読み込まずに大きさだけ確かめる)"""
+        try:
+            return os.path.getsize(self._cache_path(path, size)) == size[0] * size[1] * 4
+        except OSError:
+            return False
+
+    def put(self, path, size, surface):
+        try:
+            cache_path = self._cache_path(path, size)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pygame.image.tobytes(surface, "RGBA"))
+            os.replace(tmp_path, cache_path)
+        except (OSError, pygame.error) as e:
+            print(f"Warning: Failed to write scaled cache for {path}: {e}")
+        self.save_manifest()
+
+    def cached_paths(self, paths):
+        """少なくとも1サイズ分のキャッシュがある元画像パスを返す (プリロード対象から外す用)"""
+        prefixes = {name.split("_", 1)[0] for name in os.listdir(self.directory) if name.endswith(".rgba")}
+        covered = set()
+        for path in paths:
+            try:
+                if self.file_hash(path) in prefixes:
+                    covered.add(os.path.normpath(path))
+            except OSError:
+                continue
+        self.save_manifest()
+        return covered
@@ -0,0 +1,57 @@
+# src/system/spatial_grid.py
+# 一様グリッドによる近傍検索 (ブロードフェーズ)
+#
+# pygame.sprite.Group の代わりにそのまま使えるグループです。
+# 1フレームに1回 rebuild_grid() を呼ぶと、スプライトの中心座標でセルに振り分け、
+# query_rect() はそのフレームの間、矩形の周りのセルだけを調べます。
+# (rebuild 後に追加されたスプライトは次の rebuild まで検索に出てきません)
+import pygame
+
+
+class SpatialGroup(pygame.sprite.Group):
+    def __init__(self, *sprites, cell_size=128):
+        super().__init__(*sprites)
+        self.cell_size = cell_size
+        self.cells = {}
+        # スプライトの中心から rect の端までの最大距離 (検索範囲をこの分広げる)
+        self.max_extent = 0
+        # rebuild 後に動いた分の余裕
+        self.slack = 16
+
+    def rebuild_grid(self):
+        cells = {}
+        cs = self.cell_size
+        max_extent = 0
+        for sprite in self.sprites():
+            rect = sprite.rect
+            key = (rect.centerx // cs, rect.centery // cs)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [sprite]
+            else:
+                bucket.append(sprite)
+            extent = max(rect.width, rect.height) // 2 + 1
+            if extent > max_extent:
+                max_extent = extent
+        self.cells = cells
+        self.max_extent = max_extent
+
+    def query_rect(self, rect):
+        """rect の近くにいるスプライトの候補を返す (厳密な判定は呼び出し側で行う)"""
+        cs = self.cell_size
+        margin = self.max_extent + self.slack
+        x0 = (rect.left - margin) // cs
+        x1 = (rect.right + margin) // cs
+        y0 = (rect.top - margin) // cs
+        y1 = (rect.bottom + margin) // cs
+
+        cells = self.cells
+        alive = self.spritedict
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    # rebuild 後に kill されたものは除く
+                    found.extend(s for s in bucket if s in alive)
+        return found
@@ -0,0 +1,244 @@
+# src/system/texture_renderer.py
+# SDL2 の Renderer/Texture を使う描画バックエンド (config.RENDER_SETTINGS["backend"] = "texture")
+#
+# ソフトウェア描画 (既定の "software") では、毎フレームすべてのスプライトを CPU で画面の Surface に
+# blit します。このバックエンドでは:
+#   - スプライトの画像は最初に描いた時に1回だけ Texture にアップロードしてキャッシュし、
+#     以降は描画命令 (位置・透明度) だけを Renderer に送ります。
+#     アトラスの subsurface は親のシートを1枚の Texture にして、その一部 (srcrect) を描きます。
+#   - 透明度 (Surface.set_alpha の値) は Texture の alpha として Renderer 側で掛けます。
+#   - ワールドは SCREEN_* の座標で描き、ウィンドウ (DISPLAY_*) との差は Renderer の scale で拡大します。
+#     (低解像度モードの拡大も GPU で行う)
+#   - HUD・メニューは今までどおり Surface (canvas) に描き、1フレームに1回 Texture に転送して上に重ねます。
+#
+# キャッシュは Surface そのものをキーにしているので、ワールドに描く画像は描いた後に中身を書き換えず、
+# 新しい Surface に差し替えてください (今のエンティティはすべて差し替え式です)。
+#
+# pygame._sdl2 が無い・Renderer が作れない時は setup() が None を返し、main.py はソフトウェア描画に戻ります。
+# ダミーのビデオドライバでも "software" の Renderer で動くので、ベンチマーク (--backend texture) で確認できます。
+import os
+import pygame
+import config
+
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    video = None
+
+# SDL_BLENDMODE_BLEND
+BLEND_MODE = 1
+
+
+class TextureCanvas:
+    """ワールドの描画先。CameraGroup などからは Surface と同じように blit / fill できる"""
+    def __init__(self, backend, size):
+        self.backend = backend
+        self.size = tuple(size)
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self):
+        return pygame.Rect((0, 0), self.size)
+
+    def fill(self, color):
+        renderer = self.backend.renderer
+        renderer.draw_color = pygame.Color(color)
+        renderer.clear()
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        self.backend.draw_surface(source, dest, area)
+
+    def blits(self, blit_sequence, doreturn=True):
+        draw = self.backend.draw_surface
+        for item in blit_sequence:
+            draw(item[0], item[1], item[2] if len(item) > 2 else None)
+
+    def draw_rect(self, color, rect, width=0):
+        self.backend.draw_rect(color, rect, width)
+
+
+class TextureRenderer:
+    def __init__(self, display_size, world_size=None, fullscreen=False, vsync=False, settings=None):
+        if video is None:
+            raise RuntimeError("pygame._sdl2.video is not available")
+        settings = config.RENDER_SETTINGS if settings is None else settings
+        self.display_size = tuple(display_size)
+        self.world_size = tuple(world_size or display_size)
+        self.keep_frames = settings.get("texture_keep_frames", 300)
+
+        # Renderer を作る前に拡大の方法を決める ("0" 最近傍 / "1" 線形)
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = "1" if settings.get("smooth", False) else "0"
+
+        # convert() / convert_alpha() にはディスプレイのピクセル形式が要るので、見えない 1x1 の画面を作っておく
+        if pygame.display.get_surface() is None:
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+        self.window = video.Window(config.CAPTION, size=self.display_size, fullscreen=fullscreen)
+        try:
+            self.renderer = video.Renderer(self.window, accelerated=-1, vsync=vsync)
+        except Exception:
+            self.window.destroy()
+            raise
+
+        # HUD・メニューを描く Surface (ゲームプレイ中は透明にしてから HUD を描く)
+        self.canvas = pygame.Surface(self.display_size, pygame.SRCALPHA)
+        self.overlay = video.Texture(self.renderer, self.display_size, streaming=True)
+        self.overlay.blend_mode = BLEND_MODE
+        self.world = TextureCanvas(self, self.world_size)
+        self.world_scale = (self.display_size[0] / self.world_size[0],
+                            self.display_size[1] / self.world_size[1])
+
+        # id(親 Surface) -> [Surface, Texture, 最後に使ったフレーム]
+        # (Surface を持っておくので、キャッシュにある間は id が他の Surface に使い回されない)
+        self.textures = {}
+        self.frame = 0
+
+        # 計測用
+        self.uploads = 0
+        self.draws = 0
+        self.last_draws = 0
+        self.evicted = 0
+
+    # --- Texture のキャッシュ ---
+    def texture_for(self, surface):
+        """surface を描くための (Texture, srcrect) を返す。初めての画像ならアップロードする"""
+        parent = surface.get_abs_parent()
+        entry = self.textures.get(id(parent)) or self.textures.get(id(surface))
+        if entry is None:
+            try:
+                texture = video.Texture.from_surface(self.renderer, parent)
+            except pygame.error:
+                # シートが大きすぎる時などは subsurface だけをアップロードする
+                parent = surface
+                texture = video.Texture.from_surface(self.renderer, surface)
+            entry = [parent, texture, self.frame]
+            self.textures[id(parent)] = entry
+            self.uploads += 1
+        parent = entry[0]
+        entry[2] = self.frame
+        if parent is surface:
+            return entry[1], None
+        return entry[1], pygame.Rect(surface.get_abs_offset(), surface.get_size())
+
+    def evict(self):
+        """keep_frames の間使われなかった Texture を捨てる"""
+        limit = self.frame - self.keep_frames
+        stale = [key for key, entry in self.textures.items() if entry[2] < limit]
+        for key in stale:
+            del self.textures[key]
+        self.evicted += len(stale)
+
+    # --- 描画命令 ---
+    def begin_world(self):
+        """ワールドを描く前に呼ぶ。SCREEN_* の座標で描ける TextureCanvas を返す"""
+        self.renderer.scale = self.world_scale
+        return self.world
+
+    def draw_surface(self, surface, dest, area=None):
+        texture, srcrect = self.texture_for(surface)
+        width, height = surface.get_size()
+        if area is not None:
+            area = pygame.Rect(area)
+            width, height = area.size
+            srcrect = area.move(srcrect.topleft) if srcrect else area
+        x, y = dest[0], dest[1]
+
+        alpha = surface.get_alpha()
+        alpha = 255 if alpha is None else alpha
+        if alpha != 255:
+            texture.blend_mode = BLEND_MODE
+        texture.alpha = alpha
+        texture.draw(srcrect=srcrect, dstrect=(x, y, width, height))
+        self.draws += 1
+
+    def draw_rect(self, color, rect, width=0):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(color)
+        rect = pygame.Rect(rect)
+        if width <= 0:
+            renderer.fill_rect(rect)
+            return
+        for _ in range(width):
+            if rect.width <= 0 or rect.height <= 0:
+                break
+            renderer.draw_rect(rect)
+            rect.inflate_ip(-2, -2)
+
+    def present(self, canvas=None):
+        """canvas (HUD・メニュー) を重ねて画面に出し、次のフレームのために消す"""
+        renderer = self.renderer
+        renderer.scale = (1.0, 1.0)
+        if canvas is not None:
+            self.overlay.update(canvas)
+            self.overlay.draw()
+        renderer.present()
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+
+        self.last_draws = self.draws
+        self.draws = 0
+        self.frame += 1
+        if self.frame % 60 == 0:
+            self.evict()
+
+    def to_surface(self):
+        """今 Renderer に描かれている画像を Surface にする (スクリーンショット・確認用。遅い)"""
+        return self.renderer.to_surface()
+
+    def report(self):
+        return {"textures": len(self.textures), "uploads": self.uploads,
+                "draws": self.last_draws, "evicted": self.evicted}
+
+    def close(self):
+        self.textures = {}
+        self.window.destroy()
+
+
+def draw_rect(surface, color, rect, width=0):
+    """pygame.draw.rect と同じ。描画先が TextureCanvas でも使える"""
+    if isinstance(surface, TextureCanvas):
+        surface.draw_rect(color, rect, width)
+    else:
+        pygame.draw.rect(surface, color, rect, width)
+
+
+# 使用中のバックエンド (ソフトウェア描画の時は None)
+_active = None
+
+
+def set_active(backend):
+    global _active
+    _active = backend
+
+
+def get_active():
+    return _active
+
+
+def setup(display_size, fullscreen=False, vsync=False, settings=None):
+    """RENDER_SETTINGS["backend"] が "texture" なら TextureRenderer を作って使う。
+    使えない時は理由を表示して None を返す (呼び出し側はソフトウェア描画にする)"""
+    settings = config.RENDER_SETTINGS if settings is None else settings
+    set_active(None)
+    if settings.get("backend", "software") != "texture":
+        return None
+    if video is None:
+        print("Texture renderer: pygame._sdl2 is not available, using the software renderer")
+        return None
+    try:
+        backend = TextureRenderer(display_size, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT),
+                                  fullscreen, vsync, settings)
+    except Exception as e:
+        print(f"Texture renderer: {e}, using the software renderer")
+        return None
+    print(f"Texture renderer: {backend.display_size[0]}x{backend.display_size[1]} "
+          f"(world {backend.world_size[0]}x{backend.world_size[1]})")
+    set_active(backend)
+    return backend
@@ -0,0 +1,186 @@
+# src/system/timer_wheel.py
+# 寿命・信管・スタンなどの「○ミリ秒後に1回だけ呼ぶ」処理をまとめて管理するタイマー
+#
+# 弾やテキストが毎フレーム get_ticks() と自分の寿命を比べる代わりに、
+# 生成時に schedule() で期限を登録し、期限が来たフレームにだけ呼ばれるようにします。
+# (期限待ちのオブジェクトは毎フレームのコストがかかりません)
+#
+# 階層タイマーホイール:
+#   レベル0 は tick_ms ごとのスロットが slots 個 (slots * tick_ms ミリ秒先まで)
+#   レベル1 は1スロットがレベル0 の1周分、レベル2 はさらにその slots 倍 ...
+#   上のレベルのスロットは、その時間帯に入った時に下のレベルへ振り分け直します。
+#   levels 段より先の期限は overflow に置き、一番上の1周ごとに振り分け直します。
+# 同じフレームに期限が来たタイマーは (期限, 登録順) の順に呼ぶので、リプレイでも順番が変わりません。
+#
+# GameplayScreen が TimerWheel を作って set_active() し、update_world の最初に advance() します。
+# エンティティはモジュール関数の call_later() を使い、None が返ったら (ホイールが無い時)
+# 以前どおり update で時刻を比べます。
+# 期限より前に kill されるエンティティは kill() で cancel() して、死んだスプライトを残さないようにします。
+import config
+from src.system import frame_state
+
+
+class Timer:
+    def __init__(self, due, seq, callback, args):
+        self.due = due
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        # スロットから外れるのは次に振り分け直す時なので、それまで相手を掴んだままにしない
+        self.cancelled = True
+        self.callback = None
+        self.args = ()
+
+
+class TimerWheel:
+    def __init__(self, now=None):
+        settings = config.TIMER_WHEEL
+        self.tick_ms = max(1, settings.get("tick_ms", 16))
+        self.slots = max(2, settings.get("slots", 64))
+        self.levels = max(1, settings.get("levels", 3))
+        # spans[level] = そのレベルの1スロットが何 tick か
+        self.spans = [self.slots ** level for level in range(self.levels + 1)]
+
+        if now is None:
+            now = frame_state.get_ticks()
+        self.current = now // self.tick_ms      # 振り分け済みの tick
+        self.wheels = [[[] for _ in range(self.slots)] for _ in range(self.levels)]
+        self.overflow = []
+        self.ready = []     # 期限の tick に入った (今の tick 内で時刻を比べる) タイマー
+        self.seq = 0
+
+        # 計測用
+        self.pending = 0
+        self.fired = 0
+        self.last_fired = 0
+        self.cancelled = 0
+
+    def __len__(self):
+        return self.pending
+
+    # --- 登録 ---
+    def schedule(self, delay_ms, callback, *args):
+        """delay_ms 後に callback(*args) を1回呼ぶ。返り値の Timer.cancel() で取り消せる"""
+        return self.schedule_at(frame_state.get_ticks() + delay_ms, callback, *args)
+
+    def schedule_at(self, due_ms, callback, *args):
+        self.seq += 1
+        timer = Timer(due_ms, self.seq, callback, args)
+        self._insert(timer)
+        self.pending += 1
+        return timer
+
+    def _insert(self, timer):
+        due_tick = timer.due // self.tick_ms
+        delta = due_tick - self.current
+        if delta <= 0:
+            self.ready.append(timer)
+            return
+        spans = self.spans
+        for level in range(self.levels):
+            if delta < spans[level + 1]:
+                self.wheels[level][(due_tick // spans[level]) % self.slots].append(timer)
+                return
+        self.overflow.append(timer)
+
+    def _cascade(self, level):
+        """上のレベルのスロットを1つ取り出して振り分け直す"""
+        wheel = self.wheels[level]
+        index = (self.current // self.spans[level]) % self.slots
+        timers = wheel[index]
+        if timers:
+            wheel[index] = []
+            self._reinsert(timers)
+
+    def _reinsert(self, timers):
+        for timer in timers:
+            if timer.cancelled:
+                self.pending -= 1
+                self.cancelled += 1
+            else:
+                self._insert(timer)
+
+    # --- 進める ---
+    def advance(self, now):
+        """now までに期限が来たタイマーを呼ぶ (1フレームに1回)"""
+        target = now // self.tick_ms
+        spans = self.spans
+        slots = self.slots
+        level0 = self.wheels[0]
+        while self.current < target:
+            self.current += 1
+            current = self.current
+            # 上のレベルから順に振り分け直す (下に落ちたタイマーがその tick で拾われるように)
+            if current % spans[self.levels] == 0 and self.overflow:
+                timers = self.overflow
+                self.overflow = []
+                self._reinsert(timers)
+            for level in range(self.levels - 1, 0, -1):
+                if current % spans[level] == 0:
+                    self._cascade(level)
+            index = current % slots
+            if level0[index]:
+                self.ready.extend(level0[index])
+                level0[index] = []
+
+        if not self.ready:
+            self.last_fired = 0
+            return 0
+
+        due = []
+        waiting = []
+        for timer in self.ready:
+            if timer.cancelled:
+                self.pending -= 1
+                self.cancelled += 1
+            elif timer.due <= now:
+                due.append(timer)
+            else:
+                waiting.append(timer)
+        self.ready = waiting
+
+        due.sort(key=lambda t: (t.due, t.seq))
+        fired = 0
+        for timer in due:
+            self.pending -= 1
+            # 同じフレームで先に呼んだ処理が取り消した場合は呼ばない
+            if timer.cancelled:
+                self.cancelled += 1
+                continue
+            timer.callback(*timer.args)
+            fired += 1
+        self.fired += fired
+        self.last_fired = fired
+        return fired
+
+    def report(self):
+        return {"pending": self.pending, "fired": self.fired, "cancelled": self.cancelled}
+
+
+# ゲームプレイ中のホイール (GameplayScreen が設定する)
+_active = None
+
+
+def set_active(wheel):
+    global _active
+    _active = wheel
+
+
+def get_active():
+    return _active
+
+
+def call_later(delay_ms, callback, *args):
+    """アクティブなホイールに登録する。ホイールが無ければ None (呼び出し側で時刻を比べる)"""
+    if _active is None:
+        return None
+    return _active.schedule(delay_ms, callback, *args)
+
+
+def cancel(timer):
+    """call_later の返り値を取り消す (None なら何もしない)"""
+    if timer is not None:
+        timer.cancel()